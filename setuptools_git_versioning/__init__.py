@@ -1,24 +1,39 @@
 from __future__ import annotations
 
+import importlib
 from typing import TYPE_CHECKING, Any
 
-from setuptools_git_versioning.git import (
-    count_since,
-    get_all_tags,
-    get_branch,
-    get_branches,
-    get_latest_file_commit,
-    get_sha,
-    get_tag,
-    get_tags,
-    is_dirty,
-)
-from setuptools_git_versioning.setup import get_version, infer_version
-from setuptools_git_versioning.version import version_from_git
-
 if TYPE_CHECKING:
     from setuptools.dist import Distribution
 
+    from setuptools_git_versioning.git import (
+        Repository,
+        count_since,
+        count_since_async,
+        get_all_tags,
+        get_all_tags_async,
+        get_branch,
+        get_branch_async,
+        get_branches,
+        get_branches_async,
+        get_latest_file_commit,
+        get_latest_file_commit_async,
+        get_sha,
+        get_sha_async,
+        get_tag,
+        get_tag_async,
+        get_tag_info,
+        get_tag_info_async,
+        get_tags,
+        get_tags_async,
+        get_tags_info,
+        get_tags_info_async,
+        is_dirty,
+        is_dirty_async,
+    )
+    from setuptools_git_versioning.setup import get_version, infer_version
+    from setuptools_git_versioning.version import version_from_git, version_from_git_async
+
 
 def parse_config(dist: Distribution, attr: Any, value: Any) -> None:
     "Dummy function used only to register in distutils"
@@ -26,16 +41,55 @@ def parse_config(dist: Distribution, attr: Any, value: Any) -> None:
 
 
 __all__ = [
+    "Repository",
     "count_since",
+    "count_since_async",
     "get_all_tags",
+    "get_all_tags_async",
     "get_branch",
+    "get_branch_async",
     "get_branches",
+    "get_branches_async",
     "get_latest_file_commit",
+    "get_latest_file_commit_async",
     "get_sha",
+    "get_sha_async",
     "get_tag",
+    "get_tag_async",
+    "get_tag_info",
+    "get_tag_info_async",
     "get_tags",
+    "get_tags_async",
+    "get_tags_info",
+    "get_tags_info_async",
     "get_version",
     "infer_version",
     "is_dirty",
+    "is_dirty_async",
     "version_from_git",
+    "version_from_git_async",
 ]
+
+# setuptools imports this package for every build, even if the project does not use it,
+# so public names are imported from submodules only on first access
+_LAZY_ATTRS = {
+    **dict.fromkeys(__all__, "setuptools_git_versioning.git"),
+    "get_version": "setuptools_git_versioning.setup",
+    "infer_version": "setuptools_git_versioning.setup",
+    "version_from_git": "setuptools_git_versioning.version",
+    "version_from_git_async": "setuptools_git_versioning.version",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_ATTRS:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+
+    value = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
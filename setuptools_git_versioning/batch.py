@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import subprocess  # nosec
+import threading
+from contextlib import suppress
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, NamedTuple
+
+from setuptools_git_versioning.log import DEBUG
+
+if TYPE_CHECKING:
+    from setuptools_git_versioning.git import Repository
+
+log = logging.getLogger(__name__)
+
+# if process died, it is restarted only once per request
+MAX_ATTEMPTS = 2
+SHUTDOWN_TIMEOUT = 1
+# processes for least recently used repositories are stopped
+MAX_WORKERS = 8
+
+
+class ObjectInfo(NamedTuple):
+    oid: str
+    type: str
+    size: int
+    # only for 'contents' command
+    content: bytes | None = None
+
+
+def _resolve_root(repository: Repository) -> str:
+    return os.fspath(Path(repository.root or Path.cwd()).resolve())
+
+
+class CatFileBatch:
+    """Long-lived ``git cat-file --batch-command`` process, answering object queries for a single repository.
+
+    Commands are sent in batches and answered in the same order, so a few queries cost one round-trip.
+    If the process died, it is restarted. If it cannot be started at all (e.g. git is older than 2.36),
+    the worker is marked as unavailable, and callers should use ``git`` executable directly.
+    """
+
+    def __init__(self, repository: Repository) -> None:
+        self.repository = repository
+        # worker outlives the call which created it, so current directory is resolved only once
+        self.root = _resolve_root(repository)
+        self.available = True
+        self._process: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def process(self) -> subprocess.Popen | None:
+        return self._process
+
+    def _start(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            # git executable and repository location are already resolved by the handle
+            cmd = self.repository.command("git", "cat-file", "--batch-command", "--buffer")
+            log.log(DEBUG, "Starting %r at '%s'", cmd, self.root)
+            self._process = subprocess.Popen(  # noqa: S603
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                cwd=self.root,
+                env=self.repository.env,
+            )
+        return self._process
+
+    def _read_answer(self, stdout: IO[bytes], command: str) -> ObjectInfo | None:
+        header = stdout.readline()
+        if not header.endswith(b"\n"):
+            msg = "git cat-file exited unexpectedly"
+            raise BrokenPipeError(msg)
+
+        if header.endswith((b" missing\n", b" ambiguous\n")):
+            return None
+
+        oid, object_type, size = header.decode("ascii").split()
+        if not command.startswith("contents "):
+            return ObjectInfo(oid, object_type, int(size))
+
+        # content is followed by a newline
+        content = stdout.read(int(size) + 1)
+        if len(content) != int(size) + 1:
+            msg = "git cat-file exited unexpectedly"
+            raise BrokenPipeError(msg)
+        return ObjectInfo(oid, object_type, int(size), content[:-1])
+
+    def _communicate(self, commands: list[str]) -> list[ObjectInfo | None]:
+        process = self._start()
+        stdin, stdout = process.stdin, process.stdout
+        if stdin is None or stdout is None:
+            msg = "git cat-file pipes are closed"
+            raise BrokenPipeError(msg)
+
+        stdin.write("".join(f"{command}\n" for command in [*commands, "flush"]).encode("utf-8"))
+        stdin.flush()
+        return [self._read_answer(stdout, command) for command in commands]
+
+    def query(self, commands: list[str]) -> list[ObjectInfo | None] | None:
+        """Send commands like ``info <object>`` or ``contents <object>``, and return answers.
+
+        Answer is ``None`` if object is missing or ambiguous.
+        Returns ``None`` instead of the list if the process is not available.
+        """
+        if any("\n" in command for command in commands):
+            return None
+
+        with self._lock:
+            for _ in range(MAX_ATTEMPTS if self.available else 0):
+                results = self._try_communicate(commands)
+                if results is not None:
+                    return results
+
+            self.available = False
+            return None
+
+    def _try_communicate(self, commands: list[str]) -> list[ObjectInfo | None] | None:
+        try:
+            return self._communicate(commands)
+        except (OSError, ValueError) as e:
+            log.log(DEBUG, "git cat-file process failed: %r", e)
+            self._stop()
+            return None
+
+    def info(self, name: str) -> ObjectInfo | None:
+        results = self.query([f"info {name}"])
+        return results[0] if results else None
+
+    def contents(self, name: str) -> ObjectInfo | None:
+        results = self.query([f"contents {name}"])
+        return results[0] if results else None
+
+    def _stop(self) -> None:
+        process = self._process
+        self._process = None
+        if process is None:
+            return
+
+        for stream in (process.stdin, process.stdout):
+            if stream:
+                # closing stdin flushes it, which fails if process is already dead
+                with suppress(OSError):
+                    stream.close()
+        try:
+            process.wait(SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+
+_workers: dict[tuple[str, str | None], CatFileBatch] = {}
+_workers_lock = threading.Lock()
+
+
+def get_cat_file(repository: Repository) -> CatFileBatch:
+    """Return shared worker for the repository.
+
+    Worker is started using the first handle passed for the same folder and git executable.
+    """
+    key = (_resolve_root(repository), repository.executable)
+    evicted = []
+    with _workers_lock:
+        worker = _workers.pop(key, None) or CatFileBatch(repository)
+        _workers[key] = worker
+        while len(_workers) > MAX_WORKERS:
+            evicted.append(_workers.pop(next(iter(_workers))))
+
+    for item in evicted:
+        item.close()
+    return worker
+
+
+@atexit.register
+def close_all() -> None:
+    with _workers_lock:
+        workers = list(_workers.values())
+        _workers.clear()
+
+    for worker in workers:
+        worker.close()
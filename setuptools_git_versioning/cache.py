@@ -0,0 +1,283 @@
+"""Persistent cache of calculated versions.
+
+Building a wheel calls setuptools hooks several times, often in separate processes,
+and each of them calculates the version from scratch. Cache entry is reused only if HEAD,
+tags and configuration are the same, which is checked by reading a few files without calling ``git``.
+
+Local cache is stored inside the git directory and compares file modification times.
+Shared cache can be stored in any directory, e.g. on NFS, and is keyed by content only,
+so the same entry can be used by different clones of the repository.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Iterator, NamedTuple
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None  # type: ignore[assignment]
+
+from setuptools_git_versioning.log import DEBUG, INFO
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+from setuptools_git_versioning.native.gitdir import find_git_dir
+from setuptools_git_versioning.native.refs import RefStore
+
+if TYPE_CHECKING:
+    from setuptools_git_versioning.native.refs import Ref
+
+log = logging.getLogger(__name__)
+
+# increment if cache content or the way version is calculated was changed
+CACHE_FORMAT = 1
+CACHE_DIR = "setuptools-git-versioning"
+# overrides 'cache_dir' option
+CACHE_DIR_ENV = "SETUPTOOLS_GIT_VERSIONING_CACHE_DIR"
+
+# how long to wait for another process calculating the same version, in seconds
+LOCK_TIMEOUT = 60
+LOCK_POLL_INTERVAL = 0.05
+
+# refs changing the result of tag and history queries
+TRACKED_REFS = ("refs/tags", "refs/replace")
+# files changing the result of history queries
+TRACKED_FILES = ("packed-refs", "shallow", "info/grafts")
+
+
+class CacheEntry(NamedTuple):
+    version: str
+    # results of git queries, only for executed ones
+    facts: dict[str, Any]
+
+
+def _stat(path: Path) -> list[int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _loose_refs(path: Path) -> list[list]:
+    result = []
+    for directory, _, files in os.walk(path):
+        for name in files:
+            file = Path(directory, name)
+            result.append([file.relative_to(path).as_posix(), *(_stat(file) or [])])
+    return sorted(result)
+
+
+def _file_hash(path: Path) -> str | None:
+    try:
+        content = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    return hashlib.sha256(content).hexdigest()
+
+
+def _refs_hash(refs: list[Ref]) -> str:
+    content = "".join(f"{ref.oid} {ref.name}\n" for ref in refs)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _digest(content: dict[str, Any]) -> str:
+    dump = json.dumps(content, sort_keys=True, default=os.fspath)
+    return hashlib.sha256(dump.encode("utf-8")).hexdigest()
+
+
+def _try_lock(file: IO) -> bool:
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def config_hash(config: dict[str, Any]) -> str | None:
+    """Return hash of options, or ``None`` if some of them cannot be compared between processes"""
+    if any(callable(value) for value in config.values()):
+        return None
+    return _digest(config)
+
+
+def get_cache_dir(cache_dir: str | os.PathLike | None = None, root: str | os.PathLike | None = None) -> Path | None:
+    """Return shared cache directory from environment variable or config option"""
+    value = os.environ.get(CACHE_DIR_ENV) or cache_dir
+    if not value:
+        return None
+
+    project_root = Path(root) if root else Path.cwd()
+    return project_root.joinpath(Path(value).expanduser())
+
+
+class VersionCache:
+    """Cache entry for a specific project and configuration"""
+
+    def __init__(self, path: Path, key: dict[str, Any], *, local: bool = False) -> None:
+        self.path = path
+        self.key = key
+        # only cache inside git directory can be locked
+        self.local = local
+
+    @classmethod
+    def open(
+        cls,
+        config: dict[str, Any],
+        root: str | os.PathLike | None = None,
+    ) -> VersionCache | None:
+        """Return cache for the project, or ``None`` if the result cannot be cached"""
+        project_root = Path(root) if root else Path.cwd()
+        digest = config_hash({**config, "root": os.fspath(project_root.resolve())})
+        if digest is None:
+            log.log(INFO, "Config contains callables, version cache is disabled")
+            return None
+
+        version_file = config.get("version_file")
+        try:
+            git_dir = find_git_dir(root)
+            refs = RefStore(git_dir)
+            key = {
+                "format": CACHE_FORMAT,
+                "config": digest,
+                "head": refs.read_symref("HEAD"),
+                "head_sha": refs.head_sha(),
+                "refs": [_loose_refs(git_dir.common_dir / name) for name in TRACKED_REFS],
+                "files": [_stat(git_dir.common_dir / name) for name in TRACKED_FILES],
+                "version_file": _stat(project_root / version_file) if version_file else None,
+            }
+        except (OSError, UnsupportedRepositoryError) as e:
+            log.log(INFO, "Cannot use version cache: %s", e)
+            return None
+
+        return cls(git_dir.path / CACHE_DIR / f"{digest}.json", key, local=True)
+
+    @classmethod
+    def open_shared(
+        cls,
+        config: dict[str, Any],
+        cache_dir: Path,
+        root: str | os.PathLike | None = None,
+    ) -> VersionCache | None:
+        """Return cache entry in a shared directory, or ``None`` if the result cannot be cached.
+
+        Key depends only on content of repository and config, not on paths or modification times.
+        """
+        project_root = Path(root) if root else Path.cwd()
+        version_file = config.get("version_file")
+        try:
+            git_dir = find_git_dir(root)
+            # the same project can be cloned to different folders
+            relative_root = project_root.resolve().relative_to(git_dir.work_tree.resolve())
+            digest = config_hash({**config, "root": relative_root.as_posix()})
+            if digest is None:
+                log.log(INFO, "Config contains callables, shared version cache is disabled")
+                return None
+
+            refs = RefStore(git_dir)
+            key = {
+                "format": CACHE_FORMAT,
+                "config": digest,
+                "head": refs.read_symref("HEAD"),
+                "head_sha": refs.head_sha(),
+                "refs": [_refs_hash(refs.iter_refs(f"{name}/")) for name in TRACKED_REFS],
+                "files": [_file_hash(git_dir.common_dir / name) for name in TRACKED_FILES if name != "packed-refs"],
+                "version_file": _file_hash(project_root / version_file) if version_file else None,
+            }
+        except (OSError, ValueError, UnsupportedRepositoryError) as e:
+            log.log(INFO, "Cannot use shared version cache: %s", e)
+            return None
+
+        entry = _digest(key)
+        return cls(cache_dir / entry[:2] / f"{entry}.json", key)
+
+    def load(self) -> CacheEntry | None:
+        try:
+            content = json.loads(self.path.read_text(encoding="utf-8"))
+            if content["key"] != self.key:
+                log.log(DEBUG, "Cache entry '%s' is outdated", self.path)
+                return None
+
+            # JSON has no tuples
+            facts = {
+                name: tuple(value) if isinstance(value, list) else value for name, value in content["facts"].items()
+            }
+            result = CacheEntry(content["version"], facts)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            log.log(DEBUG, "Cannot read cache entry '%s': %s", self.path, e)
+            return None
+
+        log.log(INFO, "Found cached version %r", result.version)
+        return result
+
+    def save(self, entry: CacheEntry) -> None:
+        content = json.dumps({"key": self.key, "version": entry.version, "facts": entry.facts})
+        # unique name, because cache directory can be shared between processes and machines
+        temp_path = self.path.with_name(f"{self.path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_text(content, encoding="utf-8")
+            # readers never see partially written file
+            temp_path.replace(self.path)
+        except OSError as e:
+            log.log(DEBUG, "Cannot write cache entry '%s': %s", self.path, e)
+            with suppress(OSError):
+                temp_path.unlink()
+            return
+
+        log.log(DEBUG, "Saved version to cache '%s'", self.path)
+
+    def _open_lock(self) -> IO | None:
+        if fcntl is None:
+            log.log(DEBUG, "File locks are not supported on this platform")
+            return None
+
+        lock_path = self.path.with_suffix(".lock")
+        try:
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            return lock_path.open("a")
+        except OSError as e:
+            log.log(DEBUG, "Cannot open lock file '%s': %s", lock_path, e)
+            return None
+
+    @contextmanager
+    def lock(self, timeout: float | None = None) -> Iterator[bool]:
+        """Hold exclusive lock on the cache entry, so other processes wait for the result instead of calculating it.
+
+        If lock is held by another process, waits until it is released, or for ``timeout`` seconds
+        (default is :obj:`LOCK_TIMEOUT`), and yields ``False`` without holding the lock,
+        so all waiting processes can read the published result at the same time.
+        """
+        file = self._open_lock()
+        if file is None:
+            yield False
+            return
+
+        # lock is released when file is closed
+        with file:
+            if _try_lock(file):
+                log.log(DEBUG, "Acquired lock '%s'", file.name)
+                yield True
+                return
+
+            log.log(DEBUG, "Waiting for lock '%s'", file.name)
+            deadline = time.monotonic() + (LOCK_TIMEOUT if timeout is None else timeout)
+            while not _try_lock(file):
+                if time.monotonic() >= deadline:
+                    log.log(INFO, "Timeout while waiting for lock '%s', ignoring it", file.name)
+                    break
+                time.sleep(LOCK_POLL_INTERVAL)
+            else:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+        yield False
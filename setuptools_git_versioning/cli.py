@@ -1,9 +1,4 @@
 import argparse
-import logging
-import sys
-
-from setuptools_git_versioning.log import DEBUG, LOG_FORMAT, VERBOSITY_LEVELS
-from setuptools_git_versioning.setup import get_version
 
 
 def get_parser() -> argparse.ArgumentParser:
@@ -31,6 +26,14 @@ def get_parser() -> argparse.ArgumentParser:
 def main():
     parser = get_parser()
     namespace = parser.parse_args()
+
+    # '--help' does not need anything else
+    import logging
+    import sys
+
+    from setuptools_git_versioning.log import DEBUG, LOG_FORMAT, VERBOSITY_LEVELS
+    from setuptools_git_versioning.setup import get_version
+
     log_level = VERBOSITY_LEVELS.get(namespace.verbose, DEBUG)
     logging.basicConfig(level=log_level, format=LOG_FORMAT, stream=sys.stderr)
     print(str(get_version(root=namespace.root)))  # noqa: T201
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+from types import MappingProxyType
+from typing import Any, Mapping
+
 DEFAULT_TEMPLATE = "{tag}"
 DEFAULT_DEV_TEMPLATE = "{tag}.post{ccount}+git.{sha}"
 DEFAULT_DIRTY_TEMPLATE = "{tag}.post{ccount}+git.{sha}.dirty"
 DEFAULT_STARTING_VERSION = "0.0.1"
 DEFAULT_SORT_BY = "creatordate"
+DEFAULT_CONCURRENT = False
+DEFAULT_CACHE = False
+DEFAULT_SINGLE_FLIGHT = False
 DEFAULT_CONFIG = {
     "template": DEFAULT_TEMPLATE,
     "dev_template": DEFAULT_DEV_TEMPLATE,
@@ -17,10 +23,18 @@ DEFAULT_CONFIG = {
     "branch_formatter": None,
     "tag_filter": None,
     "sort_by": DEFAULT_SORT_BY,
+    "concurrent": DEFAULT_CONCURRENT,
+    "cache": DEFAULT_CACHE,
+    "cache_dir": None,
+    "single_flight": DEFAULT_SINGLE_FLIGHT,
 }
 
 
-def set_default_options(config: dict):
-    for key, value in DEFAULT_CONFIG.items():
-        config.setdefault(key, value)
-    return config
+def set_default_options(config: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Return read-only copy of config with default values of missing options, and without ``enabled`` flag.
+
+    Passed config is not changed.
+    """
+    result = {**DEFAULT_CONFIG, **config}
+    result.pop("enabled", None)
+    return MappingProxyType(result)
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import importlib
-import inspect
 import logging
 import os
 import re
@@ -12,6 +11,10 @@ from setuptools_git_versioning.log import DEBUG, INFO
 
 log = logging.getLogger(__name__)
 
+REGEXP_SPECIAL_CHARS = frozenset(".^$*+?{}[]()|\\")
+# these characters cannot be a part of ref name, but can be escaped in regexp
+GLOB_SPECIAL_CHARS = frozenset("*?[\\")
+
 
 def add_to_sys_path(root: str | os.PathLike | None) -> None:
     project_root = os.fspath(root) if root else os.getcwd()  # noqa: PTH109
@@ -61,6 +64,8 @@ def _callable_factory(
     log.log(INFO, "Parsing %s %r of type %r", callable_name, regexp_or_ref, type(regexp_or_ref).__name__)
 
     if callable(regexp_or_ref):
+        import inspect
+
         log.log(DEBUG, "Value is callable with signature %s", inspect.Signature.from_callable(regexp_or_ref))
         return regexp_or_ref
 
@@ -133,6 +138,103 @@ def create_tag_formatter(
     )
 
 
+def _has_top_level_alternation(regexp: str) -> bool:
+    depth = 0
+    pos = 0
+    while pos < len(regexp):
+        char = regexp[pos]
+        if char == "\\":
+            pos += 1
+        elif char == "[":
+            # skip character class. ']' is a literal if it goes first
+            pos += 2 if regexp[pos + 1 : pos + 2] == "^" else 1
+            pos += 1 if regexp[pos : pos + 1] == "]" else 0
+            while pos < len(regexp) and regexp[pos] != "]":
+                pos += 2 if regexp[pos] == "\\" else 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+        pos += 1
+    return False
+
+
+def regexp_literal_prefix(pattern: re.Pattern[str]) -> str:
+    """Return prefix which every string matched by ``pattern.match`` is starting with.
+
+    Only plain characters at the beginning of the regexp are taken into account,
+    so the prefix can be shorter than it could be, but never longer.
+    """
+    regexp = pattern.pattern
+    if pattern.flags & (re.IGNORECASE | re.VERBOSE) or _has_top_level_alternation(regexp):
+        return ""
+
+    chars = []
+    pos = 1 if regexp.startswith("^") else 0
+    while pos < len(regexp):
+        char = regexp[pos]
+        size = 1
+        if char == "\\":
+            # escaped letters and digits are character classes, anchors or backreferences
+            char = regexp[pos + 1 : pos + 2]
+            size = 2
+            if not char or char.isalnum():
+                break
+        elif char in REGEXP_SPECIAL_CHARS:
+            break
+
+        if char in GLOB_SPECIAL_CHARS:
+            break
+
+        quantifier = regexp[pos + size : pos + size + 1]
+        if quantifier and quantifier in "*?{":
+            break
+
+        chars.append(char)
+        if quantifier == "+":
+            break
+        pos += size
+
+    return "".join(chars)
+
+
+def regexp_glob(pattern: re.Pattern[str]) -> str | None:
+    """Return glob pattern matching the same tags as ``pattern.match``, or ``None`` if there is no such pattern.
+
+    Only regexps matching all strings starting with some literal prefix, like ``^v`` or ``release-.*``, are supported.
+    """
+    regexp = pattern.pattern
+    if pattern.flags & (re.IGNORECASE | re.VERBOSE):
+        return None
+
+    body = regexp[1:] if regexp.startswith("^") else regexp
+    # 'match' checks only the beginning of the string, and tag names cannot contain newlines
+    if body.endswith(".*") and not body.endswith("\\.*"):
+        body = body[:-2]
+
+    chars = []
+    pos = 0
+    while pos < len(body):
+        char = body[pos]
+        if char == "\\":
+            # escaped letters and digits are character classes, anchors or backreferences
+            pos += 1
+            char = body[pos : pos + 1]
+            if not char or char.isalnum():
+                return None
+        elif char in REGEXP_SPECIAL_CHARS:
+            return None
+
+        if char in GLOB_SPECIAL_CHARS:
+            return None
+        chars.append(char)
+        pos += 1
+
+    return "".join(chars) + "*"
+
+
 def tag_filter_factory(regexp: str) -> Callable[[str], str | None]:
     pattern = re.compile(regexp)
 
@@ -143,6 +245,11 @@ def tag_filter_factory(regexp: str) -> Callable[[str], str | None]:
             return tag
         return None
 
+    # tags not starting with this prefix are excluded by git itself, before calling the filter
+    tag_filter.tag_prefix = regexp_literal_prefix(pattern)  # type: ignore[attr-defined]
+    log.log(DEBUG, "Tag filter literal prefix is %r", tag_filter.tag_prefix)  # type: ignore[attr-defined]
+    # if filter can be replaced with a glob, tags can be matched by 'git describe' itself
+    tag_filter.tag_glob = regexp_glob(pattern)  # type: ignore[attr-defined]
     return tag_filter
 
 
@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import pickle  # nosec
+import struct
+import subprocess  # nosec
+import sys
+import threading
+from contextlib import suppress
+from pathlib import Path
+from typing import Any
+
+from setuptools_git_versioning.log import DEBUG
+
+log = logging.getLogger(__name__)
+
+SHUTDOWN_TIMEOUT = 1
+FRAME_HEADER = struct.Struct(">I")
+# each child is a separated interpreter, so running more children than CPUs makes no sense
+MAX_CHILDREN = os.cpu_count() or 1
+
+# server process is started with the same sys.path as the caller, so it can import this module
+SERVER_CODE = (
+    "import sys; sys.path[:] = sys.argv[2:]; "
+    "from setuptools_git_versioning.forkserver import serve; serve(int(sys.argv[1]))"
+)
+
+
+def _read_exact(fd: int, size: int) -> bytes | None:
+    chunks = []
+    while size:
+        chunk = os.read(fd, size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _read_frame(fd: int) -> Any:
+    """Read one pickled object, or return ``None`` if the other side closed the pipe"""
+    header = _read_exact(fd, FRAME_HEADER.size)
+    if header is None:
+        return None
+
+    data = _read_exact(fd, FRAME_HEADER.unpack(header)[0])
+    if data is None:
+        return None
+    return pickle.loads(data)  # noqa: S301  # nosec
+
+
+def _write_frame(fd: int, item: Any) -> None:
+    data = pickle.dumps(item)
+    view = memoryview(FRAME_HEADER.pack(len(data)) + data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def _picklable_error(error: BaseException) -> BaseException:
+    try:
+        pickle.loads(pickle.dumps(error))  # noqa: S301  # nosec
+    except Exception:  # noqa: BLE001
+        return RuntimeError(f"{type(error).__name__}: {error}")
+    return error
+
+
+class _FrameHandler(logging.Handler):
+    """Send log records from forked child to the caller"""
+
+    def __init__(self, fd: int, request_id: int) -> None:
+        super().__init__()
+        self.fd = fd
+        self.request_id = request_id
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # args, exception and stack are rendered to the message, because they may be not picklable
+        record.msg = record.getMessage()
+        if record.exc_info:
+            record.msg += "\n" + logging.Formatter().formatException(record.exc_info)
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        _write_frame(self.fd, ("log", self.request_id, record))
+
+
+def _evaluate(fd: int, request_id: int, request: dict) -> None:
+    """Executed in forked child: run 'setup.py' and send calculated version back"""
+    from distutils.core import run_setup
+
+    from setuptools_git_versioning.factories import add_to_sys_path
+    from setuptools_git_versioning.setup import infer_version
+
+    os.environ.clear()
+    os.environ.update(request["env"])
+    sys.path[:] = request["sys_path"]
+
+    root_logger = logging.getLogger()
+    root_logger.handlers[:] = [_FrameHandler(fd, request_id)]
+    root_logger.setLevel(request["log_level"])
+
+    try:
+        add_to_sys_path(request["root"])
+        os.chdir(request["root"])
+        dist = run_setup(request["setup_py_path"], stop_after="init")
+        version = infer_version(dist, root=request["root"])
+        answer: tuple = ("result", request_id, None if version is None else str(version))
+    except BaseException as e:  # noqa: BLE001
+        answer = ("error", request_id, _picklable_error(e))
+
+    _write_frame(fd, answer)
+
+
+def _fork(request_id: int, request: dict, server_fds: list[int]) -> tuple[int, int]:
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid:
+        os.close(write_fd)
+        return pid, read_fd
+
+    exit_code = 0
+    try:
+        os.close(read_fd)
+        for fd in server_fds:
+            os.close(fd)
+        _evaluate(write_fd, request_id, request)
+    except BaseException:  # noqa: BLE001
+        exit_code = 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            with suppress(Exception):
+                stream.flush()
+        # skip atexit handlers inherited from the server
+        os._exit(exit_code)
+
+
+def serve(max_children: int = MAX_CHILDREN) -> None:
+    """Main loop of the server process.
+
+    Requests are read from stdin, and every 'setup.py' is executed in a separated child forked from the server.
+    Modules needed to evaluate 'setup.py' are imported only once, and children inherit them.
+    Up to ``max_children`` children are running in parallel, other requests are waiting in a queue.
+    Logs and results of children are written to stdout as soon as they are ready.
+    """
+    import selectors
+    from collections import deque
+
+    # 'setup.py' can print something to stdout, so it is replaced with stderr, and answers are sent using a copy
+    requests_fd = sys.stdin.fileno()
+    answers_fd = os.dup(sys.stdout.fileno())
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    # setuptools should be imported before distutils, see 'infer_setup_py'
+    import setuptools  # isort: skip  # noqa: F401
+
+    import distutils.core  # noqa: F401
+
+    import setuptools_git_versioning.factories
+    import setuptools_git_versioning.setup
+    import setuptools_git_versioning.version  # noqa: F401
+
+    selector = selectors.DefaultSelector()
+    selector.register(requests_fd, selectors.EVENT_READ)
+    accepting = True
+    queue: deque[tuple[int, dict]] = deque()
+    children: dict[int, tuple[int, int, bool]] = {}
+
+    while accepting or queue or children:
+        while queue and len(children) < max_children:
+            request_id, request = queue.popleft()
+            pid, read_fd = _fork(request_id, request, [requests_fd, answers_fd])
+            children[read_fd] = (request_id, pid, False)
+            selector.register(read_fd, selectors.EVENT_READ)
+
+        for key, _ in selector.select():
+            if key.fd == requests_fd:
+                item = _read_frame(requests_fd)
+                if item is None:
+                    selector.unregister(requests_fd)
+                    accepting = False
+                else:
+                    queue.append(item)
+                continue
+
+            request_id, pid, answered = children[key.fd]
+            answer = _read_frame(key.fd)
+            if answer is not None:
+                _write_frame(answers_fd, answer)
+                children[key.fd] = (request_id, pid, answered or answer[0] != "log")
+                continue
+
+            selector.unregister(key.fd)
+            os.close(key.fd)
+            del children[key.fd]
+            _, status = os.waitpid(pid, 0)
+            if not answered:
+                error = RuntimeError(f"Process evaluating 'setup.py' exited unexpectedly with status {status}")
+                _write_frame(answers_fd, ("error", request_id, error))
+
+
+class SetupPyServer:
+    """Long-lived process evaluating 'setup.py' files, with setuptools already imported.
+
+    Each 'setup.py' is executed in a separate child forked from the server, so evaluations are isolated
+    from each other and from the caller, and can be executed in parallel: submit all files first
+    (or call :obj:`evaluate` from several threads), and then collect the results.
+
+    Starting the server costs one more interpreter with setuptools imported, which pays off only if
+    a lot of files are evaluated. So :obj:`setuptools_git_versioning.setup.infer_setup_py` uses
+    the server only if it was started explicitly, using :obj:`start`.
+
+    Only available on platforms supporting ``os.fork``.
+    """
+
+    def __init__(self, max_children: int = MAX_CHILDREN) -> None:
+        self.available = hasattr(os, "fork")
+        self.max_children = max_children
+        self._process: subprocess.Popen | None = None
+        # protects process and its stdin
+        self._lock = threading.Lock()
+        self._last_id = 0
+        # protects answers, which are read by one of waiting threads at a time
+        self._answers_ready = threading.Condition()
+        self._answers: dict[int, tuple] = {}
+        self._reading = False
+
+    @property
+    def running(self) -> bool:
+        process = self._process
+        return process is not None and process.poll() is None
+
+    def _start(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            cmd = [sys.executable, "-c", SERVER_CODE, str(self.max_children), *sys.path]
+            log.log(DEBUG, "Starting 'setup.py' evaluation server")
+            self._process = subprocess.Popen(  # noqa: S603
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        return self._process
+
+    def start(self) -> None:
+        """Start server process, if it is not running yet"""
+        with self._lock:
+            self._start()
+
+    def submit(self, setup_py_path: str | os.PathLike, root: str | os.PathLike | None = None) -> int:
+        """Start evaluation of 'setup.py', and return request id to get the result"""
+        # server can have different current directory
+        request = {
+            "setup_py_path": os.fspath(Path(setup_py_path).resolve()),
+            "root": os.fspath(Path(root or Path.cwd()).resolve()),
+            "env": dict(os.environ),
+            "sys_path": sys.path.copy(),
+            "log_level": logging.getLogger("setuptools_git_versioning").getEffectiveLevel(),
+        }
+
+        with self._lock:
+            process = self._start()
+            if process.stdin is None:
+                msg = "'setup.py' evaluation server pipes are closed"
+                raise BrokenPipeError(msg)
+
+            self._last_id += 1
+            _write_frame(process.stdin.fileno(), (self._last_id, request))
+            return self._last_id
+
+    def result(self, request_id: int) -> str | None:
+        """Wait for evaluation, and return version number, or ``None`` if 'setup.py' has no config.
+
+        Exception raised while evaluating 'setup.py' is raised here as well.
+        """
+        with self._answers_ready:
+            while request_id not in self._answers:
+                if self._reading:
+                    # another thread is reading answers, and it will wake us up after getting one
+                    self._answers_ready.wait()
+                    continue
+
+                self._reading = True
+                try:
+                    # pipe is read without holding the lock, so other threads can get their answers
+                    self._answers_ready.release()
+                    try:
+                        answer = self._read_answer()
+                    finally:
+                        self._answers_ready.acquire()
+                finally:
+                    self._reading = False
+                    self._answers_ready.notify_all()
+
+                if answer is not None:
+                    answer_id, kind, value = answer
+                    self._answers[answer_id] = (kind, value)
+
+            kind, value = self._answers.pop(request_id)
+
+        if kind == "error":
+            raise value
+        return value
+
+    def _read_answer(self) -> tuple | None:
+        """Read next answer from the server, or return ``None`` if it was a log record"""
+        process = self._process
+        answer = None
+        if process is not None and process.stdout is not None:
+            answer = _read_frame(process.stdout.fileno())
+
+        if answer is None:
+            self.close()
+            msg = "'setup.py' evaluation server exited unexpectedly"
+            raise BrokenPipeError(msg)
+
+        kind, request_id, value = answer
+        if kind == "log":
+            logging.getLogger(value.name).handle(value)
+            return None
+        return request_id, kind, value
+
+    def evaluate(self, setup_py_path: str | os.PathLike, root: str | os.PathLike | None = None) -> str | None:
+        return self.result(self.submit(setup_py_path, root))
+
+    def _stop(self) -> None:
+        process = self._process
+        self._process = None
+        if process is None:
+            return
+
+        for stream in (process.stdin, process.stdout):
+            if stream:
+                # closing stdin flushes it, which fails if process is already dead
+                with suppress(OSError):
+                    stream.close()
+        try:
+            process.wait(SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+
+_server = SetupPyServer()
+
+
+def get_server() -> SetupPyServer:
+    """Return shared server"""
+    return _server
+
+
+@atexit.register
+def close_all() -> None:
+    _server.close()
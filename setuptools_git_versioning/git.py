@@ -2,21 +2,132 @@ from __future__ import annotations
 
 import logging
 import os
+import shutil
 import subprocess  # nosec
-from contextlib import suppress
+from contextlib import closing, suppress
+from functools import partial
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Generator, Iterator, NamedTuple, TypeVar
 
+from setuptools_git_versioning.batch import get_cat_file
 from setuptools_git_versioning.defaults import DEFAULT_SORT_BY
 from setuptools_git_versioning.log import DEBUG
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+from setuptools_git_versioning.native.gitdir import GitDir, find_git_dir
+from setuptools_git_versioning.native.history import History, check_plain_history
+from setuptools_git_versioning.native.refs import OID_REGEXP, RefStore, short_name
+from setuptools_git_versioning.native.status import is_dirty as is_worktree_dirty
+from setuptools_git_versioning.native.tags import creator_date, iter_merged_tags
+from setuptools_git_versioning.readonly import git_env
 
 log = logging.getLogger(__name__)
 
+T = TypeVar("T")
 
-def _exec(*cmd: str, root: str | os.PathLike | None = None) -> list[str]:
-    log.log(DEBUG, "Executing %r at '%s'", cmd, root or Path.cwd())
+
+class Description(NamedTuple):
+    """Result of ``git describe`` command"""
+
+    tag: str
+    # number of commits on top of the tag
+    distance: int
+    # HEAD commit
+    sha: str
+
+
+class TagInfo(NamedTuple):
+    """Tag with objects it is pointing to"""
+
+    name: str
+    # annotated tag object, or commit for lightweight tag
+    sha: str
+    # commit after dereferencing annotated tags, or None if tag is pointing to another tag
+    commit: str | None
+    # tagger date for annotated tag, or commit date for lightweight one
+    date: int | None
+
+
+# fields are separated with NUL, because it cannot be a part of ref name
+TAG_INFO_FORMAT = (
+    "%(refname:strip=2)%00%(objectname)%00%(objecttype)%00%(*objectname)%00%(*objecttype)%00%(creatordate:unix)"
+)
+
+
+class Repository:
+    """Git repository containing ``root`` folder.
+
+    Repository location and git executable are resolved only once, and then reused by all queries
+    which are passed this handle instead of the ``root`` path. The handle does not track changes
+    of the environment, so it should be created for a single version calculation.
+    """
+
+    def __init__(self, root: str | os.PathLike | None = None) -> None:
+        self.root = root
+        self.env = git_env()
+        self._git_dir: GitDir | None = None
+        self._git_dir_error: UnsupportedRepositoryError | None = None
+        self._executable: str | None = None
+        self._executable_resolved = False
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(root={self.root!r})"
+
+    @property
+    def git_dir(self) -> GitDir:
+        """Repository location, or raise :obj:`UnsupportedRepositoryError` if it cannot be read directly"""
+        if self._git_dir is None and self._git_dir_error is None:
+            try:
+                self._git_dir = find_git_dir(self.root)
+            except UnsupportedRepositoryError as e:
+                self._git_dir_error = e
+
+        if self._git_dir_error is not None:
+            raise UnsupportedRepositoryError(*self._git_dir_error.args)
+        return self._git_dir  # type: ignore[return-value]
+
+    @property
+    def executable(self) -> str | None:
+        """Full path to git executable, or None if it is not installed"""
+        if not self._executable_resolved:
+            self._executable = shutil.which("git", path=self.env.get("PATH"))
+            self._executable_resolved = True
+            log.log(DEBUG, "Using git executable %r", self._executable)
+        return self._executable
+
+    def command(self, *cmd: str) -> tuple[str, ...]:
+        """Return read-only git command with explicit repository location,
+        or raise :obj:`FileNotFoundError` if git is not installed.
+        """
+        if not cmd or cmd[0] != "git":
+            return cmd
+
+        if self.executable is None:
+            msg = "git executable is not found"
+            raise FileNotFoundError(msg)
+
+        location: tuple[str, ...] = ()
+        # otherwise git discovers repository by itself, applying checks like 'safe.directory'
+        with suppress(UnsupportedRepositoryError):
+            git_dir = self.git_dir
+            location = (f"--git-dir={git_dir.path}", f"--work-tree={git_dir.work_tree}")
+        return (self.executable, *location, *cmd[1:])
+
+
+def _repository(root: str | os.PathLike | Repository | None = None) -> Repository:
+    return root if isinstance(root, Repository) else Repository(root)
+
+
+def _split_lines(stdout: str) -> list[str]:
+    lines = stdout.splitlines()
+    return [line.rstrip() for line in lines if line.rstrip()]
+
+
+def _exec(*cmd: str, root: str | os.PathLike | Repository | None = None) -> list[str]:
+    repository = _repository(root)
     try:
-        stdout = subprocess.check_output(cmd, text=True, cwd=root)  # noqa: S603
+        cmd = repository.command(*cmd)
+        log.log(DEBUG, "Executing %r at '%s'", cmd, repository.root or Path.cwd())
+        stdout = subprocess.check_output(cmd, text=True, cwd=repository.root, env=repository.env)  # noqa: S603
     except subprocess.CalledProcessError as e:
         log.log(DEBUG, "Subprocess exited with code %d: %r", e.returncode, e.output)
         stdout = e.output
@@ -25,69 +136,556 @@ def _exec(*cmd: str, root: str | os.PathLike | None = None) -> list[str]:
         # FileNotFoundError on Unix, OSError on some other systems
         log.log(DEBUG, "Command not found: %r", e)
         stdout = ""
-    lines = stdout.splitlines()
-    return [line.rstrip() for line in lines if line.rstrip()]
+    return _split_lines(stdout)
+
+
+def _iter_exec(*cmd: str, root: str | os.PathLike | Repository | None = None) -> Generator[str, None, None]:
+    """Yield lines of command output as soon as they are printed.
+
+    If generator is closed before the end of output, the command is terminated.
+    """
+    repository = _repository(root)
+    try:
+        cmd = repository.command(*cmd)
+        log.log(DEBUG, "Executing %r at '%s'", cmd, repository.root or Path.cwd())
+        process = subprocess.Popen(  # noqa: S603
+            cmd,
+            stdout=subprocess.PIPE,
+            text=True,
+            cwd=repository.root,
+            env=repository.env,
+        )
+    except OSError as e:
+        log.log(DEBUG, "Command not found: %r", e)
+        return
+
+    with process:
+        try:
+            for line in process.stdout:  # type: ignore[union-attr]
+                stripped = line.rstrip()
+                if stripped:
+                    yield stripped
+        finally:
+            if process.poll() is None:
+                log.log(DEBUG, "Output is not needed anymore, terminating %r", cmd)
+                process.terminate()
+
+    if process.returncode:
+        log.log(DEBUG, "Subprocess exited with code %d", process.returncode)
+
 
+async def _run_in_thread(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run blocking function without blocking the event loop.
 
-def get_branches(root: str | os.PathLike | None = None) -> list[str]:
+    Async API is built on top of the sync one, so both of them are using the same code for
+    reading repository files and running git commands.
+    """
+    # asyncio takes a lot of time to import, and it is not needed by the sync API
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(func, *args, **kwargs))
+
+
+def _read_objects(repository: Repository, oids: list[str]) -> list[tuple[str, bytes] | None] | None:
+    """Read objects which cannot be read directly using a single ``git cat-file`` query"""
+    if not repository.executable:
+        return None
+
+    results = get_cat_file(repository).query([f"contents {oid}" for oid in oids])
+    if results is None:
+        return None
+    return [(item.type, item.content) if item and item.content is not None else None for item in results]
+
+
+def _ref_store(root: str | os.PathLike | Repository | None = None) -> RefStore:
+    repository = _repository(root)
+    return RefStore(repository.git_dir, object_fallback=partial(_read_objects, repository))
+
+
+def _log_fallback(error: UnsupportedRepositoryError) -> None:
+    log.log(DEBUG, "Cannot read repository directly, falling back to git executable: %s", error)
+
+
+def get_branches(root: str | os.PathLike | Repository | None = None) -> list[str]:
     """Return list of branch names in the git repository"""
+    try:
+        return _ref_store(root).branches()
+    except UnsupportedRepositoryError as e:
+        _log_fallback(e)
+
     branches = _exec("git", "branch", "-l", "--format", "%(refname:short)", root=root)
     return branches or []
 
 
-def get_branch(root: str | os.PathLike | None = None) -> str | None:
+def get_branch(root: str | os.PathLike | Repository | None = None) -> str | None:
     """Return branch name pointing to HEAD, or None"""
+    try:
+        return _ref_store(root).branch()
+    except UnsupportedRepositoryError as e:
+        _log_fallback(e)
+
     branches = _exec("git", "rev-parse", "--abbrev-ref", "HEAD", root=root)
     return branches[0] if branches else None
 
 
-def get_all_tags(sort_by: str = DEFAULT_SORT_BY, root: str | os.PathLike | None = None) -> list[str]:
+def get_all_tags(sort_by: str = DEFAULT_SORT_BY, root: str | os.PathLike | Repository | None = None) -> list[str]:
     """Return list of tags in the git repository"""
+    if sort_by == "refname":
+        try:
+            return [short_name(ref.name) for ref in reversed(_ref_store(root).tags())]
+        except UnsupportedRepositoryError as e:
+            _log_fallback(e)
+
     tags = _exec("git", "tag", f"--sort=-{sort_by}", root=root)
     return tags or []
 
 
+def _iter_merged_tag_infos(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    root: str | os.PathLike | Repository | None = None,
+) -> Iterator[TagInfo]:
+    refs = _ref_store(root)
+    head = refs.head_sha()
+    if head is None:
+        return
+
+    history = History.load(refs.git_dir, refs)
+    for ref, commit in iter_merged_tags(refs, history, head, sort_by, _tag_prefix(filter_callback)):
+        name = short_name(ref.name)
+        if filter_callback and not filter_callback(name):
+            continue
+        yield TagInfo(name, ref.oid, commit, creator_date(refs, ref, commit, history))
+
+
+def _iter_merged_tags(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    root: str | os.PathLike | Repository | None = None,
+) -> Iterator[str]:
+    return (tag.name for tag in _iter_merged_tag_infos(sort_by, filter_callback, root=root))
+
+
+def _parse_tag_info(line: str) -> TagInfo | None:
+    fields = line.split("\0")
+    if len(fields) != len(TAG_INFO_FORMAT.split("%00")):
+        log.log(DEBUG, "Cannot parse tag info %r", line)
+        return None
+
+    name, sha, object_type, peeled, peeled_type, date = fields
+    commit = None
+    if object_type == "commit":
+        commit = sha
+    elif peeled_type == "commit":
+        commit = peeled
+    return TagInfo(name, sha, commit, int(date) if date else None)
+
+
+def _tag_prefix(filter_callback: Callable[[str], str | None] | None = None) -> str:
+    # set by regexp-based filters, see tag_filter_factory
+    return getattr(filter_callback, "tag_prefix", "")
+
+
+def _tag_patterns(filter_callback: Callable[[str], str | None] | None = None) -> tuple[str, ...]:
+    prefix = _tag_prefix(filter_callback)
+    if not prefix:
+        return ("refs/tags",)
+    # '*' does not match '/' in ref patterns, nested tags are matched by '**'
+    return (f"refs/tags/{prefix}*", f"refs/tags/{prefix}*/**")
+
+
+def _tag_info_command(
+    sort_by: str,
+    filter_callback: Callable[[str], str | None] | None = None,
+    *,
+    merged: bool,
+) -> tuple[str, ...]:
+    merged_options = ("--merged", "HEAD") if merged else ()
+    return (
+        "git",
+        "for-each-ref",
+        f"--sort=-{sort_by}",
+        f"--format={TAG_INFO_FORMAT}",
+        *merged_options,
+        *_tag_patterns(filter_callback),
+    )
+
+
+def _iter_exec_tag_infos(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    *,
+    merged: bool = True,
+    root: str | os.PathLike | Repository | None = None,
+) -> Generator[TagInfo, None, None]:
+    with closing(_iter_exec(*_tag_info_command(sort_by, filter_callback, merged=merged), root=root)) as lines:
+        for line in lines:
+            tag = _parse_tag_info(line)
+            # pull the tags that don't match the filter out of the output
+            if tag and (not filter_callback or filter_callback(tag.name)):
+                yield tag
+
+
+def _peel_tag_infos(tags: list[TagInfo], root: str | os.PathLike | Repository | None = None) -> list[TagInfo]:
+    """Resolve commits of tags pointing to other tags using a single ``git cat-file`` query"""
+    repository = _repository(root)
+    unpeeled = [tag for tag in tags if tag.commit is None]
+    if not unpeeled or not repository.executable:
+        return tags
+
+    results = get_cat_file(repository).query([f"info {tag.sha}^{{commit}}" for tag in unpeeled])
+    if results is None:
+        return tags
+
+    commits = {tag.sha: result.oid for tag, result in zip(unpeeled, results) if result}
+    return [tag._replace(commit=commits.get(tag.sha)) if tag.commit is None else tag for tag in tags]
+
+
+def _exec_tag_infos(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    *,
+    merged: bool = True,
+    root: str | os.PathLike | Repository | None = None,
+) -> list[TagInfo]:
+    tags = list(_iter_exec_tag_infos(sort_by, filter_callback, merged=merged, root=root))
+    return _peel_tag_infos(tags, root=root)
+
+
+def _exec_tag_info(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    *,
+    merged: bool = True,
+    root: str | os.PathLike | Repository | None = None,
+) -> TagInfo | None:
+    # git is terminated right after printing the first matching tag
+    with closing(_iter_exec_tag_infos(sort_by, filter_callback, merged=merged, root=root)) as tags:
+        tag = next(tags, None)
+    return _peel_tag_infos([tag], root=root)[0] if tag else None
+
+
+def _exec_tags(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    root: str | os.PathLike | Repository | None = None,
+) -> list[str]:
+    return [tag.name for tag in _exec_tag_infos(sort_by, filter_callback, root=root)]
+
+
+def get_tags_info(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    root: str | os.PathLike | Repository | None = None,
+) -> list[TagInfo]:
+    """Return tags merged into HEAD history tree, with commits they are pointing to and creation dates"""
+    try:
+        return list(_iter_merged_tag_infos(sort_by, filter_callback, root=root))
+    except UnsupportedRepositoryError as e:
+        _log_fallback(e)
+
+    return _exec_tag_infos(sort_by, filter_callback, root=root)
+
+
 def get_tags(
     sort_by: str = DEFAULT_SORT_BY,
     filter_callback: Callable[[str], str | None] | None = None,
-    root: str | os.PathLike | None = None,
+    root: str | os.PathLike | Repository | None = None,
 ) -> list[str]:
     """Return list of tags merged into HEAD history tree"""
-    tags = _exec("git", "tag", f"--sort=-{sort_by}", "--merged", root=root)
-    if filter_callback:
-        # pull the tags that don't start with tag_prefix out of the list
-        return list(filter(filter_callback, tags))
-    return tags or []
+    return [tag.name for tag in get_tags_info(sort_by, filter_callback, root=root)]
+
+
+def get_tag_info(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    root: str | os.PathLike | Repository | None = None,
+) -> TagInfo | None:
+    """Return latest tag merged into HEAD history tree, with commit it is pointing to and creation date"""
+    try:
+        # stop walking through the history after the first matching tag
+        return next(_iter_merged_tag_infos(sort_by, filter_callback, root=root), None)
+    except UnsupportedRepositoryError as e:
+        _log_fallback(e)
 
+    return _exec_tag_info(sort_by, filter_callback, root=root)
 
-def get_tag(*args, **kwargs) -> str | None:
+
+def get_tag(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    root: str | os.PathLike | Repository | None = None,
+) -> str | None:
     """Return latest tag merged into HEAD history tree"""
-    tags = get_tags(*args, **kwargs)
-    return tags[0] if tags else None
+    tag = get_tag_info(sort_by, filter_callback, root=root)
+    return tag.name if tag else None
 
 
-def get_sha(name: str = "HEAD", root: str | os.PathLike | None = None) -> str | None:
+def get_sha(name: str = "HEAD", root: str | os.PathLike | Repository | None = None) -> str | None:
     """Get commit SHA-1 hash"""
-    sha = _exec("git", "rev-list", "-n", "1", name, root=root)
+    try:
+        return _ref_store(root).rev_parse(name)
+    except UnsupportedRepositoryError as e:
+        _log_fallback(e)
+
+    return _exec_sha(name, root=root)
+
+
+def _exec_sha(name: str, root: str | os.PathLike | Repository | None = None) -> str | None:
+    repository = _repository(root)
+    if repository.executable and name == name.strip():
+        results = get_cat_file(repository).query([f"info {name}^{{commit}}"])
+        if results is not None:
+            return results[0].oid if results[0] else None
+
+    sha = _exec("git", "rev-list", "-n", "1", name, root=repository)
     return sha[0] if sha else None
 
 
-def get_latest_file_commit(path: str | os.PathLike, root: str | os.PathLike | None = None) -> str | None:
+def get_latest_file_commit(path: str | os.PathLike, root: str | os.PathLike | Repository | None = None) -> str | None:
     """Get SHA-1 hash of latest commit of the file in the repository"""
     sha = _exec("git", "log", "-n", "1", "--pretty=format:%H", "--", os.fspath(path), root=root)
     return sha[0] if sha else None
 
 
-def is_dirty(root: str | os.PathLike | None = None) -> bool:
+def _exec_is_dirty(root: str | os.PathLike | Repository | None = None) -> bool:
+    repository = _repository(root)
+    try:
+        cmd = repository.command("git", "status", "--porcelain", "-z")
+        log.log(DEBUG, "Executing %r at '%s'", cmd, repository.root or Path.cwd())
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, cwd=repository.root, env=repository.env)  # noqa: S603
+    except OSError as e:
+        log.log(DEBUG, "Command not found: %r", e)
+        return False
+
+    with process:
+        # any record means there are some changes, so there is no need to wait for the rest of output
+        if process.stdout and process.stdout.read(1):
+            # unlike SIGKILL, SIGTERM allows git to remove index.lock
+            process.terminate()
+            return True
+
+        returncode = process.wait()
+        if returncode:
+            log.log(DEBUG, "Subprocess exited with code %d", returncode)
+    return False
+
+
+def _native_is_dirty(root: str | os.PathLike | Repository | None = None) -> bool:
+    refs = _ref_store(root)
+    head = refs.head_sha()
+    head_tree = None
+    if head:
+        # only one commit is read, so commit-graph is not required
+        check_plain_history(refs.git_dir, refs)
+        head_tree = refs.objects.read_commit(head).tree
+    return is_worktree_dirty(refs.git_dir, head_tree)
+
+
+def is_dirty(root: str | os.PathLike | Repository | None = None) -> bool:
     """Check index status, and return True if there are some uncommitted changes"""
-    res = _exec("git", "status", "--short", root=root)
-    return bool(res)
+    try:
+        return _native_is_dirty(root)
+    except UnsupportedRepositoryError as e:
+        _log_fallback(e)
 
+    return _exec_is_dirty(root=root)
 
-def count_since(name: str, root: str | os.PathLike | None = None) -> int | None:
-    """Get number of commits between HEAD and the commit, or None if they are not related"""
-    res = _exec("git", "rev-list", "--count", "HEAD", f"^{name}", root=root)
+
+def _native_count_since(name: str, root: str | os.PathLike | Repository | None = None) -> int | None:
+    refs = _ref_store(root)
+    head = refs.head_sha()
+    if head is None:
+        return None
+    commit = name if OID_REGEXP.match(name) else refs.rev_parse(name)
+    return History.load(refs.git_dir, refs).count(head, commit)
+
+
+def _parse_count(res: list[str]) -> int | None:
     if res:
         with suppress(ValueError, TypeError):
             return int(res[0])
     return None
+
+
+def count_since(name: str, root: str | os.PathLike | Repository | None = None) -> int | None:
+    """Get number of commits between HEAD and the commit, or None if they are not related"""
+    try:
+        return _native_count_since(name, root)
+    except UnsupportedRepositoryError as e:
+        _log_fallback(e)
+
+    res = _exec("git", "rev-list", "--count", "HEAD", f"^{name}", root=root)
+    return _parse_count(res)
+
+
+def _parse_description(res: list[str]) -> Description | None:
+    if res:
+        with suppress(ValueError):
+            tag, distance, sha = res[0].rsplit("-", 2)
+            if sha.startswith("g"):
+                return Description(tag, int(distance), sha[1:])
+    return None
+
+
+def describe(match: str, root: str | os.PathLike | Repository | None = None) -> Description | None:
+    """Describe HEAD using tags matching the glob pattern, or return None if there is no such tag in HEAD history.
+
+    ``distance`` can be greater than the result of :obj:`count_since`
+    if commits dates are not increasing, e.g. if commits were created at the same second.
+    """
+    # abbrev length is limited by hash length
+    res = _exec("git", "describe", "--tags", "--long", "--abbrev=64", "--match", match, "HEAD", root=root)
+    return _parse_description(res)
+
+
+def _tag_glob(filter_callback: Callable[[str], str | None] | None = None) -> str | None:
+    if filter_callback is None:
+        return "*"
+    # set by regexp-based filters, see tag_filter_factory
+    return getattr(filter_callback, "tag_glob", None)
+
+
+def _describe_nearest_tag(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    root: str | os.PathLike | Repository | None = None,
+) -> Description | None:
+    """Describe HEAD using tags matching the filter, or return ``None`` if tags are sorted by other field,
+    if tag filter cannot be expressed as a glob, or if there are no matching tags.
+    """
+    match = _tag_glob(filter_callback)
+    if sort_by != DEFAULT_SORT_BY or match is None:
+        return None
+
+    description = describe(match, root=root)
+    if description is not None:
+        log.log(DEBUG, "Nearest tag matching %r is %r", match, description.tag)
+    return description
+
+
+def get_latest_tag(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    root: str | os.PathLike | Repository | None = None,
+    *,
+    count_commits: bool = True,
+) -> tuple[str | None, str | None, int | None]:
+    """Return latest tag merged into HEAD history tree, its commit SHA-1 hash and number of commits since it.
+
+    If ``count_commits`` is ``False``, commits are not counted, and ``None`` may be returned instead of their number.
+    """
+    try:
+        tag = next(_iter_merged_tag_infos(sort_by, filter_callback, root=root), None)
+    except UnsupportedRepositoryError as e:
+        _log_fallback(e)
+        # if HEAD is tagged, 'git describe' returns the latest merged tag, unless some other tag was created after it.
+        # distance is not used otherwise, because 'git describe' counts commits wrong if their dates are not increasing
+        description = _describe_nearest_tag(sort_by, filter_callback, root=root)
+        if description is not None and description.distance == 0:
+            latest = _exec_tag_info(sort_by, filter_callback, merged=False, root=root)
+            if latest is not None and latest.name == description.tag:
+                return description.tag, description.sha, 0
+            log.log(DEBUG, "Tag %r may be not the latest one", description.tag)
+
+        tag = _exec_tag_info(sort_by, filter_callback, root=root)
+
+    if not tag:
+        return None, None, None
+    tag_sha = tag.commit or get_sha(tag.name, root=root)
+    distance = count_since(tag_sha, root=root) if tag_sha and count_commits else None
+    return tag.name, tag_sha, distance
+
+
+async def get_branches_async(root: str | os.PathLike | Repository | None = None) -> list[str]:
+    """Async version of :obj:`get_branches`"""
+    return await _run_in_thread(get_branches, root)
+
+
+async def get_branch_async(root: str | os.PathLike | Repository | None = None) -> str | None:
+    """Async version of :obj:`get_branch`"""
+    return await _run_in_thread(get_branch, root)
+
+
+async def get_all_tags_async(
+    sort_by: str = DEFAULT_SORT_BY,
+    root: str | os.PathLike | Repository | None = None,
+) -> list[str]:
+    """Async version of :obj:`get_all_tags`"""
+    return await _run_in_thread(get_all_tags, sort_by, root)
+
+
+async def get_tags_info_async(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    root: str | os.PathLike | Repository | None = None,
+) -> list[TagInfo]:
+    """Async version of :obj:`get_tags_info`"""
+    return await _run_in_thread(get_tags_info, sort_by, filter_callback, root)
+
+
+async def get_tags_async(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    root: str | os.PathLike | Repository | None = None,
+) -> list[str]:
+    """Async version of :obj:`get_tags`"""
+    return await _run_in_thread(get_tags, sort_by, filter_callback, root)
+
+
+async def get_tag_info_async(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    root: str | os.PathLike | Repository | None = None,
+) -> TagInfo | None:
+    """Async version of :obj:`get_tag_info`"""
+    return await _run_in_thread(get_tag_info, sort_by, filter_callback, root)
+
+
+async def get_tag_async(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    root: str | os.PathLike | Repository | None = None,
+) -> str | None:
+    """Async version of :obj:`get_tag`"""
+    return await _run_in_thread(get_tag, sort_by, filter_callback, root)
+
+
+async def get_sha_async(name: str = "HEAD", root: str | os.PathLike | Repository | None = None) -> str | None:
+    """Async version of :obj:`get_sha`"""
+    return await _run_in_thread(get_sha, name, root)
+
+
+async def get_latest_file_commit_async(
+    path: str | os.PathLike,
+    root: str | os.PathLike | Repository | None = None,
+) -> str | None:
+    """Async version of :obj:`get_latest_file_commit`"""
+    return await _run_in_thread(get_latest_file_commit, path, root)
+
+
+async def is_dirty_async(root: str | os.PathLike | Repository | None = None) -> bool:
+    """Async version of :obj:`is_dirty`"""
+    return await _run_in_thread(is_dirty, root)
+
+
+async def count_since_async(name: str, root: str | os.PathLike | Repository | None = None) -> int | None:
+    """Async version of :obj:`count_since`"""
+    return await _run_in_thread(count_since, name, root)
+
+
+async def describe_async(match: str, root: str | os.PathLike | Repository | None = None) -> Description | None:
+    """Async version of :obj:`describe`"""
+    return await _run_in_thread(describe, match, root)
+
+
+async def get_latest_tag_async(
+    sort_by: str = DEFAULT_SORT_BY,
+    filter_callback: Callable[[str], str | None] | None = None,
+    root: str | os.PathLike | Repository | None = None,
+    *,
+    count_commits: bool = True,
+) -> tuple[str | None, str | None, int | None]:
+    """Async version of :obj:`get_latest_tag`"""
+    return await _run_in_thread(get_latest_tag, sort_by, filter_callback, root, count_commits=count_commits)
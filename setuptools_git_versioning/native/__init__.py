@@ -0,0 +1,42 @@
+"""In-process readers of git repository files.
+
+These readers are used to answer the most common queries without spawning ``git`` executable.
+Each of them raises :obj:`UnsupportedRepositoryError` if the repository layout is not understood,
+and callers are expected to fall back to the ``git`` executable in such a case.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class UnsupportedRepositoryError(Exception):
+    """Repository layout cannot be handled without ``git`` executable"""
+
+
+def map_file(path: Path) -> bytes | mmap.mmap:
+    """Map file content into memory, or return empty bytes if file is empty"""
+    try:
+        with path.open("rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if not size:
+                return b""
+            if os.name == "nt":
+                # mapped file cannot be replaced or removed on Windows, but git does this all the time
+                return file.read(size)
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        raise
+    except OSError as e:
+        raise UnsupportedRepositoryError(str(e)) from e
+
+
+__all__ = [
+    "UnsupportedRepositoryError",
+    "map_file",
+]
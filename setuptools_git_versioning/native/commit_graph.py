@@ -0,0 +1,209 @@
+"""Reader of ``commit-graph`` files.
+
+See https://git-scm.com/docs/gitformat-commit-graph for format description.
+"""
+
+from __future__ import annotations
+
+import logging
+import struct
+from typing import TYPE_CHECKING
+
+from setuptools_git_versioning.log import DEBUG
+from setuptools_git_versioning.native import UnsupportedRepositoryError, map_file
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from setuptools_git_versioning.native.gitdir import GitDir
+
+log = logging.getLogger(__name__)
+
+SIGNATURE = b"CGPH"
+HEADER_SIZE = 8
+CHUNK_ENTRY_SIZE = 12
+HASH_LENGTHS = {1: 20, 2: 32}
+CHUNK_OID_FANOUT = b"OIDF"
+CHUNK_OID_LOOKUP = b"OIDL"
+CHUNK_COMMIT_DATA = b"CDAT"
+CHUNK_EXTRA_EDGES = b"EDGE"
+
+PARENT_NONE = 0x70000000
+PARENT_OCTOPUS = 0x80000000
+PARENT_MASK = 0x7FFFFFFF
+
+COMMIT_DATA = struct.Struct(">IIII")
+UINT32 = struct.Struct(">I")
+
+
+class CommitGraphFile:
+    """Single ``commit-graph`` file, or a layer of split commit-graph chain"""
+
+    def __init__(self, path: Path, offset: int = 0) -> None:
+        self.path = path
+        # number of commits in all base layers
+        self.offset = offset
+        self._buffer = map_file(path)
+
+        header = self._buffer[:HEADER_SIZE]
+        if len(header) < HEADER_SIZE or header[:4] != SIGNATURE or header[4] != 1 or header[5] not in HASH_LENGTHS:
+            msg = f"Unsupported commit-graph file '{path}'"
+            raise UnsupportedRepositoryError(msg)
+
+        self.hash_length = HASH_LENGTHS[header[5]]
+        chunks = {}
+        for i in range(header[6]):
+            position = HEADER_SIZE + i * CHUNK_ENTRY_SIZE
+            chunk_id = bytes(self._buffer[position : position + 4])
+            chunks[chunk_id] = struct.unpack_from(">Q", self._buffer, position + 4)[0]
+
+        missing = {CHUNK_OID_FANOUT, CHUNK_OID_LOOKUP, CHUNK_COMMIT_DATA} - chunks.keys()
+        if missing:
+            msg = f"Chunks {sorted(missing)} are missing in commit-graph file '{path}'"
+            raise UnsupportedRepositoryError(msg)
+
+        self._fanout = chunks[CHUNK_OID_FANOUT]
+        self._lookup = chunks[CHUNK_OID_LOOKUP]
+        self._data = chunks[CHUNK_COMMIT_DATA]
+        self._edges = chunks.get(CHUNK_EXTRA_EDGES)
+        self.size = self._uint32(self._fanout + 255 * 4)
+
+    def _uint32(self, position: int) -> int:
+        return UINT32.unpack_from(self._buffer, position)[0]
+
+    def find(self, oid: bytes) -> int | None:
+        """Return global position of commit in the graph, or ``None`` if there is no such commit in this layer"""
+        first = oid[0]
+        low = self._uint32(self._fanout + (first - 1) * 4) if first else 0
+        high = self._uint32(self._fanout + first * 4)
+        while low < high:
+            middle = (low + high) // 2
+            position = self._lookup + middle * self.hash_length
+            current = self._buffer[position : position + self.hash_length]
+            if current < oid:
+                low = middle + 1
+            elif current > oid:
+                high = middle
+            else:
+                return self.offset + middle
+        return None
+
+    def oid(self, index: int) -> bytes:
+        position = self._lookup + (index - self.offset) * self.hash_length
+        return bytes(self._buffer[position : position + self.hash_length])
+
+    def commit_data(self, index: int) -> tuple[bytes, list[int], int, int]:
+        """Return tree, parents, generation and commit time of a commit"""
+        position = self._data + (index - self.offset) * (self.hash_length + 16)
+        tree = bytes(self._buffer[position : position + self.hash_length])
+        parent1, parent2, generation, time = COMMIT_DATA.unpack_from(self._buffer, position + self.hash_length)
+
+        parents = []
+        if parent1 != PARENT_NONE:
+            parents.append(parent1)
+        if parent2 & PARENT_OCTOPUS:
+            parents.extend(self._octopus_parents(parent2 & PARENT_MASK))
+        elif parent2 != PARENT_NONE:
+            parents.append(parent2)
+
+        commit_time = ((generation & 0x3) << 32) | time
+        return tree, parents, generation >> 2, commit_time
+
+    def _octopus_parents(self, index: int) -> list[int]:
+        if self._edges is None:
+            msg = f"Extra edges chunk is missing in commit-graph file '{self.path}'"
+            raise UnsupportedRepositoryError(msg)
+
+        parents = []
+        while True:
+            value = self._uint32(self._edges + index * 4)
+            parents.append(value & PARENT_MASK)
+            if value & PARENT_OCTOPUS:
+                return parents
+            index += 1
+
+
+class CommitGraph:
+    """Commit-graph of the repository, either a single file or a split chain"""
+
+    def __init__(self, layers: list[CommitGraphFile]) -> None:
+        self.layers = layers
+        self.hash_length = layers[0].hash_length
+        self.size = sum(layer.size for layer in layers)
+
+    def _layer(self, index: int) -> CommitGraphFile:
+        for layer in self.layers:
+            if index < layer.offset + layer.size:
+                return layer
+
+        msg = f"Commit position {index} is out of commit-graph bounds"
+        raise UnsupportedRepositoryError(msg)
+
+    def find(self, oid: str) -> int | None:
+        """Return position of commit in the graph, or ``None`` if it is not present here"""
+        raw = bytes.fromhex(oid)
+        if len(raw) != self.hash_length:
+            msg = f"Object id {oid!r} does not match commit-graph hash length"
+            raise UnsupportedRepositoryError(msg)
+
+        for layer in reversed(self.layers):
+            index = layer.find(raw)
+            if index is not None:
+                return index
+        return None
+
+    def oid(self, index: int) -> str:
+        return self._layer(index).oid(index).hex()
+
+    def tree(self, index: int) -> str:
+        return self._layer(index).commit_data(index)[0].hex()
+
+    def parents(self, index: int) -> list[int]:
+        return self._layer(index).commit_data(index)[1]
+
+    def generation(self, index: int) -> int:
+        """Return topological level of a commit, which is always greater than level of any of its parents"""
+        generation = self._layer(index).commit_data(index)[2]
+        if not generation:
+            # graph was written by very old git version
+            msg = "Commit-graph does not contain generation numbers"
+            raise UnsupportedRepositoryError(msg)
+        return generation
+
+    def commit_time(self, index: int) -> int:
+        return self._layer(index).commit_data(index)[3]
+
+
+def load_commit_graph(git_dir: GitDir) -> CommitGraph:
+    """Load commit-graph of the repository, or raise :obj:`UnsupportedRepositoryError` if there is none"""
+    info = git_dir.common_dir.joinpath("objects", "info")
+
+    try:
+        result = CommitGraph([CommitGraphFile(info.joinpath("commit-graph"))])
+    except FileNotFoundError:
+        pass
+    else:
+        log.log(DEBUG, "Using commit-graph file '%s'", info.joinpath("commit-graph"))
+        return result
+
+    graphs = info.joinpath("commit-graphs")
+    try:
+        chain = graphs.joinpath("commit-graph-chain").read_text().split()
+    except FileNotFoundError as e:
+        msg = "Repository does not have commit-graph"
+        raise UnsupportedRepositoryError(msg) from e
+
+    layers: list[CommitGraphFile] = []
+    try:
+        for graph_hash in chain:
+            offset = layers[-1].offset + layers[-1].size if layers else 0
+            layers.append(CommitGraphFile(graphs.joinpath(f"graph-{graph_hash}.graph"), offset))
+    except FileNotFoundError as e:
+        raise UnsupportedRepositoryError(str(e)) from e
+
+    if not layers:
+        msg = "Commit-graph chain is empty"
+        raise UnsupportedRepositoryError(msg)
+
+    log.log(DEBUG, "Using commit-graph chain of %d files", len(layers))
+    return CommitGraph(layers)
@@ -0,0 +1,218 @@
+"""Reader of git config files.
+
+See https://git-scm.com/docs/git-config for syntax and locations of the files.
+Only plain values are supported, config with ``include`` or ``includeIf`` sections
+raises ``UnsupportedRepositoryError``.
+System config is read from '/etc/gitconfig', git built with another prefix may use different location.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+
+if TYPE_CHECKING:
+    from setuptools_git_versioning.native.gitdir import GitDir
+
+SYSTEM_CONFIG = Path("/etc/gitconfig")
+
+SECTION_REGEXP = re.compile(r'\[[ \t]*([-.\w]+)(?:[ \t]+"((?:[^"\\\n]|\\.)*)")?[ \t]*\]')
+KEY_REGEXP = re.compile(r"([A-Za-z][-A-Za-z0-9]*)[ \t]*")
+ESCAPES = {"n": "\n", "t": "\t", "b": "\b", "\\": "\\", '"': '"'}
+
+TRUE_VALUES = ("true", "yes", "on")
+FALSE_VALUES = ("false", "no", "off", "")
+
+
+def _skip_line(content: str, position: int) -> int:
+    end = content.find("\n", position)
+    return len(content) if end < 0 else end + 1
+
+
+def _read_escape(content: str, position: int) -> tuple[str, int]:
+    """Return character escaped with backslash, and position after it"""
+    char = content[position : position + 1]
+    if char == "\n":
+        # line continuation
+        return "", position + 1
+
+    if char not in ESCAPES:
+        msg = f"Invalid escape sequence '\\{char}'"
+        raise ValueError(msg)
+    return ESCAPES[char], position + 1
+
+
+def _parse_value(content: str, position: int) -> tuple[str, int]:
+    """Parse value after ``=``, and return it with position after the end of line"""
+    value = ""
+    # unquoted whitespace is replaced with spaces, and trimmed at both ends
+    spaces = 0
+    quoted = False
+    while position < len(content):
+        char = content[position]
+        position += 1
+        if char == "\n":
+            break
+
+        if not quoted and char in "#;":
+            position = _skip_line(content, position)
+            break
+
+        if not quoted and char.isspace():
+            if value:
+                spaces += 1
+            continue
+
+        if spaces:
+            value += " " * spaces
+            spaces = 0
+
+        if char == '"':
+            quoted = not quoted
+        elif char == "\\":
+            escaped, position = _read_escape(content, position)
+            value += escaped
+        else:
+            value += char
+
+    if quoted:
+        msg = "Unterminated quoted value"
+        raise ValueError(msg)
+    return value, position
+
+
+def parse_config(content: str) -> list[tuple[str, str | None]]:
+    """Return list of ``(name, value)`` pairs in the order they are defined.
+
+    Section and key names are lowercased, value is ``None`` for keys without ``=``, which means boolean ``true``.
+    """
+    result: list[tuple[str, str | None]] = []
+    section = None
+    position = 0
+    while position < len(content):
+        char = content[position]
+        if char.isspace():
+            position += 1
+            continue
+
+        if char in "#;":
+            position = _skip_line(content, position)
+            continue
+
+        if char == "[":
+            match = SECTION_REGEXP.match(content, position)
+            if not match:
+                msg = f"Invalid section header at position {position}"
+                raise ValueError(msg)
+
+            name, subsection = match.groups()
+            section = name.lower()
+            if subsection is not None:
+                # unlike section names, subsections are case sensitive
+                section += "." + re.sub(r"\\(.)", r"\1", subsection)
+            position = match.end()
+            continue
+
+        match = KEY_REGEXP.match(content, position)
+        if not match or section is None:
+            msg = f"Invalid config line at position {position}"
+            raise ValueError(msg)
+
+        name = f"{section}.{match.group(1).lower()}"
+        position = match.end()
+        value = None
+        if content.startswith("=", position):
+            value, position = _parse_value(content, position + 1)
+        elif content[position : position + 1] not in ("", "\n", "\r", "#", ";"):
+            msg = f"Invalid config line at position {position}"
+            raise ValueError(msg)
+        else:
+            position = _skip_line(content, position)
+        result.append((name, value))
+    return result
+
+
+def xdg_config_path(name: str) -> Path:
+    """Return path of git file in ``$XDG_CONFIG_HOME``, like 'ignore' or 'attributes'"""
+    xdg_config_home = os.environ.get("XDG_CONFIG_HOME") or Path.home().joinpath(".config")
+    return Path(xdg_config_home, "git", name)
+
+
+class GitConfig:
+    """Values of config variables, from the lowest precedence to the highest one"""
+
+    def __init__(self) -> None:
+        self.values: dict[str, list[str | None]] = {}
+
+    def read(self, path: Path) -> None:
+        try:
+            content = path.read_bytes()
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        except OSError as e:
+            raise UnsupportedRepositoryError(str(e)) from e
+
+        try:
+            items = parse_config(content.decode("utf-8", errors="surrogateescape"))
+        except ValueError as e:
+            msg = f"Cannot parse config file '{path}': {e}"
+            raise UnsupportedRepositoryError(msg) from e
+
+        for name, value in items:
+            if name.startswith(("include.", "includeif.")):
+                msg = f"Config file '{path}' includes other files"
+                raise UnsupportedRepositoryError(msg)
+            self.values.setdefault(name, []).append(value)
+
+    def get(self, name: str) -> str | None:
+        """Return the last value of variable, or ``None`` if it is not set"""
+        values = self.values.get(name.lower())
+        if not values:
+            return None
+
+        value = values[-1]
+        return "true" if value is None else value
+
+    def get_bool(self, name: str, *, default: bool) -> bool:
+        value = self.get(name)
+        if value is None:
+            return default
+
+        value = value.lower()
+        if value in TRUE_VALUES or value in FALSE_VALUES:
+            return value in TRUE_VALUES
+
+        try:
+            return int(value) != 0
+        except ValueError:
+            msg = f"Config option '{name}' has invalid boolean value {value!r}"
+            raise UnsupportedRepositoryError(msg) from None
+
+    def get_path(self, name: str) -> Path | None:
+        value = self.get(name)
+        if not value:
+            return None
+        return Path(value).expanduser()
+
+
+def read_config(git_dir: GitDir) -> GitConfig:
+    """Read system, global, local and worktree config files, in this order"""
+    config = GitConfig()
+    if os.environ.get("GIT_CONFIG_NOSYSTEM", "").lower() in (*FALSE_VALUES, "0"):
+        config.read(Path(os.environ.get("GIT_CONFIG_SYSTEM") or SYSTEM_CONFIG))
+
+    global_config = os.environ.get("GIT_CONFIG_GLOBAL")
+    if global_config:
+        config.read(Path(global_config))
+    else:
+        config.read(xdg_config_path("config"))
+        config.read(Path.home().joinpath(".gitconfig"))
+
+    config.read(git_dir.common_dir.joinpath("config"))
+    if config.get_bool("extensions.worktreeConfig", default=False):
+        config.read(git_dir.path.joinpath("config.worktree"))
+    return config
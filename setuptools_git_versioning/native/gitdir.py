@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+
+from setuptools_git_versioning.log import DEBUG
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+
+log = logging.getLogger(__name__)
+
+# these variables change the way git discovers and reads the repository,
+# it is easier to let git handle them by itself
+GIT_ENV_OVERRIDES = (
+    "GIT_DIR",
+    "GIT_WORK_TREE",
+    "GIT_COMMON_DIR",
+    "GIT_CEILING_DIRECTORIES",
+    "GIT_DISCOVERY_ACROSS_FILESYSTEM",
+    "GIT_NAMESPACE",
+    "GIT_OBJECT_DIRECTORY",
+    "GIT_ALTERNATE_OBJECT_DIRECTORIES",
+    "GIT_INDEX_FILE",
+    "GIT_REPLACE_REF_BASE",
+    "GIT_NO_REPLACE_OBJECTS",
+    "GIT_GRAFT_FILE",
+    "GIT_SHALLOW_FILE",
+    "GIT_CONFIG_PARAMETERS",
+    "GIT_CONFIG_COUNT",
+)
+
+
+class GitDir:
+    """Location of repository files, discovered the same way as git does.
+
+    ``path`` is a directory with per-worktree files like ``HEAD`` and ``index``,
+    ``common_dir`` contains files shared between worktrees, like ``refs``, ``packed-refs`` and ``objects``.
+    For the main worktree both paths are the same.
+    """
+
+    def __init__(self, path: Path, common_dir: Path, work_tree: Path) -> None:
+        self.path = path
+        self.common_dir = common_dir
+        self.work_tree = work_tree
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r}, common_dir={self.common_dir!r})"
+
+
+def _is_git_dir(path: Path, common_dir: Path | None = None) -> bool:
+    common_dir = common_dir or path
+    return (
+        path.joinpath("HEAD").is_file()
+        and common_dir.joinpath("objects").is_dir()
+        and common_dir.joinpath("refs").is_dir()
+    )
+
+
+def _read_gitfile(path: Path) -> Path:
+    content = path.read_text().strip()
+    if not content.startswith("gitdir: "):
+        msg = f"Unknown format of '{path}' file"
+        raise UnsupportedRepositoryError(msg)
+
+    return path.parent.joinpath(content[len("gitdir: ") :]).resolve()
+
+
+def _check_ownership(*paths: Path) -> None:
+    # git refuses to work with repositories owned by someone else unless 'safe.directory' is set,
+    # do not bypass this check
+    if not hasattr(os, "geteuid"):
+        return
+
+    uid = os.geteuid()
+    for path in paths:
+        if path.stat().st_uid != uid:
+            msg = f"'{path}' is owned by another user"
+            raise UnsupportedRepositoryError(msg)
+
+
+def _open_git_dir(path: Path, work_tree: Path) -> GitDir:
+    common_dir = path
+    commondir_file = path.joinpath("commondir")
+    if commondir_file.is_file():
+        common_dir = path.joinpath(commondir_file.read_text().strip()).resolve()
+
+    if not _is_git_dir(path, common_dir):
+        msg = f"'{path}' is not a valid git directory"
+        raise UnsupportedRepositoryError(msg)
+
+    if common_dir.joinpath("reftable").exists():
+        msg = "reftable format is not supported"
+        raise UnsupportedRepositoryError(msg)
+
+    _check_ownership(work_tree, path)
+    return GitDir(path, common_dir, work_tree)
+
+
+def find_git_dir(root: str | os.PathLike | None = None) -> GitDir:
+    """Find repository containing ``root`` folder, or raise :obj:`UnsupportedRepositoryError`"""
+    overrides = [name for name in GIT_ENV_OVERRIDES if name in os.environ]
+    if overrides:
+        msg = f"Environment variables {overrides} are set"
+        raise UnsupportedRepositoryError(msg)
+
+    start = Path(root).resolve() if root else Path.cwd()
+    try:
+        device = start.stat().st_dev
+        for directory in (start, *start.parents):
+            if directory.stat().st_dev != device:
+                msg = f"Crossing filesystem boundary at '{directory}'"
+                raise UnsupportedRepositoryError(msg)
+
+            dot_git = directory.joinpath(".git")
+            if dot_git.is_file():
+                path = _read_gitfile(dot_git)
+            elif dot_git.is_dir():
+                path = dot_git
+            elif _is_git_dir(directory):
+                msg = f"'{directory}' is a bare repository"
+                raise UnsupportedRepositoryError(msg)
+            else:
+                continue
+
+            result = _open_git_dir(path, directory)
+            log.log(DEBUG, "Found %r", result)
+            return result
+    except OSError as e:
+        raise UnsupportedRepositoryError(str(e)) from e
+
+    msg = f"'{start}' is not inside a git repository"
+    raise UnsupportedRepositoryError(msg)
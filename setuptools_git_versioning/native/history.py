@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import heapq
+import logging
+from typing import TYPE_CHECKING, NamedTuple
+
+from setuptools_git_versioning.log import DEBUG
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+from setuptools_git_versioning.native.commit_graph import CommitGraph, load_commit_graph
+
+if TYPE_CHECKING:
+    from setuptools_git_versioning.native.gitdir import GitDir
+    from setuptools_git_versioning.native.objects import Commit, ObjectStore
+    from setuptools_git_versioning.native.refs import RefStore
+
+log = logging.getLogger(__name__)
+
+# commits created after commit-graph was written are read from object store, up to this number
+MAX_COMMITS_OUTSIDE_GRAPH = 1000
+
+# commit flags used while walking the history
+REACHABLE = 1
+EXCLUDED = 2
+
+
+def check_plain_history(git_dir: GitDir, refs: RefStore) -> None:
+    """Check that repository history is not altered by shallow clone, grafts or replace refs.
+
+    git does not use commit-graph in such repositories, and so should we.
+    """
+    common_dir = git_dir.common_dir
+    for path in (
+        common_dir.joinpath("shallow"),
+        common_dir.joinpath("info", "grafts"),
+        common_dir.joinpath("objects", "info", "alternates"),
+    ):
+        if path.exists():
+            msg = f"Repository history is altered by '{path}'"
+            raise UnsupportedRepositoryError(msg)
+
+    if refs.iter_refs("refs/replace/"):
+        msg = "Repository history is altered by replace refs"
+        raise UnsupportedRepositoryError(msg)
+
+
+class CommitData(NamedTuple):
+    tree: str
+    parents: list[int]
+    generation: int
+    commit_time: int
+
+
+class History:
+    """Walker over commit history.
+
+    Commits are identified by their positions in commit-graph. Commits created after commit-graph was written
+    are read from object store, and get positions after the last commit of the graph.
+    """
+
+    def __init__(self, graph: CommitGraph, objects: ObjectStore | None = None) -> None:
+        self.graph = graph
+        self.objects = objects
+        self._extra_positions: dict[str, int] = {}
+        self._extra_commits: list[CommitData] = []
+
+    @classmethod
+    def load(cls, git_dir: GitDir, refs: RefStore) -> History:
+        check_plain_history(git_dir, refs)
+        return cls(load_commit_graph(git_dir), refs.objects)
+
+    def _find(self, oid: str) -> int | None:
+        position = self.graph.find(oid)
+        if position is None:
+            return self._extra_positions.get(oid)
+        return position
+
+    def position(self, oid: str) -> int:
+        position = self._find(oid)
+        if position is None:
+            return self._read_commits(oid)
+        return position
+
+    def _read_commits(self, oid: str) -> int:
+        """Read commit and all its ancestors which are not present in commit-graph, and return commit position.
+
+        Commit-graph contains all ancestors of its commits, so only a few recent commits should be read.
+        """
+        if self.objects is None:
+            msg = f"Commit {oid!r} is not present in commit-graph"
+            raise UnsupportedRepositoryError(msg)
+
+        commits: dict[str, Commit] = {}
+        stack = [oid]
+        while stack:
+            current = stack[-1]
+            commit = commits.get(current)
+            if commit is None:
+                if len(self._extra_commits) + len(commits) >= MAX_COMMITS_OUTSIDE_GRAPH:
+                    msg = "Too many commits are not present in commit-graph"
+                    raise UnsupportedRepositoryError(msg)
+
+                commit = commits[current] = self.objects.read_commit(current)
+                missing = [parent for parent in commit.parents if self._find(parent) is None]
+                if missing:
+                    # parents should get their positions first
+                    stack.extend(missing)
+                    continue
+
+            stack.pop()
+            if self._find(current) is not None:
+                continue
+
+            parents = [self.position(parent) for parent in commit.parents]
+            generation = max((self.generation(parent) for parent in parents), default=0) + 1
+            self._extra_positions[current] = self.graph.size + len(self._extra_commits)
+            self._extra_commits.append(CommitData(commit.tree, parents, generation, commit.commit_time))
+
+        log.log(DEBUG, "Read %d commits which are not present in commit-graph", len(commits))
+        return self._extra_positions[oid]
+
+    def _extra_commit(self, position: int) -> CommitData | None:
+        index = position - self.graph.size
+        return self._extra_commits[index] if index >= 0 else None
+
+    def parents(self, position: int) -> list[int]:
+        extra = self._extra_commit(position)
+        return extra.parents if extra else self.graph.parents(position)
+
+    def generation(self, position: int) -> int:
+        extra = self._extra_commit(position)
+        return extra.generation if extra else self.graph.generation(position)
+
+    def count(self, head: str, exclude: str) -> int:
+        """Return number of commits reachable from ``head`` but not from ``exclude``, like
+        ``git rev-list --count head ^exclude`` does.
+
+        Commits are visited in order of decreasing generation number, so by the time commit is visited,
+        all its descendants are already visited, and its flags cannot change anymore.
+        Walk stops as soon as there are no commits left which are reachable from ``head`` only.
+        """
+        flags: dict[int, int] = {}
+        queue: list[tuple[int, int]] = []
+        # number of queued commits which are reachable from head only
+        pending = 0
+
+        def push(position: int, flag: int) -> None:
+            nonlocal pending
+            old = flags.get(position, 0)
+            new = old | flag
+            if new == old:
+                return
+
+            flags[position] = new
+            if not old:
+                heapq.heappush(queue, (-self.generation(position), position))
+                pending += new == REACHABLE
+            elif old == REACHABLE:
+                pending -= 1
+
+        push(self.position(head), REACHABLE)
+        push(self.position(exclude), EXCLUDED)
+
+        result = 0
+        while pending:
+            _, position = heapq.heappop(queue)
+            flag = flags[position]
+            if flag == REACHABLE:
+                pending -= 1
+                result += 1
+
+            for parent in self.parents(position):
+                push(parent, flag)
+
+        log.log(DEBUG, "Visited %d commits", len(flags))
+        return result
+
+    def commit_time(self, oid: str) -> int:
+        position = self.position(oid)
+        extra = self._extra_commit(position)
+        return extra.commit_time if extra else self.graph.commit_time(position)
+
+    def tree(self, oid: str) -> str:
+        position = self.position(oid)
+        extra = self._extra_commit(position)
+        return extra.tree if extra else self.graph.tree(position)
+
+    def reachable_from(self, head: str) -> Reachability:
+        return Reachability(self, head)
+
+
+class Reachability:
+    """Incremental check if commits are reachable from ``head``.
+
+    History is walked lazily in order of decreasing generation number, only as deep as the generation
+    of the checked commit, because any path to it goes through commits with higher generation numbers.
+    Subsequent checks continue the walk from where the previous one stopped.
+    """
+
+    def __init__(self, history: History, head: str) -> None:
+        self.history = history
+
+        head_position = history.position(head)
+        self._seen = {head_position}
+        self._queue = [(-history.generation(head_position), head_position)]
+
+    def __contains__(self, oid: str) -> bool:
+        position = self.history.position(oid)
+        generation = self.history.generation(position)
+
+        queue = self._queue
+        while queue and -queue[0][0] > generation:
+            _, current = heapq.heappop(queue)
+            for parent in self.history.parents(current):
+                if parent not in self._seen:
+                    self._seen.add(parent)
+                    heapq.heappush(queue, (-self.history.generation(parent), parent))
+
+        return position in self._seen
@@ -0,0 +1,216 @@
+"""Matcher of ``.gitignore`` patterns.
+
+See https://git-scm.com/docs/gitignore for patterns syntax.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, NamedTuple
+
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# see 'man 7 regex'
+CHARACTER_CLASSES = {
+    b"alnum": rb"a-zA-Z0-9",
+    b"alpha": rb"a-zA-Z",
+    b"blank": rb" \t",
+    b"cntrl": rb"\x00-\x1f\x7f",
+    b"digit": rb"0-9",
+    b"graph": rb"\x21-\x7e",
+    b"lower": rb"a-z",
+    b"print": rb"\x20-\x7e",
+    b"punct": rb"!-/:-@\[-`{-~",
+    b"space": rb" \t\n\r\f\v",
+    b"upper": rb"A-Z",
+    b"xdigit": rb"0-9A-Fa-f",
+}
+
+
+class IgnorePattern(NamedTuple):
+    regexp: re.Pattern
+    negative: bool
+    directory_only: bool
+    # patterns without slashes are matched against file name at any level
+    basename_only: bool
+    # path of directory containing .gitignore file, relative to worktree root
+    base: bytes
+
+
+def _trim_trailing_spaces(line: bytes) -> bytes:
+    trailing_start = None
+    position = 0
+    while position < len(line):
+        char = line[position : position + 1]
+        if char == b"\\":
+            # escaped space is not trimmed
+            position += 2
+            trailing_start = None
+            continue
+
+        if char != b" ":
+            trailing_start = None
+        elif trailing_start is None:
+            trailing_start = position
+        position += 1
+
+    return line if trailing_start is None else line[:trailing_start]
+
+
+def _translate_class(pattern: bytes, start: int) -> tuple[bytes, int]:
+    """Convert ``[...]`` wildcard to regexp, and return it with position after the closing bracket"""
+    position = start + 1
+    negative = pattern[position : position + 1] in (b"!", b"^")
+    if negative:
+        position += 1
+
+    members = []
+    first = True
+    while position < len(pattern):
+        char = pattern[position : position + 1]
+        if char == b"]" and not first:
+            break
+        first = False
+
+        if char == b"[" and pattern[position + 1 : position + 2] == b":":
+            end = pattern.find(b":]", position + 2)
+            name = pattern[position + 2 : end]
+            if end < 0 or name not in CHARACTER_CLASSES:
+                msg = f"Unsupported character class in {pattern!r}"
+                raise UnsupportedRepositoryError(msg)
+            members.append(CHARACTER_CLASSES[name])
+            position = end + 2
+            continue
+
+        if char == b"\\":
+            position += 1
+            char = pattern[position : position + 1]
+
+        if pattern[position + 1 : position + 2] == b"-" and pattern[position + 2 : position + 3] not in (b"]", b""):
+            members.append(re.escape(char) + b"-" + re.escape(pattern[position + 2 : position + 3]))
+            position += 3
+        else:
+            members.append(re.escape(char))
+            position += 1
+
+    if position >= len(pattern):
+        msg = f"Unterminated character class in {pattern!r}"
+        raise UnsupportedRepositoryError(msg)
+
+    # wildcards never match slash
+    return b"(?!/)[" + (b"^" if negative else b"") + b"".join(members) + b"]", position + 1
+
+
+def translate(pattern: bytes) -> bytes:
+    """Convert wildcard pattern to regexp, like ``wildmatch(pattern, path, WM_PATHNAME)`` does"""
+    result = []
+    position = 0
+    while position < len(pattern):
+        char = pattern[position : position + 1]
+        if char == b"*":
+            end = position
+            while pattern[end : end + 1] == b"*":
+                end += 1
+
+            after_slash = position == 0 or pattern[position - 1 : position] == b"/"
+            if end - position > 1 and after_slash and end == len(pattern):
+                # trailing '/**' matches everything inside
+                result.append(b".*")
+            elif end - position > 1 and after_slash and pattern[end : end + 1] == b"/":
+                # '**/' matches zero or more directories
+                result.append(b"(?:.*/)?")
+                end += 1
+            else:
+                result.append(b"[^/]*")
+            position = end
+        elif char == b"?":
+            result.append(b"[^/]")
+            position += 1
+        elif char == b"[":
+            regexp, position = _translate_class(pattern, position)
+            result.append(regexp)
+        elif char == b"\\":
+            if position + 1 >= len(pattern):
+                msg = f"Trailing backslash in {pattern!r}"
+                raise UnsupportedRepositoryError(msg)
+            result.append(re.escape(pattern[position + 1 : position + 2]))
+            position += 2
+        else:
+            result.append(re.escape(char))
+            position += 1
+
+    return b"".join(result)
+
+
+def parse_patterns(content: bytes, base: bytes = b"") -> list[IgnorePattern]:
+    result = []
+    for raw_line in content.split(b"\n"):
+        line = _trim_trailing_spaces(raw_line)
+        if not line or line.startswith(b"#"):
+            continue
+
+        negative = line.startswith(b"!")
+        if negative:
+            line = line[1:]
+
+        directory_only = line.endswith(b"/")
+        if directory_only:
+            line = line[:-1]
+
+        basename_only = b"/" not in line
+        if line.startswith(b"/"):
+            line = line[1:]
+
+        if not line:
+            continue
+
+        regexp = re.compile(translate(line), re.DOTALL)
+        result.append(IgnorePattern(regexp, negative, directory_only, basename_only, base))
+    return result
+
+
+def read_patterns(path: Path, base: bytes = b"") -> list[IgnorePattern]:
+    if path.is_symlink():
+        # git does not follow symlinks for .gitignore files
+        msg = f"'{path}' is a symlink"
+        raise UnsupportedRepositoryError(msg)
+
+    try:
+        return parse_patterns(path.read_bytes(), base)
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+class IgnoreRules:
+    """Stack of pattern lists, from the lowest precedence to the highest one"""
+
+    def __init__(self, pattern_lists: list[list[IgnorePattern]] | None = None) -> None:
+        self.pattern_lists = [patterns for patterns in pattern_lists or [] if patterns]
+
+    def extend(self, patterns: list[IgnorePattern]) -> IgnoreRules:
+        if not patterns:
+            return self
+        return IgnoreRules([*self.pattern_lists, patterns])
+
+    def is_ignored(self, path: bytes, *, is_dir: bool) -> bool:
+        """Check if path relative to worktree root is ignored, assuming that its parent directory is not"""
+        basename = path.rsplit(b"/", 1)[-1]
+        for patterns in reversed(self.pattern_lists):
+            # last matching pattern wins
+            for pattern in reversed(patterns):
+                if pattern.directory_only and not is_dir:
+                    continue
+
+                if pattern.basename_only:
+                    target = basename
+                elif path.startswith(pattern.base):
+                    target = path[len(pattern.base) :]
+                else:
+                    continue
+
+                if pattern.regexp.fullmatch(target):
+                    return not pattern.negative
+        return False
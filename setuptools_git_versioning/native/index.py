@@ -0,0 +1,362 @@
+"""Reader of ``.git/index`` file.
+
+See https://git-scm.com/docs/index-format for format description.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import struct
+from typing import TYPE_CHECKING, Callable, NamedTuple, TypeVar
+
+from setuptools_git_versioning.log import DEBUG
+from setuptools_git_versioning.native import UnsupportedRepositoryError, map_file
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SIGNATURE = b"DIRC"
+HEADER = struct.Struct(">4sII")
+STAT_DATA = struct.Struct(">10I")
+FLAGS = struct.Struct(">H")
+EXTENSION = struct.Struct(">4sI")
+UINT32 = struct.Struct(">I")
+UINT64 = struct.Struct(">Q")
+# ctime, mtime, dev, ino, uid, gid and size, stored by the untracked cache
+UNTRACKED_STAT_DATA = struct.Struct(">9I")
+SUPPORTED_VERSIONS = (2, 3, 4)
+
+FLAG_ASSUME_VALID = 0x8000
+FLAG_EXTENDED = 0x4000
+FLAG_STAGE_MASK = 0x3000
+EXTENDED_SKIP_WORKTREE = 0x4000
+EXTENDED_INTENT_TO_ADD = 0x2000
+
+EXTENSION_CACHE_TREE = b"TREE"
+EXTENSION_UNTRACKED_CACHE = b"UNTR"
+EXTENSION_FSMONITOR = b"FSMN"
+# these extensions change the meaning of index entries
+EXTENSIONS_UNSUPPORTED = (b"link", b"sdir")
+
+
+class IndexEntry(NamedTuple):
+    path: bytes
+    mode: int
+    oid: bytes
+    size: int
+    mtime: tuple[int, int]
+    ctime: tuple[int, int]
+    ino: int
+    uid: int
+    gid: int
+    stage: int
+    assume_valid: bool
+    skip_worktree: bool
+    intent_to_add: bool
+
+
+def _decode_varint(buffer: bytes, position: int) -> tuple[int, int]:
+    byte = buffer[position]
+    position += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = buffer[position]
+        position += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, position
+
+
+def _find_nul(buffer: bytes, position: int) -> int:
+    # mmap objects do not have 'index' method
+    end = buffer.find(b"\0", position)
+    if end < 0:
+        msg = "Unterminated path"
+        raise ValueError(msg)
+    return end
+
+
+def _read_ewah(buffer: bytes, position: int) -> tuple[list[int], int]:
+    """Read EWAH compressed bitmap, and return positions of set bits with position after the bitmap"""
+    bit_count, word_count = struct.unpack_from(">II", buffer, position)
+    position += 8
+    words = struct.unpack_from(f">{word_count}Q", buffer, position)
+    # words are followed by position of the last marker word
+    position += word_count * UINT64.size + UINT32.size
+
+    result: list[int] = []
+    offset = 0
+    marker = 0
+    while marker < word_count:
+        # marker word contains run of identical words, followed by a number of literal words
+        running_bit = words[marker] & 1
+        running_length = (words[marker] >> 1) & 0xFFFFFFFF
+        literal_count = words[marker] >> 33
+        if running_bit:
+            result.extend(range(offset, offset + running_length * 64))
+        offset += running_length * 64
+
+        for word in words[marker + 1 : marker + 1 + literal_count]:
+            result.extend(offset + bit for bit in range(64) if word >> bit & 1)
+            offset += 64
+        marker += literal_count + 1
+
+    return [bit for bit in result if bit < bit_count], position
+
+
+class CachedDirectory:
+    """Directory listing stored in the untracked cache by ``git status``.
+
+    ``untracked`` contains names of untracked files, and names of untracked directories with trailing slash.
+    Listing is up to date only if ``valid`` is set, and the directory still has the same stat data as ``stat``.
+    If ``check_only`` is set, listing was stopped at the first untracked entry.
+    """
+
+    def __init__(self, name: bytes, untracked: list[bytes]) -> None:
+        self.name = name
+        self.untracked = untracked
+        self.dirs: list[CachedDirectory] = []
+        self.valid = False
+        self.check_only = False
+        self.stat: tuple[int, ...] = ()
+        # object id of '.gitignore' file in this directory, or None if there is no such file
+        self.exclude_oid: bytes | None = None
+
+
+class UntrackedCache(NamedTuple):
+    # environments the cache can be used in, like "Location /path/to/worktree, system Linux"
+    ident: list[bytes]
+    dir_flags: int
+    # object ids of 'info/exclude' and 'core.excludesFile', or None if file does not exist
+    info_exclude_oid: bytes | None
+    excludes_file_oid: bytes | None
+    exclude_per_dir: bytes
+    root: CachedDirectory | None
+
+
+class Index:
+    """Parsed index file.
+
+    ``tree`` is an object id of the tree built from index entries, as stored in cache-tree extension,
+    or ``None`` if it is not known.
+    """
+
+    def __init__(self, path: Path, hash_length: int = 20) -> None:
+        self.path = path
+        self.hash_length = hash_length
+        self.entries: list[IndexEntry] = []
+        self.tree: bytes | None = None
+        self.untracked_cache: UntrackedCache | None = None
+        # positions of entries which may be changed since the last file system monitor query
+        self.fsmonitor_dirty: list[int] | None = None
+        self.extensions: list[bytes] = []
+
+        stat = path.stat()
+        self.mtime = (int(stat.st_mtime), stat.st_mtime_ns % 1_000_000_000)
+
+        buffer = map_file(path)
+        signature, self.version, count = HEADER.unpack_from(buffer, 0)
+        if signature != SIGNATURE or self.version not in SUPPORTED_VERSIONS:
+            msg = f"Unsupported index file '{path}'"
+            raise UnsupportedRepositoryError(msg)
+
+        position = HEADER.size
+        previous = b""
+        for _ in range(count):
+            entry, position = self._read_entry(buffer, position, previous)
+            self.entries.append(entry)
+            previous = entry.path
+
+        self._read_extensions(buffer, position, len(buffer) - hash_length)
+        log.log(DEBUG, "Index file '%s' of version %d has %d entries", path, self.version, count)
+
+    def _read_entry(self, buffer: bytes, start: int, previous: bytes) -> tuple[IndexEntry, int]:
+        ctime, ctime_ns, mtime, mtime_ns, _dev, ino, mode, uid, gid, size = STAT_DATA.unpack_from(buffer, start)
+        position = start + STAT_DATA.size
+        oid = bytes(buffer[position : position + self.hash_length])
+        position += self.hash_length
+
+        (flags,) = FLAGS.unpack_from(buffer, position)
+        position += FLAGS.size
+        extended = 0
+        if flags & FLAG_EXTENDED:
+            (extended,) = FLAGS.unpack_from(buffer, position)
+            position += FLAGS.size
+
+        if self.version == 4:  # noqa: PLR2004
+            strip, position = _decode_varint(buffer, position)
+            end = _find_nul(buffer, position)
+            path = previous[: len(previous) - strip] + bytes(buffer[position:end])
+            position = end + 1
+        else:
+            end = _find_nul(buffer, position)
+            path = bytes(buffer[position:end])
+            # entries are padded with 1-8 NUL bytes to be multiple of 8 bytes
+            position = start + ((end - start) // 8 + 1) * 8
+
+        entry = IndexEntry(
+            path=path,
+            mode=mode,
+            oid=oid,
+            size=size,
+            mtime=(mtime, mtime_ns),
+            ctime=(ctime, ctime_ns),
+            ino=ino,
+            uid=uid,
+            gid=gid,
+            stage=(flags & FLAG_STAGE_MASK) >> 12,
+            assume_valid=bool(flags & FLAG_ASSUME_VALID),
+            skip_worktree=bool(extended & EXTENDED_SKIP_WORKTREE),
+            intent_to_add=bool(extended & EXTENDED_INTENT_TO_ADD),
+        )
+        return entry, position
+
+    def _read_extensions(self, buffer: bytes, position: int, end: int) -> None:
+        while position + EXTENSION.size <= end:
+            signature, size = EXTENSION.unpack_from(buffer, position)
+            position += EXTENSION.size
+            self.extensions.append(signature)
+
+            if signature in EXTENSIONS_UNSUPPORTED or not signature[:1].isupper():
+                # lowercase extensions are mandatory to understand
+                msg = f"Index extension {signature!r} is not supported"
+                raise UnsupportedRepositoryError(msg)
+
+            data = buffer[position : position + size]
+            if signature == EXTENSION_CACHE_TREE:
+                self.tree = self._read_root_tree(data)
+            elif signature == EXTENSION_UNTRACKED_CACHE:
+                self.untracked_cache = self._read_optional(signature, self._read_untracked_cache, data)
+            elif signature == EXTENSION_FSMONITOR:
+                self.fsmonitor_dirty = self._read_optional(signature, self._read_fsmonitor, data)
+
+            # other optional extensions are only speeding up git itself
+            position += size
+
+    def _read_optional(self, signature: bytes, reader: Callable[[bytes], T], data: bytes) -> T | None:
+        # optional extensions can be ignored, like git does
+        try:
+            return reader(data)
+        except (ValueError, IndexError, struct.error) as e:
+            log.log(DEBUG, "Cannot parse index extension %r: %s", signature, e)
+            return None
+
+    def _read_root_tree(self, data: bytes) -> bytes | None:
+        # first entry is the root one: NUL-terminated empty path, "<entry_count> <subtrees>\n" and tree hash
+        path_end = data.index(b"\0")
+        line_end = data.index(b"\n", path_end)
+        if data[:path_end]:
+            return None
+
+        entry_count = int(data[path_end + 1 : line_end].split(b" ")[0])
+        if entry_count < 0:
+            # invalidated after 'git add'
+            return None
+        return bytes(data[line_end + 1 : line_end + 1 + self.hash_length])
+
+    def _read_oid(self, data: bytes, position: int) -> tuple[bytes | None, int]:
+        oid = bytes(data[position : position + self.hash_length])
+        if len(oid) != self.hash_length:
+            msg = "Truncated object id"
+            raise ValueError(msg)
+        # null object id means that file does not exist
+        return (oid if oid.strip(b"\0") else None), position + self.hash_length
+
+    def _read_untracked_cache(self, data: bytes) -> UntrackedCache:
+        ident_length, position = _decode_varint(data, 0)
+        ident = bytes(data[position : position + ident_length]).split(b"\0")[:-1]
+        # stat data of 'info/exclude' and 'core.excludesFile' is skipped, their object ids are compared instead
+        position += ident_length + 2 * UNTRACKED_STAT_DATA.size
+        (dir_flags,) = UINT32.unpack_from(data, position)
+        position += UINT32.size
+        info_exclude_oid, position = self._read_oid(data, position)
+        excludes_file_oid, position = self._read_oid(data, position)
+        end = _find_nul(data, position)
+        exclude_per_dir = bytes(data[position:end])
+        count, position = _decode_varint(data, end + 1)
+
+        root = None
+        if count:
+            # directories are stored in depth-first order, followed by bitmaps with their flags
+            directories: list[CachedDirectory] = []
+            root, position = self._read_cached_directory(data, position, directories)
+            valid, position = _read_ewah(data, position)
+            check_only, position = _read_ewah(data, position)
+            exclude_valid, position = _read_ewah(data, position)
+
+            for number in check_only:
+                directories[number].check_only = True
+            for number in valid:
+                directories[number].valid = True
+                directories[number].stat = UNTRACKED_STAT_DATA.unpack_from(data, position)
+                position += UNTRACKED_STAT_DATA.size
+            for number in exclude_valid:
+                directories[number].exclude_oid, position = self._read_oid(data, position)
+
+        return UntrackedCache(ident, dir_flags, info_exclude_oid, excludes_file_oid, exclude_per_dir, root)
+
+    def _read_cached_directory(
+        self,
+        data: bytes,
+        position: int,
+        directories: list[CachedDirectory],
+    ) -> tuple[CachedDirectory, int]:
+        untracked_count, position = _decode_varint(data, position)
+        dirs_count, position = _decode_varint(data, position)
+        names = []
+        for _ in range(untracked_count + 1):
+            end = _find_nul(data, position)
+            names.append(bytes(data[position:end]))
+            position = end + 1
+
+        # directory name is followed by names of untracked entries
+        result = CachedDirectory(names[0], names[1:])
+        directories.append(result)
+        for _ in range(dirs_count):
+            child, position = self._read_cached_directory(data, position, directories)
+            result.dirs.append(child)
+        return result, position
+
+    def _read_fsmonitor(self, data: bytes) -> list[int]:
+        (version,) = UINT32.unpack_from(data, 0)
+        if version == 1:
+            # followed by 64-bit timestamp
+            position = UINT32.size + UINT64.size
+        elif version == 2:  # noqa: PLR2004
+            # followed by NUL-terminated token
+            position = _find_nul(data, UINT32.size) + 1
+        else:
+            msg = f"Unknown version {version}"
+            raise ValueError(msg)
+
+        # size of the bitmap is followed by bitmap itself
+        dirty, _ = _read_ewah(data, position + UINT32.size)
+        return dirty
+
+
+def read_index(git_dir_path: Path, hash_length: int = 20) -> Index | None:
+    """Read index of the worktree, or return ``None`` if there is no such file"""
+    try:
+        return Index(git_dir_path.joinpath("index"), hash_length)
+    except FileNotFoundError:
+        return None
+    except (ValueError, IndexError, struct.error) as e:
+        msg = f"Cannot parse index file: {e}"
+        raise UnsupportedRepositoryError(msg) from e
+
+
+def content_oid(content: bytes, hash_length: int = 20) -> bytes:
+    """Calculate object id of blob with the given content"""
+    hasher = hashlib.sha1 if hash_length == 20 else hashlib.sha256  # noqa: PLR2004
+    return hasher(b"blob %d\0" % len(content) + content).digest()
+
+
+def blob_oid(path: Path, hash_length: int = 20) -> bytes:
+    """Calculate object id of file content, like ``git hash-object --no-filters`` does"""
+    content = os.fsencode(os.readlink(path)) if path.is_symlink() else path.read_bytes()
+    return content_oid(content, hash_length)
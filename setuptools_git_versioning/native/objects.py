@@ -0,0 +1,220 @@
+"""Reader of git objects, either loose or stored in pack files.
+
+Only objects which are needed to resolve tags and walk through the history are parsed,
+i.e. commits and tags.
+
+Objects which cannot be read directly, e.g. stored in alternate object directories,
+can be requested from a fallback reader, like ``git cat-file`` process.
+"""
+
+from __future__ import annotations
+
+import logging
+import struct
+import zlib
+from typing import TYPE_CHECKING, Callable, Iterable, NamedTuple
+
+from setuptools_git_versioning.log import DEBUG
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+from setuptools_git_versioning.native.pack import Pack
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# tags pointing to other tags are resolved up to this depth
+MAX_PEEL_DEPTH = 32
+
+
+class Commit(NamedTuple):
+    tree: str
+    parents: list[str]
+    commit_time: int
+
+
+class Tag(NamedTuple):
+    object: str
+    type: str
+    # some very old tags do not have tagger line
+    tagger_time: int | None
+
+
+def _parse_headers(data: bytes) -> list[tuple[bytes, bytes]]:
+    headers = []
+    for line in data.split(b"\n"):
+        if not line:
+            # message starts after an empty line
+            break
+        if line.startswith(b" "):
+            # continuation of multiline header, like gpgsig
+            continue
+        key, _, value = line.partition(b" ")
+        headers.append((key, value))
+    return headers
+
+
+def _parse_time(signature: bytes) -> int:
+    # "Name <email> 1700000000 +0000"
+    return int(signature[signature.rindex(b">") + 1 :].split()[0])
+
+
+def parse_commit(data: bytes) -> Commit:
+    tree = ""
+    parents = []
+    commit_time = 0
+    for key, value in _parse_headers(data):
+        if key == b"tree":
+            tree = value.decode("ascii")
+        elif key == b"parent":
+            parents.append(value.decode("ascii"))
+        elif key == b"committer":
+            commit_time = _parse_time(value)
+    return Commit(tree, parents, commit_time)
+
+
+def parse_tag(data: bytes) -> Tag:
+    target = ""
+    target_type = ""
+    tagger_time = None
+    for key, value in _parse_headers(data):
+        if key == b"object":
+            target = value.decode("ascii")
+        elif key == b"type":
+            target_type = value.decode("ascii")
+        elif key == b"tagger":
+            tagger_time = _parse_time(value)
+    return Tag(target, target_type, tagger_time)
+
+
+class ObjectStore:
+    """Reader of ``objects`` directory. Packs are looked up before loose objects, like git does.
+
+    ``fallback`` is called with a list of object ids which cannot be read directly, and returns
+    type and content of each object (or ``None`` if object is missing), or ``None`` instead of the list
+    if objects cannot be read this way.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fallback: Callable[[list[str]], list[tuple[str, bytes] | None] | None] | None = None,
+    ) -> None:
+        self.path = path
+        self.fallback = fallback
+        self._packs: list[Pack] | None = None
+        self._fetched: dict[str, tuple[str, bytes]] = {}
+
+    def _get_packs(self, hash_length: int) -> list[Pack]:
+        if self._packs is None:
+            index_paths = list(self.path.joinpath("pack").glob("pack-*.idx"))
+            # recently created packs are more likely to contain recent objects
+            index_paths.sort(key=lambda path: path.stat().st_mtime, reverse=True)
+            self._packs = [Pack(path, hash_length) for path in index_paths]
+            log.log(DEBUG, "Found %d pack files in '%s'", len(self._packs), self.path)
+        return self._packs
+
+    def _read_loose(self, oid: str) -> tuple[str, bytes] | None:
+        path = self.path.joinpath(oid[:2], oid[2:])
+        try:
+            content = zlib.decompress(path.read_bytes())
+        except FileNotFoundError:
+            return None
+
+        header, _, data = content.partition(b"\0")
+        object_type, _, size = header.decode("ascii").partition(" ")
+        if int(size) != len(data):
+            msg = f"Object {oid} size does not match its header"
+            raise UnsupportedRepositoryError(msg)
+        return object_type, data
+
+    def _contains(self, oid: str) -> bool:
+        """Check if object can be read directly, without reading its content"""
+        raw = bytes.fromhex(oid)
+        try:
+            if any(pack.index.find(raw) is not None for pack in self._get_packs(len(raw))):
+                return True
+        except (FileNotFoundError, ValueError, IndexError, struct.error):
+            return False
+        return self.path.joinpath(oid[:2], oid[2:]).is_file()
+
+    def _fetch(self, oids: list[str]) -> None:
+        if not oids or self.fallback is None:
+            return
+
+        results = self.fallback(oids)
+        if results is None:
+            return
+
+        for oid, result in zip(oids, results):
+            if result is not None:
+                self._fetched[oid] = result
+        log.log(DEBUG, "Requested %d objects which cannot be read directly", len(oids))
+
+    def prefetch(self, oids: Iterable[str]) -> None:
+        """Request all objects which cannot be read directly using a single fallback call,
+        instead of requesting them one by one while they are being read.
+        """
+        if self.fallback is None:
+            return
+        self._fetch([oid for oid in dict.fromkeys(oids) if oid not in self._fetched and not self._contains(oid)])
+
+    def read(self, oid: str) -> tuple[str, bytes]:
+        """Return type and content of the object"""
+        fetched = self._fetched.get(oid)
+        if fetched is not None:
+            return fetched
+
+        try:
+            return self._read_direct(oid)
+        except UnsupportedRepositoryError:
+            self._fetch([oid])
+            fetched = self._fetched.get(oid)
+            if fetched is None:
+                raise
+            return fetched
+
+    def _read_direct(self, oid: str) -> tuple[str, bytes]:
+        raw = bytes.fromhex(oid)
+        try:
+            for pack in self._get_packs(len(raw)):
+                offset = pack.index.find(raw)
+                if offset is not None:
+                    return pack.read(offset)
+
+            result = self._read_loose(oid)
+        except (FileNotFoundError, ValueError, IndexError, struct.error, zlib.error) as e:
+            msg = f"Cannot read object {oid}: {e}"
+            raise UnsupportedRepositoryError(msg) from e
+
+        if result is None:
+            msg = f"Object {oid} is not found"
+            raise UnsupportedRepositoryError(msg)
+        return result
+
+    def _read_typed(self, oid: str, expected_type: str) -> bytes:
+        object_type, data = self.read(oid)
+        if object_type != expected_type:
+            msg = f"Object {oid} is {object_type}, not {expected_type}"
+            raise UnsupportedRepositoryError(msg)
+        return data
+
+    def read_commit(self, oid: str) -> Commit:
+        return parse_commit(self._read_typed(oid, "commit"))
+
+    def read_tag(self, oid: str) -> Tag:
+        return parse_tag(self._read_typed(oid, "tag"))
+
+    def peel(self, oid: str) -> str:
+        """Return commit the object is pointing to, following chain of annotated tags"""
+        for _ in range(MAX_PEEL_DEPTH):
+            object_type, data = self.read(oid)
+            if object_type == "commit":
+                return oid
+            if object_type != "tag":
+                msg = f"Object {oid} is {object_type}, not a commit"
+                raise UnsupportedRepositoryError(msg)
+            oid = parse_tag(data).object
+
+        msg = f"Too deep chain of tags pointing to {oid}"
+        raise UnsupportedRepositoryError(msg)
@@ -0,0 +1,236 @@
+"""Reader of pack files and their ``.idx`` v2 indexes.
+
+See https://git-scm.com/docs/gitformat-pack for format description.
+"""
+
+from __future__ import annotations
+
+import logging
+import struct
+import zlib
+from typing import TYPE_CHECKING
+
+from setuptools_git_versioning.log import DEBUG
+from setuptools_git_versioning.native import UnsupportedRepositoryError, map_file
+
+if TYPE_CHECKING:
+    import mmap
+    from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+INDEX_SIGNATURE = b"\377tOc"
+INDEX_VERSION = 2
+INDEX_HEADER_SIZE = 8
+FANOUT_SIZE = 256 * 4
+PACK_SIGNATURE = b"PACK"
+PACK_VERSIONS = (2, 3)
+
+UINT32 = struct.Struct(">I")
+UINT64 = struct.Struct(">Q")
+LARGE_OFFSET = 0x80000000
+
+OBJECT_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+OFS_DELTA = 6
+REF_DELTA = 7
+
+# git itself does not create longer delta chains
+MAX_DELTA_DEPTH = 4096
+INFLATE_CHUNK_SIZE = 16 * 1024
+
+
+class PackIndex:
+    """Version 2 of ``.idx`` file, mapping object ids to offsets in the pack file"""
+
+    def __init__(self, path: Path, hash_length: int = 20) -> None:
+        self.path = path
+        self.hash_length = hash_length
+        self._buffer = map_file(path)
+
+        header = self._buffer[:INDEX_HEADER_SIZE]
+        if len(header) < INDEX_HEADER_SIZE or header[:4] != INDEX_SIGNATURE or header[4:] != b"\0\0\0\2":
+            msg = f"Unsupported pack index file '{path}'"
+            raise UnsupportedRepositoryError(msg)
+
+        self.size = self._uint32(INDEX_HEADER_SIZE + 255 * 4)
+        self._lookup = INDEX_HEADER_SIZE + FANOUT_SIZE
+        # CRC32 values are stored between lookup table and offsets
+        self._offsets = self._lookup + self.size * (hash_length + 4)
+        self._large_offsets = self._offsets + self.size * 4
+
+    def _uint32(self, position: int) -> int:
+        return UINT32.unpack_from(self._buffer, position)[0]
+
+    def find(self, oid: bytes) -> int | None:
+        """Return offset of the object in the pack file, or ``None`` if there is no such object"""
+        first = oid[0]
+        low = self._uint32(INDEX_HEADER_SIZE + (first - 1) * 4) if first else 0
+        high = self._uint32(INDEX_HEADER_SIZE + first * 4)
+        while low < high:
+            middle = (low + high) // 2
+            position = self._lookup + middle * self.hash_length
+            current = self._buffer[position : position + self.hash_length]
+            if current < oid:
+                low = middle + 1
+            elif current > oid:
+                high = middle
+            else:
+                return self._offset(middle)
+        return None
+
+    def _offset(self, index: int) -> int:
+        offset = self._uint32(self._offsets + index * 4)
+        if offset & LARGE_OFFSET:
+            return UINT64.unpack_from(self._buffer, self._large_offsets + (offset & ~LARGE_OFFSET) * 8)[0]
+        return offset
+
+
+def inflate(buffer: bytes | mmap.mmap, position: int, size: int) -> bytes:
+    """Decompress zlib stream starting at ``position``, without reading the rest of the buffer"""
+    decompressor = zlib.decompressobj()
+    chunks = []
+    while not decompressor.eof:
+        chunk = buffer[position : position + INFLATE_CHUNK_SIZE]
+        if not chunk:
+            msg = "Compressed object data is truncated"
+            raise UnsupportedRepositoryError(msg)
+        chunks.append(decompressor.decompress(chunk))
+        position += len(chunk)
+
+    result = b"".join(chunks)
+    if len(result) != size:
+        msg = f"Object size {len(result)} does not match expected size {size}"
+        raise UnsupportedRepositoryError(msg)
+    return result
+
+
+def _delta_size(delta: bytes, position: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = delta[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return result, position
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Build object from base object and delta instructions"""
+    base_size, position = _delta_size(delta, 0)
+    result_size, position = _delta_size(delta, position)
+    if base_size != len(base):
+        msg = f"Delta base size {len(base)} does not match expected size {base_size}"
+        raise UnsupportedRepositoryError(msg)
+
+    result = bytearray()
+    while position < len(delta):
+        command = delta[position]
+        position += 1
+        if command & 0x80:
+            # copy from base object, bits 0-3 mean offset bytes, bits 4-6 mean size bytes
+            offset = 0
+            size = 0
+            for i in range(4):
+                if command & (1 << i):
+                    offset |= delta[position] << (8 * i)
+                    position += 1
+            for i in range(3):
+                if command & (0x10 << i):
+                    size |= delta[position] << (8 * i)
+                    position += 1
+            result += base[offset : offset + (size or 0x10000)]
+        elif command:
+            # insert new data
+            result += delta[position : position + command]
+            position += command
+        else:
+            msg = "Unexpected delta instruction"
+            raise UnsupportedRepositoryError(msg)
+
+    if len(result) != result_size:
+        msg = f"Object size {len(result)} does not match expected size {result_size}"
+        raise UnsupportedRepositoryError(msg)
+    return bytes(result)
+
+
+class Pack:
+    """Pack file with its index. Pack file itself is mapped into memory on first access"""
+
+    def __init__(self, index_path: Path, hash_length: int = 20) -> None:
+        self.index = PackIndex(index_path, hash_length)
+        self.path = index_path.with_suffix(".pack")
+        self._buffer: bytes | mmap.mmap | None = None
+
+    @property
+    def buffer(self) -> bytes | mmap.mmap:
+        if self._buffer is None:
+            buffer = map_file(self.path)
+            header = buffer[:8]
+            if header[:4] != PACK_SIGNATURE or UINT32.unpack(header[4:])[0] not in PACK_VERSIONS:
+                msg = f"Unsupported pack file '{self.path}'"
+                raise UnsupportedRepositoryError(msg)
+            self._buffer = buffer
+        return self._buffer
+
+    def _read_header(self, offset: int) -> tuple[int, int, int]:
+        """Return type and size of the object at offset, and position of the data after the header"""
+        buffer = self.buffer
+        byte = buffer[offset]
+        position = offset + 1
+        object_type = (byte >> 4) & 0x7
+        size = byte & 0x0F
+        shift = 4
+        while byte & 0x80:
+            byte = buffer[position]
+            position += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+        return object_type, size, position
+
+    def _read_base_offset(self, offset: int, position: int) -> tuple[int, int]:
+        buffer = self.buffer
+        byte = buffer[position]
+        position += 1
+        distance = byte & 0x7F
+        while byte & 0x80:
+            byte = buffer[position]
+            position += 1
+            distance = ((distance + 1) << 7) | (byte & 0x7F)
+        return offset - distance, position
+
+    def read(self, offset: int) -> tuple[str, bytes]:
+        """Return type and content of the object at offset, resolving delta chain if needed"""
+        hash_length = self.index.hash_length
+        deltas = []
+        for _ in range(MAX_DELTA_DEPTH):
+            object_type, size, position = self._read_header(offset)
+            if object_type == OFS_DELTA:
+                base_offset, position = self._read_base_offset(offset, position)
+                deltas.append(inflate(self.buffer, position, size))
+                offset = base_offset
+            elif object_type == REF_DELTA:
+                base = bytes(self.buffer[position : position + hash_length])
+                deltas.append(inflate(self.buffer, position + hash_length, size))
+                base_offset = self.index.find(base)
+                if base_offset is None:
+                    msg = f"Delta base {base.hex()} is not present in pack '{self.path}'"
+                    raise UnsupportedRepositoryError(msg)
+                offset = base_offset
+            elif object_type in OBJECT_TYPES:
+                data = inflate(self.buffer, position, size)
+                break
+            else:
+                msg = f"Unknown object type {object_type} in pack '{self.path}'"
+                raise UnsupportedRepositoryError(msg)
+        else:
+            msg = f"Too long delta chain in pack '{self.path}'"
+            raise UnsupportedRepositoryError(msg)
+
+        for delta in reversed(deltas):
+            data = apply_delta(data, delta)
+
+        if deltas:
+            log.log(DEBUG, "Resolved delta chain of length %d", len(deltas))
+        return OBJECT_TYPES[object_type], data
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+from typing import TYPE_CHECKING, Callable, Iterator, NamedTuple
+
+from setuptools_git_versioning.log import DEBUG
+from setuptools_git_versioning.native import UnsupportedRepositoryError, map_file
+from setuptools_git_versioning.native.objects import ObjectStore
+
+if TYPE_CHECKING:
+    from mmap import mmap
+    from pathlib import Path
+
+    from setuptools_git_versioning.native.gitdir import GitDir
+
+log = logging.getLogger(__name__)
+
+OID_REGEXP = re.compile(r"^(?:[0-9a-f]{40}|[0-9a-f]{64})$")
+# see 'git help check-ref-format'
+INVALID_REF_REGEXP = re.compile(r"(?:\.\.|@\{|//|/\.|\.lock/|[\x00-\x20\x7f~^:?*\[\\])")
+
+# see 'git help revisions', names are checked in the same order
+REV_PARSE_RULES = (
+    "refs/{}",
+    "refs/tags/{}",
+    "refs/heads/{}",
+    "refs/remotes/{}",
+    "refs/remotes/{}/HEAD",
+)
+
+# refs stored in per-worktree directory instead of common one
+PER_WORKTREE_PREFIXES = ("refs/worktree/", "refs/bisect/", "refs/rewritten/")
+
+MAX_SYMREF_DEPTH = 5
+
+
+class Ref(NamedTuple):
+    """Resolved reference.
+
+    ``peeled`` is an object the ref is pointing to after dereferencing all annotated tags,
+    or ``None`` if it is not known without reading the object itself.
+    """
+
+    name: str
+    oid: str
+    peeled: str | None = None
+
+
+def is_valid_ref_name(name: str) -> bool:
+    if not name or name == "@" or INVALID_REF_REGEXP.search(name):
+        return False
+
+    return not name.startswith((".", "/")) and not name.endswith((".", "/", ".lock"))
+
+
+def short_name(refname: str) -> str:
+    return refname.split("/", 2)[2]
+
+
+class PackedRefs:
+    """Index of ``packed-refs`` file.
+
+    git keeps this file sorted by ref name, so single ref can be found using binary search
+    over memory-mapped file content, without reading and parsing all other refs.
+    Files without ``sorted`` trait are parsed as a whole.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.peeled = False
+        self.fully_peeled = False
+        self.sorted = False
+        self._buffer: bytes | mmap = b""
+        self._start = 0
+        self._refs: dict[str, Ref] | None = None
+
+        try:
+            self._buffer = map_file(path)
+        except FileNotFoundError:
+            return
+
+        if self._buffer[:1] == b"#":
+            header_end = self._line_end(0)
+            traits = self._buffer[:header_end].split(b":", 1)[-1].split()
+            self.peeled = b"peeled" in traits
+            self.fully_peeled = b"fully-peeled" in traits
+            self.sorted = b"sorted" in traits
+            self._start = header_end + 1
+
+        if not self.sorted:
+            self._refs = {ref.name: ref for ref in self._iter_from(self._start)}
+
+    def _line_end(self, position: int) -> int:
+        end = self._buffer.find(b"\n", position)
+        return len(self._buffer) if end < 0 else end
+
+    def _record_start(self, position: int) -> int:
+        start = max(self._buffer.rfind(b"\n", self._start, position) + 1, self._start)
+        if self._buffer[start : start + 1] == b"^":
+            # this is a peeled line, record starts at the previous one
+            start = max(self._buffer.rfind(b"\n", self._start, start - 1) + 1, self._start)
+        return start
+
+    def _read_record(self, position: int) -> tuple[Ref, int]:
+        """Parse record at the position, and return it with position of the next record"""
+        end = self._line_end(position)
+        oid, _, name = self._buffer[position:end].partition(b" ")
+        peeled = None
+        if self._buffer[end + 1 : end + 2] == b"^":
+            peeled_end = self._line_end(end + 1)
+            peeled = self._buffer[end + 2 : peeled_end]
+            end = peeled_end
+
+        try:
+            ref = Ref(name.decode("utf-8"), oid.decode("ascii"), peeled.decode("ascii") if peeled else None)
+        except UnicodeDecodeError as e:
+            raise UnsupportedRepositoryError(str(e)) from e
+
+        if not OID_REGEXP.match(ref.oid) or not ref.name or (peeled and not OID_REGEXP.match(ref.peeled)):
+            msg = f"Unexpected record {ref} in '{self.path}'"
+            raise UnsupportedRepositoryError(msg)
+
+        if not peeled:
+            ref = ref._replace(peeled=self._known_peeled(ref.name, ref.oid))
+        return ref, end + 1
+
+    def _known_peeled(self, name: str, oid: str) -> str | None:
+        # ref without '^' line is not pointing to annotated tag, but only if the file says so
+        if self.fully_peeled or (self.peeled and name.startswith("refs/tags/")):
+            return oid
+        return None
+
+    def _iter_from(self, position: int) -> Iterator[Ref]:
+        while position < len(self._buffer):
+            ref, position = self._read_record(position)
+            yield ref
+
+    def _bisect(self, name: str) -> int:
+        """Return position of the first record with name greater or equal to ``name``"""
+        low = self._start
+        high = len(self._buffer)
+        while low < high:
+            position = self._record_start((low + high) // 2)
+            ref, next_position = self._read_record(position)
+            if ref.name < name:
+                low = next_position
+            elif ref.name > name:
+                high = position
+            else:
+                return position
+        return low
+
+    def get(self, name: str) -> Ref | None:
+        if self._refs is not None:
+            return self._refs.get(name)
+
+        position = self._bisect(name)
+        if position >= len(self._buffer):
+            return None
+
+        ref, _ = self._read_record(position)
+        return ref if ref.name == name else None
+
+    def iter_prefix(self, prefix: str) -> Iterator[Ref]:
+        if self._refs is not None:
+            yield from (ref for name, ref in self._refs.items() if name.startswith(prefix))
+            return
+
+        for ref in self._iter_from(self._bisect(prefix)):
+            if not ref.name.startswith(prefix):
+                break
+            yield ref
+
+
+class RefStore:
+    """Reader of ``HEAD``, loose refs and ``packed-refs`` file"""
+
+    def __init__(
+        self,
+        git_dir: GitDir,
+        object_fallback: Callable[[list[str]], list[tuple[str, bytes] | None] | None] | None = None,
+    ) -> None:
+        self.git_dir = git_dir
+        self.object_fallback = object_fallback
+        self._packed: PackedRefs | None = None
+        self._objects: ObjectStore | None = None
+
+    @property
+    def packed(self) -> PackedRefs:
+        if self._packed is None:
+            self._packed = PackedRefs(self.git_dir.common_dir.joinpath("packed-refs"))
+        return self._packed
+
+    @property
+    def objects(self) -> ObjectStore:
+        if self._objects is None:
+            self._objects = ObjectStore(self.git_dir.common_dir.joinpath("objects"), self.object_fallback)
+        return self._objects
+
+    def _loose_path(self, name: str) -> Path:
+        if name == "HEAD" or name.startswith(PER_WORKTREE_PREFIXES):
+            return self.git_dir.path.joinpath(name)
+        return self.git_dir.common_dir.joinpath(name)
+
+    def _read_loose(self, name: str) -> str | None:
+        path = self._loose_path(name)
+        try:
+            content = path.read_text(encoding="utf-8").strip()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return None
+        except OSError as e:
+            raise UnsupportedRepositoryError(str(e)) from e
+
+        if not content.startswith("ref: ") and not OID_REGEXP.match(content):
+            msg = f"Unknown format of '{path}' file"
+            raise UnsupportedRepositoryError(msg)
+        return content
+
+    def read_symref(self, name: str) -> str | None:
+        """Return name of the ref which symbolic ref is pointing to, or ``None`` if ref is not symbolic"""
+        content = self._read_loose(name)
+        if content and content.startswith("ref: "):
+            return content[len("ref: ") :]
+        return None
+
+    def resolve(self, name: str, depth: int = 0) -> Ref | None:
+        """Return ref with object it is pointing to, or ``None`` if ref does not exist"""
+        if depth > MAX_SYMREF_DEPTH:
+            msg = f"Too deep symbolic ref {name!r}"
+            raise UnsupportedRepositoryError(msg)
+
+        content = self._read_loose(name)
+        if content is None:
+            return self.packed.get(name)
+
+        if content.startswith("ref: "):
+            return self.resolve(content[len("ref: ") :], depth + 1)
+
+        # branches can point to commits only, so no need to peel them
+        peeled = content if name == "HEAD" or name.startswith("refs/heads/") else None
+        return Ref(name, content, peeled)
+
+    def exists(self, name: str) -> bool:
+        return self.resolve(name) is not None
+
+    def iter_refs(self, prefix: str) -> list[Ref]:
+        """Return all refs which names are starting with ``prefix``, sorted by name"""
+        result = {ref.name: ref for ref in self.packed.iter_prefix(prefix)}
+
+        base = self.git_dir.common_dir
+        for dirpath, _, filenames in os.walk(base.joinpath(prefix)):
+            for filename in filenames:
+                name = base.joinpath(dirpath, filename).relative_to(base).as_posix()
+                if not is_valid_ref_name(name):
+                    continue
+
+                ref = self.resolve(name)
+                if ref is not None:
+                    result[name] = ref._replace(name=name)
+
+        return [result[name] for name in sorted(result)]
+
+    def peel(self, ref: Ref) -> str:
+        """Return commit the ref is pointing to"""
+        if ref.peeled is None:
+            return self.objects.peel(ref.oid)
+        return ref.peeled
+
+    def dwim(self, name: str) -> Ref | None:
+        """Find ref by short name, like ``git rev-parse`` does"""
+        if name == "HEAD":
+            return self.resolve(name)
+
+        if not is_valid_ref_name(name) or OID_REGEXP.match(name):
+            msg = f"{name!r} is not a plain ref name"
+            raise UnsupportedRepositoryError(msg)
+
+        if self.git_dir.path.joinpath(name).exists():
+            msg = f"{name!r} may be a pseudo-ref"
+            raise UnsupportedRepositoryError(msg)
+
+        rules = ("{}", *REV_PARSE_RULES) if name.startswith("refs/") else REV_PARSE_RULES
+        for rule in rules:
+            ref = self.resolve(rule.format(name))
+            if ref is not None:
+                log.log(DEBUG, "Ref %r is resolved to %r", name, ref)
+                return ref
+        return None
+
+    def is_ambiguous(self, refname: str) -> bool:
+        """Check if short name of the ref matches any other ref"""
+        short = short_name(refname)
+        if self.git_dir.path.joinpath(short).exists():
+            return True
+
+        candidates = [rule.format(short) for rule in REV_PARSE_RULES]
+        return any(self.exists(candidate) for candidate in candidates if candidate != refname)
+
+    def head_sha(self) -> str | None:
+        """Return commit HEAD is pointing to, or ``None`` for a repo without commits"""
+        ref = self.resolve("HEAD")
+        return ref.oid if ref else None
+
+    def rev_parse(self, name: str) -> str | None:
+        """Return commit the ref is pointing to, like ``git rev-list -n 1 <name>`` does"""
+        ref = self.dwim(name)
+        if ref is None:
+            if name == "HEAD":
+                return None
+            msg = f"{name!r} is not a known ref"
+            raise UnsupportedRepositoryError(msg)
+        return self.peel(ref)
+
+    def branch(self) -> str:
+        """Return short name of current branch, or ``HEAD`` if detached"""
+        symref = self.read_symref("HEAD")
+        if symref is None or not self.exists(symref):
+            return "HEAD"
+
+        if not symref.startswith("refs/heads/") or self.is_ambiguous(symref):
+            msg = f"Cannot get short name for {symref!r}"
+            raise UnsupportedRepositoryError(msg)
+        return short_name(symref)
+
+    def branches(self) -> list[str]:
+        """Return short names of all local branches"""
+        if self.read_symref("HEAD") is None:
+            # git prints description of detached HEAD as a first branch name
+            msg = "HEAD is detached"
+            raise UnsupportedRepositoryError(msg)
+
+        refs = self.iter_refs("refs/heads/")
+        if any(self.is_ambiguous(ref.name) for ref in refs):
+            msg = "Some branch names are ambiguous"
+            raise UnsupportedRepositoryError(msg)
+        return [short_name(ref.name) for ref in refs]
+
+    def tags(self, prefix: str = "") -> list[Ref]:
+        """Return tags which names are starting with ``prefix``, sorted by name"""
+        # loose refs are found by walking through the deepest directory containing all matching tags
+        directory = "refs/tags/" + prefix[: prefix.rfind("/") + 1]
+        return [ref for ref in self.iter_refs(directory) if ref.name.startswith("refs/tags/" + prefix)]
@@ -0,0 +1,378 @@
+"""Check of worktree status using file stats stored in the index, like ``git status`` does.
+
+Only definite answers are returned. If file content has to be compared in a way which may depend
+on filters or line endings conversion, or on file modes, ``UnsupportedRepositoryError`` is raised,
+and ``git status`` should be used instead.
+
+Directory listings stored in the untracked cache (``core.untrackedCache``) are reused
+if directories were not changed since ``git status`` wrote them.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import stat
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable
+
+from setuptools_git_versioning.log import DEBUG
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+from setuptools_git_versioning.native.config import GitConfig, read_config, xdg_config_path
+from setuptools_git_versioning.native.ignore import IgnoreRules, read_patterns
+from setuptools_git_versioning.native.index import (
+    CachedDirectory,
+    Index,
+    IndexEntry,
+    blob_oid,
+    content_oid,
+    read_index,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from setuptools_git_versioning.native.gitdir import GitDir
+
+log = logging.getLogger(__name__)
+
+# stat values are truncated to 32 bits in the index
+UINT32_MASK = 0xFFFFFFFF
+
+# attributes which make worktree files differ from blobs, see 'man gitattributes'
+CONVERSION_ATTRIBUTES = re.compile(rb"\b(?:text|crlf|eol|ident|filter|working-tree-encoding)\b")
+
+# 'git status' stores untracked directories as a whole, and hides empty ones
+UNTRACKED_CACHE_FLAGS = 0x2 | 0x4
+
+
+def _check_config(config: GitConfig) -> None:
+    if config.get("core.worktree") is not None:
+        msg = "Worktree location is overridden by 'core.worktree' option"
+        raise UnsupportedRepositoryError(msg)
+
+
+def _may_convert(git_dir: GitDir, index: Index, config: GitConfig) -> bool:
+    """Check if worktree files may differ from blobs without being modified, because of filters or line endings"""
+    autocrlf = config.get("core.autocrlf")
+    if autocrlf is not None and (autocrlf.lower() == "input" or config.get_bool("core.autocrlf", default=False)):
+        log.log(DEBUG, "Line endings are converted because of 'core.autocrlf' option")
+        return True
+
+    paths = [
+        config.get_path("core.attributesFile") or xdg_config_path("attributes"),
+        git_dir.common_dir.joinpath("info", "attributes"),
+        git_dir.work_tree.joinpath(".gitattributes"),
+    ]
+    paths.extend(
+        git_dir.work_tree.joinpath(os.fsdecode(entry.path))
+        for entry in index.entries
+        if entry.path.endswith(b"/.gitattributes")
+    )
+    for path in paths:
+        try:
+            content = path.read_bytes()
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+
+        if CONVERSION_ATTRIBUTES.search(content):
+            log.log(DEBUG, "Files may be converted because of attributes in '%s'", path)
+            return True
+    return False
+
+
+def _split_time(nanoseconds: int) -> tuple[int, int]:
+    seconds, nanoseconds = divmod(nanoseconds, 1_000_000_000)
+    return seconds & UINT32_MASK, nanoseconds
+
+
+def _same_time(stored: tuple[int, int], actual: tuple[int, int]) -> bool:
+    # nanoseconds are not stored if git is built without USE_NSEC
+    return stored[0] == actual[0] and (not stored[1] or stored[1] == actual[1])
+
+
+def _stat_matches(entry: IndexEntry, file_stat: os.stat_result) -> bool:
+    return (
+        _same_time(entry.mtime, _split_time(file_stat.st_mtime_ns))
+        and _same_time(entry.ctime, _split_time(file_stat.st_ctime_ns))
+        and entry.ino == file_stat.st_ino & UINT32_MASK
+        and entry.uid == file_stat.st_uid & UINT32_MASK
+        and entry.gid == file_stat.st_gid & UINT32_MASK
+    )
+
+
+def _is_type_changed(entry: IndexEntry, path: Path, file_stat: os.stat_result) -> bool:
+    file_type = stat.S_IFMT(entry.mode)
+    if file_type == stat.S_IFREG:
+        if not stat.S_ISREG(file_stat.st_mode):
+            return True
+
+        if (entry.mode ^ file_stat.st_mode) & stat.S_IXUSR:
+            msg = f"File '{path}' mode is changed, result depends on 'core.fileMode' option"
+            raise UnsupportedRepositoryError(msg)
+        return False
+
+    if file_type == stat.S_IFLNK:
+        if stat.S_ISREG(file_stat.st_mode):
+            msg = f"Symlink '{path}' is a regular file, result depends on 'core.symlinks' option"
+            raise UnsupportedRepositoryError(msg)
+        return not stat.S_ISLNK(file_stat.st_mode)
+
+    msg = f"Index entry '{path}' has unsupported mode {entry.mode:o}"
+    raise UnsupportedRepositoryError(msg)
+
+
+def _is_modified(entry: IndexEntry, path: Path, index: Index, may_convert: Callable[[], bool]) -> bool:
+    try:
+        file_stat = path.lstat()
+    except (FileNotFoundError, NotADirectoryError):
+        log.log(DEBUG, "File '%s' is deleted", path)
+        return True
+
+    if _is_type_changed(entry, path, file_stat):
+        log.log(DEBUG, "File '%s' type is changed", path)
+        return True
+
+    if entry.size and entry.size != file_stat.st_size & UINT32_MASK:
+        log.log(DEBUG, "File '%s' size is changed", path)
+        return True
+
+    # if file was changed in the same second the index was written, stat data cannot be trusted
+    racy = entry.mtime[0] >= index.mtime[0]
+    if entry.size and not racy and _stat_matches(entry, file_stat):
+        return False
+
+    if blob_oid(path, index.hash_length) == entry.oid:
+        return False
+
+    if may_convert():
+        msg = f"File '{path}' content is changed, result depends on filters and 'core.autocrlf' options"
+        raise UnsupportedRepositoryError(msg)
+
+    log.log(DEBUG, "File '%s' content is changed", path)
+    return True
+
+
+def _has_changed_entries(git_dir: GitDir, index: Index, config: GitConfig) -> bool:
+    # attribute files are read only if some file content has to be compared
+    may_convert = lru_cache(maxsize=None)(lambda: _may_convert(git_dir, index, config))
+
+    entries = index.entries
+    if index.fsmonitor_dirty:
+        # entries which were already changed during the last file system monitor query are checked first
+        dirty = set(index.fsmonitor_dirty)
+        entries = [
+            *(entries[number] for number in sorted(dirty) if number < len(entries)),
+            *(entry for number, entry in enumerate(entries) if number not in dirty),
+        ]
+
+    for entry in entries:
+        if entry.stage or entry.intent_to_add:
+            log.log(DEBUG, "File '%s' is not staged", entry.path)
+            return True
+
+        if entry.skip_worktree or entry.assume_valid:
+            continue
+
+        if _is_modified(entry, git_dir.work_tree.joinpath(os.fsdecode(entry.path)), index, may_convert):
+            return True
+    return False
+
+
+def _matches_oid(oid: bytes | None, path: Path, hash_length: int) -> bool:
+    """Check if ignore file has the same content as when untracked cache was written"""
+    try:
+        content = path.read_bytes()
+    except (FileNotFoundError, NotADirectoryError):
+        return oid is None
+
+    # git appends a newline before hashing, unless object id is taken from the index
+    return oid in (content_oid(content, hash_length), content_oid(content + b"\n", hash_length))
+
+
+def _load_untracked_cache(git_dir: GitDir, index: Index, exclude_files: list[Path]) -> CachedDirectory | None:
+    cache = index.untracked_cache
+    if cache is None:
+        return None
+
+    ident = b"Location %s, system %s" % (os.fsencode(git_dir.work_tree), os.fsencode(os.uname().sysname))
+    if ident not in cache.ident:
+        reason = "it was created for another location"
+    elif cache.dir_flags & ~UNTRACKED_CACHE_FLAGS or cache.exclude_per_dir != b".gitignore":
+        reason = "it was created with unsupported options"
+    elif not all(
+        _matches_oid(oid, path, index.hash_length)
+        for oid, path in zip((cache.excludes_file_oid, cache.info_exclude_oid), exclude_files)
+    ):
+        reason = "exclude files are changed"
+    else:
+        return cache.root
+
+    log.log(DEBUG, "Untracked cache is ignored because %s", reason)
+    return None
+
+
+def _same_directory_stat(cached: CachedDirectory, directory_stat: os.stat_result, index: Index) -> bool:
+    ctime, ctime_ns, mtime, mtime_ns, _dev, ino, uid, gid, size = cached.stat
+    # directory changed in the same second the index was written could be changed again without changing mtime
+    return (
+        mtime < index.mtime[0]
+        and _same_time((mtime, mtime_ns), _split_time(directory_stat.st_mtime_ns))
+        and _same_time((ctime, ctime_ns), _split_time(directory_stat.st_ctime_ns))
+        and ino == directory_stat.st_ino & UINT32_MASK
+        and uid == directory_stat.st_uid & UINT32_MASK
+        and gid == directory_stat.st_gid & UINT32_MASK
+        and size == directory_stat.st_size & UINT32_MASK
+    )
+
+
+def _is_listing_valid(cached: CachedDirectory, path: Path, index: Index) -> bool:
+    if not cached.valid:
+        return False
+
+    try:
+        directory_stat = path.lstat()
+    except OSError:
+        return False
+    return _same_directory_stat(cached, directory_stat, index)
+
+
+def _scan_directory(
+    path: Path,
+    directory: bytes,
+    tracked: set[bytes],
+    rules: IgnoreRules,
+) -> tuple[bytes | None, list[bytes]]:
+    """List the directory, and return path of the first untracked file or nested repository,
+    or names of subdirectories which are neither tracked nor ignored.
+    """
+    base = directory + b"/" if directory else b""
+    try:
+        items = os.scandir(os.fsencode(path))
+    except (FileNotFoundError, NotADirectoryError):
+        return None, []
+
+    subdirectories = []
+    with items:
+        for item in items:
+            relative_path = base + item.name
+            if item.name == b".git":
+                if directory:
+                    log.log(DEBUG, "Directory '%s' is a nested repository", os.fsdecode(directory))
+                    return directory, []
+                continue
+
+            if relative_path in tracked:
+                continue
+
+            is_dir = item.is_dir(follow_symlinks=False)
+            if rules.is_ignored(relative_path, is_dir=is_dir):
+                continue
+
+            if not is_dir:
+                return relative_path, []
+            subdirectories.append(item.name)
+    return None, subdirectories
+
+
+def _find_untracked(git_dir: GitDir, index: Index, config: GitConfig) -> bytes | None:
+    """Walk through the worktree, and return path of the first file which is neither tracked nor ignored.
+
+    Nested repositories are returned as well, because ``git status`` shows them as untracked directories.
+    """
+    tracked = {entry.path for entry in index.entries}
+
+    exclude_files = [
+        config.get_path("core.excludesFile") or xdg_config_path("ignore"),
+        git_dir.common_dir.joinpath("info", "exclude"),
+    ]
+    rules = IgnoreRules([read_patterns(path) for path in exclude_files])
+
+    stack = [(b"", rules, _load_untracked_cache(git_dir, index, exclude_files))]
+    while stack:
+        directory, rules, cached = stack.pop()
+        base = directory + b"/" if directory else b""
+        path = git_dir.work_tree.joinpath(os.fsdecode(directory))
+        gitignore = path.joinpath(".gitignore")
+        rules = rules.extend(read_patterns(gitignore, base))
+
+        if cached is not None and not _matches_oid(cached.exclude_oid, gitignore, index.hash_length):
+            # cached listings of the directory and all its subdirectories depend on these rules
+            log.log(DEBUG, "Ignore rules of '%s' are changed, skipping untracked cache", path)
+            cached = None
+
+        children: dict[bytes, CachedDirectory | None] = {child.name: child for child in cached.dirs} if cached else {}
+        if cached is not None and _is_listing_valid(cached, path, index):
+            skipped = False
+            for name in cached.untracked:
+                is_dir = name.endswith(b"/")
+                relative_path = base + name.rstrip(b"/")
+                if relative_path in tracked or rules.is_ignored(relative_path, is_dir=is_dir):
+                    skipped = True
+                    continue
+
+                if not is_dir:
+                    return relative_path
+                # directory could become empty since then
+                children.setdefault(name.rstrip(b"/"), None)
+
+            # check-only listing is stopped at the first untracked entry, other ones are not known
+            if not (skipped and cached.check_only):
+                stack.extend((base + name, rules, child) for name, child in children.items())
+                continue
+
+        found, subdirectories = _scan_directory(path, directory, tracked, rules)
+        if found is not None:
+            return found
+        stack.extend((base + name, rules, children.get(name)) for name in subdirectories)
+    return None
+
+
+def _shows_untracked(config: GitConfig) -> bool:
+    value = config.get("status.showUntrackedFiles")
+    # boolean values are accepted by git 2.46+
+    return value is None or value.lower() not in ("no", "false", "off", "0")
+
+
+def is_dirty(git_dir: GitDir, head_tree: str | None) -> bool:
+    """Check if there are uncommitted changes in the worktree.
+
+    ``head_tree`` is an object id of the tree of HEAD commit, or ``None`` if HEAD is unborn.
+    """
+    if os.name == "nt":
+        msg = "File stats are not fully stored in the index on Windows"
+        raise UnsupportedRepositoryError(msg)
+
+    config = read_config(git_dir)
+    _check_config(config)
+
+    hash_length = len(head_tree) // 2 if head_tree else 20
+    index = read_index(git_dir.path, hash_length)
+    if index is None:
+        msg = "Index file does not exist"
+        raise UnsupportedRepositoryError(msg)
+
+    if _has_changed_entries(git_dir, index, config):
+        return True
+
+    if head_tree is None:
+        if index.entries:
+            log.log(DEBUG, "There are staged files, but no commits")
+            return True
+    elif index.tree is None:
+        msg = "Index does not contain valid cache-tree"
+        raise UnsupportedRepositoryError(msg)
+    elif index.tree.hex() != head_tree:
+        log.log(DEBUG, "There are staged changes")
+        return True
+
+    if not _shows_untracked(config):
+        log.log(DEBUG, "Untracked files are hidden by 'status.showUntrackedFiles' option")
+        return False
+
+    untracked = _find_untracked(git_dir, index, config)
+    if untracked is not None:
+        log.log(DEBUG, "File '%s' is not tracked", os.fsdecode(untracked))
+        return True
+    return False
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+from itertools import islice
+from typing import TYPE_CHECKING, Iterator
+
+from setuptools_git_versioning.log import DEBUG
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+
+if TYPE_CHECKING:
+    from setuptools_git_versioning.native.history import History
+    from setuptools_git_versioning.native.refs import Ref, RefStore
+
+log = logging.getLogger(__name__)
+
+# date fields supported by 'git tag --sort', with the kind of object they are present in.
+# for other objects the date is empty, and git sorts such refs like they have zero timestamp
+DATE_KEYS = {
+    "committerdate": ("commit",),
+    "taggerdate": ("tag",),
+    "creatordate": ("commit", "tag"),
+}
+
+# reading more objects in Python is slower than 'git for-each-ref --merged', which reads them in C
+MAX_TAG_OBJECTS = 256
+
+
+def _commit_time(refs: RefStore, commit: str, history: History | None) -> int:
+    if history is None:
+        return refs.objects.read_commit(commit).commit_time
+    return history.commit_time(commit)
+
+
+def _needs_object(ref: Ref, sort_by: str) -> bool:
+    """Check if tag object should be read to get commit or date of the tag"""
+    return ref.peeled is None or (ref.peeled != ref.oid and "tag" in DATE_KEYS[sort_by])
+
+
+def _too_many_objects(refs: RefStore, sort_by: str, prefix: str) -> bool:
+    """Check if more than ``MAX_TAG_OBJECTS`` objects should be read to sort tags, without reading all the tags"""
+    # loose refs are not peeled, so their objects are always read
+    directory = refs.git_dir.common_dir.joinpath("refs", "tags", prefix[: prefix.rfind("/") + 1])
+    count = sum(len(filenames) for _, _, filenames in os.walk(directory))
+    packed = (ref for ref in refs.packed.iter_prefix("refs/tags/" + prefix) if _needs_object(ref, sort_by))
+    count += sum(1 for _ in islice(packed, MAX_TAG_OBJECTS + 1))
+    return count > MAX_TAG_OBJECTS
+
+
+def _date(refs: RefStore, ref: Ref, commit: str, sort_by: str, history: History | None) -> int:
+    kinds = DATE_KEYS[sort_by]
+    if ref.oid == commit:
+        return _commit_time(refs, commit, history) if "commit" in kinds else 0
+
+    if "tag" in kinds:
+        return refs.objects.read_tag(ref.oid).tagger_time or 0
+    return 0
+
+
+def sorted_tags(
+    refs: RefStore,
+    sort_by: str,
+    prefix: str = "",
+    history: History | None = None,
+) -> Iterator[tuple[Ref, str]]:
+    """Yield tags with commits they are pointing to, in the same order as ``git tag --sort=-<sort_by>`` does.
+
+    Without ``history`` commit dates are read from commit objects instead of commit-graph.
+    """
+    tags = refs.tags(prefix)
+    if sort_by == "refname":
+        for ref in reversed(tags):
+            yield ref, refs.peel(ref)
+        return
+
+    if sort_by not in DATE_KEYS:
+        msg = f"Sorting tags by {sort_by!r} is not supported"
+        raise UnsupportedRepositoryError(msg)
+
+    # all tags are peeled and their dates are read, so objects which cannot be read directly are requested at once
+    refs.objects.prefetch(ref.oid for ref in tags if _needs_object(ref, sort_by))
+    peeled = [(ref, refs.peel(ref)) for ref in tags]
+    if "commit" in DATE_KEYS[sort_by]:
+        refs.objects.prefetch(commit for ref, commit in peeled if ref.oid == commit)
+
+    # git sorts refs with the same date by name in ascending order, even if sort order is reversed
+    heap = []
+    for ref, commit in peeled:
+        heap.append((-_date(refs, ref, commit, sort_by, history), ref.name, ref, commit))
+    heapq.heapify(heap)
+
+    while heap:
+        *_, ref, commit = heapq.heappop(heap)
+        yield ref, commit
+
+
+def creator_date(refs: RefStore, ref: Ref, commit: str, history: History) -> int | None:
+    """Return tagger date for annotated tags and commit date for lightweight ones, like ``%(creatordate)`` does"""
+    if ref.oid == commit:
+        return history.commit_time(commit)
+    return refs.objects.read_tag(ref.oid).tagger_time
+
+
+def iter_merged_tags(
+    refs: RefStore,
+    history: History,
+    head: str,
+    sort_by: str,
+    prefix: str = "",
+) -> Iterator[tuple[Ref, str]]:
+    """Yield tags reachable from ``head`` with commits they are pointing to,
+    like ``git tag --sort=-<sort_by> --merged <head>`` does.
+
+    Only tags which names are starting with ``prefix`` are returned.
+
+    Tags are lazily checked in sort order, so if caller needs only the first matching tag,
+    only a part of the history between ``head`` and this tag is walked through.
+    But all tags are sorted first, so if dates of many tags can be read only from tag objects,
+    ``UnsupportedRepositoryError`` is raised, and caller should use ``git`` instead.
+    """
+    if sort_by in DATE_KEYS and _too_many_objects(refs, sort_by, prefix):
+        msg = f"Too many tag objects should be read to sort tags by {sort_by!r}"
+        raise UnsupportedRepositoryError(msg)
+
+    reachable = history.reachable_from(head)
+    for checked, (ref, commit) in enumerate(sorted_tags(refs, sort_by, prefix, history), start=1):
+        if commit in reachable:
+            log.log(DEBUG, "Tag %r is reachable from HEAD, checked %d tags", ref.name, checked)
+            yield ref, commit
@@ -0,0 +1,38 @@
+"""Options for running git without modifying the repository.
+
+All queries executed by setuptools-git-versioning only read the repository,
+but some git commands, like ``git status``, are refreshing the index by default.
+This requires taking ``index.lock``, so concurrent builds are waiting for each other,
+and IDEs watching the ``.git`` folder are notified about changes.
+
+This is disabled using ``GIT_OPTIONAL_LOCKS=0`` variable instead of ``--no-optional-locks`` option,
+because git older than 2.15 rejects unknown options, but ignores unknown variables.
+"""
+
+from __future__ import annotations
+
+import os
+
+# variables which can make git run external programs or wait for user input
+UNSET_ENV = (
+    "GIT_PAGER",
+    "PAGER",
+    "GIT_EDITOR",
+    "GIT_SEQUENCE_EDITOR",
+    "GIT_EXTERNAL_DIFF",
+    "GIT_ASKPASS",
+    "SSH_ASKPASS",
+)
+
+# see 'git help git'
+OVERRIDE_ENV = {
+    "GIT_OPTIONAL_LOCKS": "0",
+    "GIT_TERMINAL_PROMPT": "0",
+}
+
+
+def git_env() -> dict[str, str]:
+    """Return environment for running read-only ``git`` commands"""
+    env = {name: value for name, value in os.environ.items() if name not in UNSET_ENV}
+    env.update(OVERRIDE_ENV)
+    return env
@@ -1,17 +1,16 @@
 from __future__ import annotations
 
+import ast
 import logging
 import os
+import stat
 import sys
-import textwrap
 from pathlib import Path
-from pprint import pformat
-from typing import TYPE_CHECKING
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Mapping
 
 from setuptools_git_versioning.defaults import set_default_options
-from setuptools_git_versioning.factories import add_to_sys_path
 from setuptools_git_versioning.log import DEBUG, INFO
-from setuptools_git_versioning.version import version_from_git
 
 if TYPE_CHECKING:
     # avoid importing 'packaging' because setuptools-git-versioning can be installed using sdist
@@ -21,18 +20,52 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+# name of 'tool.setuptools-git-versioning' section in 'pyproject.toml'
+TOML_SECTION_NAME = b"setuptools-git-versioning"
 
-def read_toml(name_or_path: str | os.PathLike = "pyproject.toml", root: str | os.PathLike | None = None) -> dict:
+# parsed config sections of 'pyproject.toml' files, with modification time and size of the file
+_toml_cache: dict[Path, tuple[tuple[int, int], Mapping[str, Any] | None]] = {}
+
+
+def _may_have_toml_config(root: str | os.PathLike | None = None) -> bool:
+    """Check if 'pyproject.toml' can contain config section, without parsing it"""
+    file_path = (Path(root) if root else Path.cwd()).joinpath("pyproject.toml")
+    try:
+        return TOML_SECTION_NAME in file_path.read_bytes()
+    except FileNotFoundError:
+        return False
+    except OSError:
+        # let read_toml raise an exception
+        return True
+
+
+def read_toml(
+    name_or_path: str | os.PathLike = "pyproject.toml",
+    root: str | os.PathLike | None = None,
+) -> Mapping[str, Any] | None:
+    """Return read-only 'tool.setuptools-git-versioning' section of the file.
+
+    Parsed section is cached until file modification time or size is changed,
+    because setuptools hook can be called a lot of times during the same build.
+    """
     project_root = Path(root) if root else Path.cwd()
-    file_path = project_root.joinpath(name_or_path)
-    if not file_path.exists():
+    file_path = project_root.joinpath(name_or_path).absolute()
+    try:
+        file_stat = file_path.stat()
+    except FileNotFoundError:
         log.log(INFO, "'%s' does not exist", file_path)
         return {}
 
-    if not file_path.is_file():
+    if not stat.S_ISREG(file_stat.st_mode):
         msg = f"'{file_path}' is not a file"
         raise OSError(msg)
 
+    file_key = (file_stat.st_mtime_ns, file_stat.st_size)
+    cached = _toml_cache.get(file_path)
+    if cached is not None and cached[0] == file_key:
+        log.log(DEBUG, "Using already parsed '%s'", file_path)
+        return cached[1]
+
     log.log(INFO, "Trying 'pyproject.toml' ...")
     try:
         # for Python 3.11+
@@ -47,20 +80,41 @@ def read_toml(name_or_path: str | os.PathLike = "pyproject.toml", root: str | os
             parsed_file = tomli.load(file)
 
     result = parsed_file.get("tool", {}).get("setuptools-git-versioning", None)
-    if result:
+    if result and log.isEnabledFor(DEBUG):
+        from pprint import pformat
+
         log.log(DEBUG, "'tool.setuptools-git-versioning' section content:\n%s", pformat(result))
+
+    if isinstance(result, dict):
+        result = MappingProxyType(result)
+    _toml_cache[file_path] = (file_key, result)
     return result
 
 
 def infer_version(dist: Distribution, root: str | os.PathLike | None = None) -> Version | None:
+    # this hook is called for every package built with setuptools, even if it does not use setuptools-git-versioning.
+    # skip such packages before importing anything else or parsing 'pyproject.toml'
+    if getattr(dist, "setuptools_git_versioning", None) is None and not _may_have_toml_config(root):
+        return None
+
     log.log(INFO, "Trying 'setup.py' ...")
+    config = getattr(dist, "setuptools_git_versioning", None)
+    version = _version_from_config(dist.metadata.name, config, root=root)
+    if version is not None:
+        dist.metadata.version = str(version)
+    return version
+
 
-    # see above
+def _version_from_config(
+    package_name: str | None,
+    config: Mapping[str, Any] | None,
+    root: str | os.PathLike | None = None,
+) -> Version | None:
+    # setuptools should be imported before distutils, see 'infer_setup_py'
     import setuptools  # isort: skip  # noqa: F401
 
     from distutils.errors import DistutilsOptionError, DistutilsSetupError
 
-    config = getattr(dist, "setuptools_git_versioning", None)
     toml_config = read_toml(root=root)
 
     if config is None:
@@ -76,19 +130,64 @@ def infer_version(dist: Distribution, root: str | os.PathLike | None = None) ->
         # Nothing to do here
         return None
 
-    if not isinstance(config, dict):
+    if not isinstance(config, Mapping):
         msg = f"Wrong config format. Expected dict, got: {config}"
         raise DistutilsOptionError(msg)
 
-    if not config or not config.pop("enabled", True):
+    if not config or not config.get("enabled", True):
         # Nothing to do here
         return None
 
-    set_default_options(config)
+    config = set_default_options(config)
 
-    version = version_from_git(dist.metadata.name, **config, root=root)
-    dist.metadata.version = str(version)
-    return version
+    from setuptools_git_versioning.version import version_from_git
+
+    return version_from_git(package_name, **config, root=root)
+
+
+def _is_setup_call(node: ast.AST) -> bool:
+    if not isinstance(node, ast.Call):
+        return False
+
+    func = node.func
+    if isinstance(func, ast.Attribute):
+        return func.attr == "setup"
+    return isinstance(func, ast.Name) and func.id == "setup"
+
+
+def _static_setup_kwargs(setup_py_path: Path) -> dict | None:
+    """Read ``name`` and ``setuptools_git_versioning`` arguments of ``setup(...)`` call without executing 'setup.py'.
+
+    Returns ``None`` if values cannot be resolved statically, e.g. if there are several ``setup`` calls,
+    arguments are passed using ``**kwargs``, or argument value is not a literal.
+    """
+    try:
+        tree = ast.parse(setup_py_path.read_bytes(), filename=os.fspath(setup_py_path))
+    except (SyntaxError, ValueError):
+        return None
+
+    calls = [node for node in ast.walk(tree) if _is_setup_call(node)]
+    if len(calls) != 1:
+        log.log(DEBUG, "Found %d 'setup(...)' calls in '%s', cannot analyze it statically", len(calls), setup_py_path)
+        return None
+
+    keywords = {keyword.arg: keyword.value for keyword in calls[0].keywords}
+    if None in keywords or "name" not in keywords:
+        log.log(DEBUG, "'setup(...)' call arguments in '%s' cannot be resolved statically", setup_py_path)
+        return None
+
+    result = {}
+    for name in ("name", "setuptools_git_versioning"):
+        if name not in keywords:
+            continue
+
+        try:
+            result[name] = ast.literal_eval(keywords[name])
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            log.log(DEBUG, "Value of %r argument in '%s' is not a literal", name, setup_py_path)
+            return None
+
+    return result
 
 
 def infer_setup_py(name_or_path: str = "setup.py", root: str | os.PathLike | None = None) -> Version | None:
@@ -98,6 +197,31 @@ def infer_setup_py(name_or_path: str = "setup.py", root: str | os.PathLike | Non
         log.log(INFO, "'%s' does not exist", setup_py_path)
         return None
 
+    # executing 'setup.py' is slow and may have side effects, so try to read config from it first
+    kwargs = _static_setup_kwargs(setup_py_path)
+    if kwargs is not None:
+        log.log(INFO, "Config was read from '%s' without executing it", setup_py_path)
+        return _version_from_config(kwargs["name"], kwargs.get("setuptools_git_versioning"), root=root)
+
+    from setuptools_git_versioning.forkserver import get_server
+
+    # tools evaluating a lot of 'setup.py' files can start the server to execute them in separated processes,
+    # to avoid leaking modules into the caller. for a single file starting one more interpreter is too expensive
+    server = get_server()
+    if server.available and server.running:
+        try:
+            result = server.evaluate(setup_py_path, project_root)
+        except BrokenPipeError as e:
+            log.log(DEBUG, "Cannot evaluate '%s' in a separated process: %r", setup_py_path, e)
+            server.available = False
+        else:
+            if result is None:
+                return None
+
+            from packaging.version import Version
+
+            return Version(result)
+
     # because we use distutils in this file, we need to ensure that setuptools is
     # imported first so that it can do monkey patching. this is not always already
     # done for us, for example, when running this in a test or as a module
@@ -105,6 +229,8 @@ def infer_setup_py(name_or_path: str = "setup.py", root: str | os.PathLike | Non
 
     from distutils.core import run_setup
 
+    from setuptools_git_versioning.factories import add_to_sys_path
+
     # distutils does not change current directory, causing version of 'setuptools_git_versioning'
     # is being get instead of target package.
     # also some setup.py files can contain imports of other files from the package,
@@ -124,7 +250,7 @@ def infer_setup_py(name_or_path: str = "setup.py", root: str | os.PathLike | Non
         os.chdir(original_cwd)
 
 
-def get_version(config: dict | None = None, root: str | os.PathLike | None = None) -> Version:
+def get_version(config: Mapping[str, Any] | None = None, root: str | os.PathLike | None = None) -> Version:
     if not config:
         log.log(INFO, "No explicit config passed")
         log.log(INFO, "Searching for config files in '%s' folder", root or Path.cwd())
@@ -134,7 +260,9 @@ def get_version(config: dict | None = None, root: str | os.PathLike | None = Non
 
         config = read_toml(root=root)
 
-    if not config or not config.pop("enabled", True):
+    if not config or not config.get("enabled", True):
+        import textwrap
+
         raise RuntimeError(
             textwrap.dedent(
                 f"""
@@ -146,5 +274,8 @@ def get_version(config: dict | None = None, root: str | os.PathLike | None = Non
             ),
         )
 
-    set_default_options(config)
+    config = set_default_options(config)
+
+    from setuptools_git_versioning.version import version_from_git
+
     return version_from_git(**config, root=root)
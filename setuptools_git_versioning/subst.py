@@ -3,13 +3,15 @@ from __future__ import annotations
 import logging
 import os
 import re
-from datetime import datetime, timezone
-from pprint import pformat
+from string import Formatter
+from typing import Iterator
 
 from setuptools_git_versioning.log import DEBUG
 
 ENV_VARS_REGEXP = re.compile(r"\{env:(?P<name>[^:}]+):?(?P<default>[^}]+\}*)?\}", re.IGNORECASE | re.UNICODE)
 TIMESTAMP_REGEXP = re.compile(r"\{timestamp:?(?P<fmt>[^:}]+)?\}", re.IGNORECASE | re.UNICODE)
+# 'name' from 'name.attr' or 'name[key]'
+FIELD_NAME_REGEXP = re.compile(r"[^.\[]*")
 
 log = logging.getLogger(__name__)
 
@@ -36,6 +38,8 @@ def substitute_env_variables(template: str) -> str:
 
 
 def substitute_timestamp(template: str) -> str:
+    from datetime import datetime, timezone
+
     log.log(DEBUG, "Substitute timestamps in template %r", template)
 
     now = datetime.now(tz=timezone.utc).astimezone()
@@ -54,7 +58,10 @@ def substitute_timestamp(template: str) -> str:
 
 def resolve_substitutions(template: str, *args, **kwargs) -> str:
     log.log(DEBUG, "Template: %r", template)
-    log.log(DEBUG, "Args:%s", pformat(args))
+    if log.isEnabledFor(DEBUG):
+        from pprint import pformat
+
+        log.log(DEBUG, "Args:%s", pformat(args))
 
     while True:
         if "{env" in template:
@@ -69,3 +76,31 @@ def resolve_substitutions(template: str, *args, **kwargs) -> str:
         template = substitute_timestamp(template)
 
     return template.format(*args, **kwargs)
+
+
+def _iter_fields(template: str) -> Iterator[str]:
+    for _, field_name, format_spec, _ in Formatter().parse(template):
+        if field_name is not None:
+            yield FIELD_NAME_REGEXP.match(field_name).group()  # type: ignore[union-attr]
+        if format_spec:
+            # like '{tag:>{width}}'
+            yield from _iter_fields(format_spec)
+
+
+def template_fields(template: str) -> set[str] | None:
+    """Return names of substitutions used by template, like ``{"tag", "ccount"}``.
+
+    Returns ``None`` if they cannot be determined without rendering the template.
+    """
+    if "{env" in template:
+        # values of environment variables are substituted too
+        return None
+
+    if "{timestamp" in template:
+        template = TIMESTAMP_REGEXP.sub("", template)
+
+    try:
+        return set(_iter_fields(template))
+    except ValueError:
+        log.log(DEBUG, "Cannot parse template %r", template)
+        return None
@@ -1,19 +1,25 @@
 from __future__ import annotations
 
-import inspect
 import logging
 import os  # noqa: TC003
 import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import partial
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable, Iterator, NamedTuple
 
 # avoid importing 'packaging' because setuptools-git-versioning can be installed using sdist
 # where 'packaging' is not installed yet
 from packaging.version import Version
 
+from setuptools_git_versioning.cache import CacheEntry, VersionCache, get_cache_dir
 from setuptools_git_versioning.defaults import (
+    DEFAULT_CACHE,
+    DEFAULT_CONCURRENT,
     DEFAULT_DEV_TEMPLATE,
     DEFAULT_DIRTY_TEMPLATE,
+    DEFAULT_SINGLE_FLIGHT,
     DEFAULT_SORT_BY,
     DEFAULT_STARTING_VERSION,
     DEFAULT_TEMPLATE,
@@ -25,15 +31,153 @@ from setuptools_git_versioning.factories import (
     import_reference,
     load_callable,
 )
-from setuptools_git_versioning.git import count_since, get_branch, get_latest_file_commit, get_sha, get_tag, is_dirty
+from setuptools_git_versioning.git import (
+    Repository,
+    _run_in_thread,
+    count_since,
+    get_branch,
+    get_latest_file_commit,
+    get_latest_tag,
+    get_sha,
+    get_tag_info,
+    is_dirty,
+)
 from setuptools_git_versioning.log import DEBUG, INFO
-from setuptools_git_versioning.subst import resolve_substitutions
+from setuptools_git_versioning.subst import resolve_substitutions, template_fields
 
 # https://github.com/pypa/setuptools/blob/bc39d28bda2a1faee6680ae30e42526b9d775151/setuptools/command/dist_info.py#L108-L131
 UNSUPPORTED_SYMBOL_REGEXP = re.compile(r"[^\w\d!]+", re.IGNORECASE | re.UNICODE)
 
 log = logging.getLogger(__name__)
 
+# HEAD commit, latest tag, dirty state, branch name, latest version file commit
+MAX_CONCURRENT_QUERIES = 5
+
+
+class _DeferredCall(Future):
+    """Call which is executed only when its result is requested, like the sequential code does"""
+
+    def __init__(self, func: Callable[..., Any], *args, **kwargs) -> None:
+        super().__init__()
+        self._call = (func, args, kwargs)
+
+    def result(self, timeout: float | None = None) -> Any:
+        if not self.done():
+            func, args, kwargs = self._call
+            try:
+                self.set_result(func(*args, **kwargs))
+            except Exception as e:  # noqa: BLE001
+                self.set_exception(e)
+        return super().result(timeout)
+
+
+@contextmanager
+def _git_queries(*, concurrent: bool) -> Iterator[Callable[..., Future]]:
+    """Return function for scheduling git queries.
+
+    In concurrent mode independent queries are started on a thread pool immediately,
+    otherwise each query is executed only when its result is needed.
+    """
+    if not concurrent:
+        yield _DeferredCall
+        return
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_QUERIES, thread_name_prefix="git") as executor:
+        yield executor.submit
+
+
+def _completed(value: Any) -> Future:
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+class _GitQueries(NamedTuple):
+    """Results of git queries used for rendering version number"""
+
+    # str | None
+    head_sha: Future
+    # latest tag, its SHA and number of commits since it
+    latest_tag: Future
+    # SHA of latest version file change and number of commits since it
+    latest_file_change: Future
+    # bool
+    dirty: Future
+    # str | None
+    branch: Future
+
+
+def _skipped(name: str) -> Future:
+    """Result of query which is not executed because templates do not need it"""
+    future: Future = Future()
+    future.set_exception(RuntimeError(f"Query {name!r} is not needed by templates"))
+    return future
+
+
+def _uses_field(template: str, name: str) -> bool:
+    fields = template_fields(template)
+    return fields is None or name in fields
+
+
+def _needed_facts(
+    template: str,
+    dev_template: str,
+    dirty_template: str,
+    branch_formatter: Callable[[str], str] | str | None = None,
+) -> set[str]:
+    """Return names of facts which are collected only if templates may use them"""
+    needed = set()
+    # dirty state can only change the version if it selects another template
+    if not dirty_template == template == dev_template:
+        needed.add("dirty")
+    # branch formatter errors are raised even if branch name is not used
+    if branch_formatter is not None or any(
+        _uses_field(item, "branch") for item in (template, dev_template, dirty_template)
+    ):
+        needed.add("branch")
+    # 'template' is used for a tagged commit, so number of commits since the tag is always 0
+    if any(_uses_field(item, "ccount") for item in (dev_template, dirty_template)):
+        needed.add("ccount")
+    return needed
+
+
+def _collect_facts(queries: _GitQueries) -> dict[str, Any]:
+    """Return results of queries which were executed successfully"""
+    return {
+        name: query.result()
+        for name, query in zip(queries._fields, queries)
+        if query.done() and query.exception() is None
+    }
+
+
+def _open_caches(
+    package_name: str | None,
+    root: str | os.PathLike | None,
+    *,
+    cache: bool,
+    cache_dir: str | os.PathLike | None,
+    **options,
+) -> list[VersionCache]:
+    """Return enabled caches, local one goes first"""
+    config = {"package_name": package_name, **options}
+    caches = []
+    if cache:
+        caches.append(VersionCache.open(config, root=root))
+
+    shared_dir = get_cache_dir(cache_dir, root=root)
+    if shared_dir:
+        caches.append(VersionCache.open_shared(config, shared_dir, root=root))
+    return [item for item in caches if item is not None]
+
+
+def _load_cache(caches: list[VersionCache]) -> tuple[int, CacheEntry] | None:
+    """Return first found entry, with index of the cache containing it"""
+    for i, item in enumerate(caches):
+        entry = item.load()
+        if entry is not None:
+            return i, entry
+    return None
+
 
 def get_version_from_callback(
     version_callback: str | Callable[[], str],
@@ -43,6 +187,8 @@ def get_version_from_callback(
     log.log(INFO, "Parsing version_callback %r of type %r", version_callback, type(version_callback).__name__)
 
     if callable(version_callback):
+        import inspect
+
         log.log(DEBUG, "Value is callable with signature %s", inspect.Signature.from_callable(version_callback))
         result = version_callback()
     else:
@@ -85,7 +231,59 @@ def sanitize_version(version: str) -> Version:
     return result
 
 
-def version_from_git(  # noqa: PLR0915, PLR0912, PLR0913, C901
+def _version_from_pkg_info(project_root: Path) -> Version | None:
+    # Check if PKG-INFO file exists and Version is present in it
+    pkg_info = project_root.joinpath("PKG-INFO")
+    if pkg_info.exists():
+        log.log(INFO, "File '%s' is found, reading its content", pkg_info)
+        lines = pkg_info.read_text().splitlines()
+        for line in lines:
+            if line.startswith("Version:"):
+                version_str = line[8:].strip()
+                log.log(INFO, "Return %s", version_str)
+                # running on sdist package, do not sanitize
+                return Version(version_str)
+    return None
+
+
+def _get_latest_tag(
+    sort_by: str,
+    filter_callback: Callable[[str], str | None] | None,
+    version_file: str | os.PathLike | None,
+    root: str | os.PathLike | Repository | None,
+    *,
+    count_commits: bool = True,
+) -> tuple[str | None, str | None, int | None]:
+    log.log(INFO, "Getting latest tag")
+    log.log(DEBUG, "Sorting tags by %r", sort_by)
+    if not version_file:
+        return get_latest_tag(
+            sort_by=sort_by,
+            filter_callback=filter_callback,
+            root=root,
+            count_commits=count_commits,
+        )
+
+    tag = get_tag_info(sort_by=sort_by, root=root, filter_callback=filter_callback)
+    if not tag:
+        return None, None, None
+    # commits are counted from version file instead
+    return tag.name, tag.commit or get_sha(tag.name, root=root), None
+
+
+def _get_latest_file_change(
+    version_file: str | os.PathLike | None,
+    *,
+    count_commits_from_version_file: bool,
+    root: str | os.PathLike | Repository | None,
+) -> tuple[str | None, int | None]:
+    if not version_file or not count_commits_from_version_file:
+        return None, None
+    file_sha = get_latest_file_commit(version_file, root=root)
+    return file_sha, count_since(file_sha, root=root) if file_sha else None
+
+
+def version_from_git(  # noqa: PLR0913
     package_name: str | None = None,
     *,
     template: str = DEFAULT_TEMPLATE,
@@ -99,20 +297,16 @@ def version_from_git(  # noqa: PLR0915, PLR0912, PLR0913, C901
     branch_formatter: Callable[[str], str] | str | None = None,
     tag_filter: Callable[[str], str | None] | str | None = None,
     sort_by: str = DEFAULT_SORT_BY,
+    concurrent: bool = DEFAULT_CONCURRENT,
+    cache: bool = DEFAULT_CACHE,
+    cache_dir: str | os.PathLike | None = None,
+    single_flight: bool = DEFAULT_SINGLE_FLIGHT,
     root: str | os.PathLike | None = None,
 ) -> Version:
-    # Check if PKG-INFO file exists and Version is present in it
     project_root = Path(root) if root else Path.cwd()
-    pkg_info = project_root.joinpath("PKG-INFO")
-    if pkg_info.exists():
-        log.log(INFO, "File '%s' is found, reading its content", pkg_info)
-        lines = pkg_info.read_text().splitlines()
-        for line in lines:
-            if line.startswith("Version:"):
-                version_str = line[8:].strip()
-                log.log(INFO, "Return %s", version_str)
-                # running on sdist package, do not sanitize
-                return Version(version_str)
+    result = _version_from_pkg_info(project_root)
+    if result is not None:
+        return result
 
     if version_callback is not None:
         if version_file is not None:
@@ -120,22 +314,207 @@ def version_from_git(  # noqa: PLR0915, PLR0912, PLR0913, C901
             raise ValueError(msg)
         return get_version_from_callback(version_callback, package_name, root=root)
 
-    head_sha = get_sha(root=root)
-    log.log(INFO, "HEAD SHA-256: %r", head_sha)
-
     filter_callback = None
     if tag_filter:
         filter_callback = create_tag_filter(tag_filter, package_name=package_name, root=root)
 
-    log.log(INFO, "Getting latest tag")
-    log.log(DEBUG, "Sorting tags by %r", sort_by)
-    tag = get_tag(sort_by=sort_by, root=root, filter_callback=filter_callback)
+    caches = _open_caches(
+        package_name,
+        root,
+        # result is published using local cache
+        cache=cache or single_flight,
+        cache_dir=cache_dir,
+        template=template,
+        dev_template=dev_template,
+        dirty_template=dirty_template,
+        starting_version=starting_version,
+        version_file=version_file,
+        count_commits_from_version_file=count_commits_from_version_file,
+        tag_formatter=tag_formatter,
+        branch_formatter=branch_formatter,
+        tag_filter=tag_filter,
+        sort_by=sort_by,
+    )
+    # lock file is created only inside git directory, shared cache directory can be on NFS
+    local_cache = next((item for item in caches if item.local), None)
+    with ExitStack() as stack:
+        if single_flight and local_cache is not None:
+            # other processes are waiting until the version is saved to cache, and then read it
+            stack.enter_context(local_cache.lock())
+
+        return _version_from_git_cached(
+            caches,
+            package_name,
+            template=template,
+            dev_template=dev_template,
+            dirty_template=dirty_template,
+            starting_version=starting_version,
+            version_file=version_file,
+            count_commits_from_version_file=count_commits_from_version_file,
+            tag_formatter=tag_formatter,
+            branch_formatter=branch_formatter,
+            filter_callback=filter_callback,
+            sort_by=sort_by,
+            concurrent=concurrent,
+            root=root,
+        )
+
+
+def _version_from_git_cached(  # noqa: PLR0913
+    caches: list[VersionCache],
+    package_name: str | None,
+    *,
+    template: str,
+    dev_template: str,
+    dirty_template: str,
+    starting_version: str,
+    version_file: str | os.PathLike | None,
+    count_commits_from_version_file: bool,
+    tag_formatter: Callable[[str], str] | str | None,
+    branch_formatter: Callable[[str], str] | str | None,
+    filter_callback: Callable[[str], str | None] | None,
+    sort_by: str,
+    concurrent: bool,
+    root: str | os.PathLike | None,
+) -> Version:
+    # repository is discovered only once for all queries
+    repository = Repository(root)
+    facts: dict[str, Any] = {}
+    if caches:
+        found = _load_cache(caches)
+        if found is not None:
+            index, cached = found
+            facts = dict(cached.facts)
+            # worktree changes are not tracked by cache key, so dirty state is always checked
+            if "dirty" not in facts or is_dirty(root=repository) == facts["dirty"]:
+                # copy entry to caches checked before
+                for missed in caches[:index]:
+                    missed.save(cached)
+                return Version(cached.version)
+            facts["dirty"] = not facts["dirty"]
+
+    needed = _needed_facts(template, dev_template, dirty_template, branch_formatter)
+    log.log(DEBUG, "Optional facts needed by templates: %r", sorted(needed))
+    calls = _GitQueries(
+        head_sha=partial(get_sha, root=repository),
+        latest_tag=partial(
+            _get_latest_tag,
+            sort_by,
+            filter_callback,
+            version_file,
+            repository,
+            count_commits="ccount" in needed,
+        ),
+        latest_file_change=partial(
+            _get_latest_file_change,
+            version_file,
+            count_commits_from_version_file=count_commits_from_version_file,
+            root=repository,
+        ),
+        dirty=partial(is_dirty, root=repository) if "dirty" in needed else None,
+        branch=partial(get_branch, root=repository) if "branch" in needed else None,
+    )
+
+    # only these queries depend on each other, so they are grouped together
+    with _git_queries(concurrent=concurrent) as submit:
+        queries = _GitQueries(
+            *(
+                _completed(facts[name]) if name in facts else _skipped(name) if call is None else submit(call)
+                for name, call in zip(calls._fields, calls)
+            ),
+        )
+
+    version = _version_from_queries(
+        queries,
+        package_name,
+        template=template,
+        dev_template=dev_template,
+        dirty_template=dirty_template,
+        starting_version=starting_version,
+        version_file=version_file,
+        count_commits_from_version_file=count_commits_from_version_file,
+        tag_formatter=tag_formatter,
+        branch_formatter=branch_formatter,
+        root=root,
+    )
+    entry = CacheEntry(str(version), _collect_facts(queries))
+    for item in caches:
+        item.save(entry)
+    return version
+
+
+async def version_from_git_async(  # noqa: PLR0913
+    package_name: str | None = None,
+    *,
+    template: str = DEFAULT_TEMPLATE,
+    dev_template: str = DEFAULT_DEV_TEMPLATE,
+    dirty_template: str = DEFAULT_DIRTY_TEMPLATE,
+    starting_version: str = DEFAULT_STARTING_VERSION,
+    version_callback: str | Callable[[], str] | None = None,
+    version_file: str | os.PathLike | None = None,
+    count_commits_from_version_file: bool = False,
+    tag_formatter: Callable[[str], str] | str | None = None,
+    branch_formatter: Callable[[str], str] | str | None = None,
+    tag_filter: Callable[[str], str | None] | str | None = None,
+    sort_by: str = DEFAULT_SORT_BY,
+    concurrent: bool = DEFAULT_CONCURRENT,
+    cache: bool = DEFAULT_CACHE,
+    cache_dir: str | os.PathLike | None = None,
+    single_flight: bool = DEFAULT_SINGLE_FLIGHT,
+    root: str | os.PathLike | None = None,
+) -> Version:
+    """Async version of :obj:`version_from_git`.
+
+    Version is calculated in a thread, so versions of many repositories can be calculated
+    using the same event loop. Independent queries are always executed concurrently,
+    so ``concurrent`` option is ignored.
+    """
+    return await _run_in_thread(
+        version_from_git,
+        package_name,
+        template=template,
+        dev_template=dev_template,
+        dirty_template=dirty_template,
+        starting_version=starting_version,
+        version_callback=version_callback,
+        version_file=version_file,
+        count_commits_from_version_file=count_commits_from_version_file,
+        tag_formatter=tag_formatter,
+        branch_formatter=branch_formatter,
+        tag_filter=tag_filter,
+        sort_by=sort_by,
+        concurrent=True,
+        cache=cache,
+        cache_dir=cache_dir,
+        single_flight=single_flight,
+        root=root,
+    )
+
+
+def _version_from_queries(  # noqa: PLR0915, PLR0912, PLR0913, C901
+    queries: _GitQueries,
+    package_name: str | None = None,
+    *,
+    template: str,
+    dev_template: str,
+    dirty_template: str,
+    starting_version: str,
+    version_file: str | os.PathLike | None,
+    count_commits_from_version_file: bool,
+    tag_formatter: Callable[[str], str] | str | None,
+    branch_formatter: Callable[[str], str] | str | None,
+    root: str | os.PathLike | None,
+) -> Version:
+    project_root = Path(root) if root else Path.cwd()
+
+    head_sha = queries.head_sha.result()
+    log.log(INFO, "HEAD SHA-256: %r", head_sha)
+
+    tag, tag_sha, tag_ccount = queries.latest_tag.result()
     if not tag:
         log.log(INFO, "No tags found")
-        tag_sha = None
         on_tag = False
     else:
-        tag_sha = get_sha(tag, root=root)
         log.log(INFO, "Tag SHA-256: %r", tag_sha)
 
         on_tag = head_sha is not None and head_sha == tag_sha
@@ -164,18 +543,19 @@ def version_from_git(  # noqa: PLR0915, PLR0912, PLR0913, C901
                 if not count_commits_from_version_file:
                     return sanitize_version(tag)
 
-                file_sha = get_latest_file_commit(version_file, root=root)
+                file_sha, ccount = queries.latest_file_change.result()
                 log.log(DEBUG, "File SHA-256: %r", file_sha)
-
-                ccount = count_since(file_sha, root=root) if file_sha else None
                 log.log(INFO, "Commits count between HEAD and last version file change: %r", ccount)
+                has_ccount = ccount is not None
 
     elif not head_sha:
         log.log(INFO, "Not a git repo, or repo without any branch")
 
     elif tag_sha:
-        ccount = count_since(tag_sha, root=root)
+        ccount = tag_ccount
         log.log(INFO, "Commits count between HEAD and last tag: %r", ccount)
+        # commits are not counted if templates are not using their number
+        has_ccount = ccount is not None or "ccount" not in _needed_facts(template, dev_template, dirty_template)
 
         if tag_formatter is not None:
             tag_format_callback = create_tag_formatter(tag_formatter, package_name=package_name, root=root)
@@ -186,26 +566,29 @@ def version_from_git(  # noqa: PLR0915, PLR0912, PLR0913, C901
         log.log(INFO, "No source for version, return starting_version %r", starting_version)
         return sanitize_version(starting_version)
 
-    dirty = is_dirty(root=root)
-    log.log(INFO, "Is dirty: %r", dirty)
-
-    branch = get_branch(root=root)
-    log.log(INFO, "Current branch: %r", branch)
-
-    if branch_formatter is not None and branch is not None:
-        branch_format_callback = create_branch_formatter(branch_formatter, package_name=package_name, root=root)
-        branch = branch_format_callback(branch)
-        log.log(INFO, "Branch after formatting: %r", branch)
+    if not on_tag and has_ccount:
+        option, t = "dev_template", dev_template
+    else:
+        option, t = "template", template
 
-    if dirty:
-        log.log(INFO, "Using template from 'dirty_template' option")
-        t = dirty_template
-    elif not on_tag and ccount is not None:
-        log.log(INFO, "Using template from 'dev_template' option")
-        t = dev_template
+    if dirty_template == t:
+        log.log(DEBUG, "'dirty_template' is the same as %r, skipping dirty state check", option)
     else:
-        log.log(INFO, "Using template from 'template' option")
-        t = template
+        dirty = queries.dirty.result()
+        log.log(INFO, "Is dirty: %r", dirty)
+        if dirty:
+            option, t = "dirty_template", dirty_template
+    log.log(INFO, "Using template from %r option", option)
+
+    branch = None
+    if branch_formatter is not None or _uses_field(t, "branch"):
+        branch = queries.branch.result()
+        log.log(INFO, "Current branch: %r", branch)
+
+        if branch_formatter is not None and branch is not None:
+            branch_format_callback = create_branch_formatter(branch_formatter, package_name=package_name, root=root)
+            branch = branch_format_callback(branch)
+            log.log(INFO, "Branch after formatting: %r", branch)
 
     full_sha = head_sha if head_sha is not None else ""
     version = resolve_substitutions(t, sha=full_sha[:8], tag=tag, ccount=ccount or 0, branch=branch, full_sha=full_sha)
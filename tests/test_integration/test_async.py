@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from setuptools_git_versioning import git
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+from setuptools_git_versioning.version import version_from_git, version_from_git_async
+from tests.lib.util import checkout_branch, create_file, create_tag, execute, get_sha
+
+pytestmark = pytest.mark.all
+
+
+@pytest.fixture(params=[True, False], ids=["native", "exec"])
+def native(request, monkeypatch):
+    if not request.param:
+
+        def unsupported(*args, **kwargs):
+            msg = "disabled in test"
+            raise UnsupportedRepositoryError(msg)
+
+        monkeypatch.setattr(git, "_ref_store", unsupported)
+        monkeypatch.setattr(git, "_native_is_dirty", unsupported)
+        monkeypatch.setattr(git, "_native_count_since", unsupported)
+    return request.param
+
+
+def test_async_git_functions(repo, native):
+    create_tag(repo, "1.0.0")
+    create_file(repo, "VERSION.txt", "1.0.0")
+    create_tag(repo, "1.1.0", message="Annotated")
+    checkout_branch(repo, "feature")
+    create_file(repo)
+    create_file(repo, add=False)
+
+    async def run():
+        return await asyncio.gather(
+            git.get_branches_async(root=repo),
+            git.get_branch_async(root=repo),
+            git.get_all_tags_async(root=repo),
+            git.get_tags_async(root=repo),
+            git.get_tag_async(root=repo),
+            git.get_tag_async(filter_callback=lambda tag: tag if tag == "1.0.0" else None, root=repo),
+            git.get_sha_async(root=repo),
+            git.get_sha_async("1.1.0", root=repo),
+            git.get_latest_file_commit_async("VERSION.txt", root=repo),
+            git.is_dirty_async(root=repo),
+            git.count_since_async("1.0.0", root=repo),
+        )
+
+    assert asyncio.run(run()) == [
+        git.get_branches(root=repo),
+        git.get_branch(root=repo),
+        git.get_all_tags(root=repo),
+        git.get_tags(root=repo),
+        git.get_tag(root=repo),
+        git.get_tag(filter_callback=lambda tag: tag if tag == "1.0.0" else None, root=repo),
+        git.get_sha(root=repo),
+        git.get_sha("1.1.0", root=repo),
+        git.get_latest_file_commit("VERSION.txt", root=repo),
+        git.is_dirty(root=repo),
+        git.count_since("1.0.0", root=repo),
+    ]
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {},
+        {"dev_template": "{tag}.post{ccount}+{branch}.{sha}"},
+        {"tag_filter": "1.0.*", "tag_formatter": "(?P<tag>[\\d.]+)"},
+        {"version_file": "VERSION.txt", "count_commits_from_version_file": True},
+        {"version_file": "VERSION.txt"},
+        {"version_file": "missing.txt"},
+    ],
+)
+def test_version_from_git_async(repo, native, config):
+    create_file(repo, "VERSION.txt", "1.2.3")
+    create_tag(repo, "1.0.0")
+    create_file(repo)
+    create_tag(repo, "1.1.0")
+    create_file(repo)
+    create_file(repo, add=False)
+
+    expected = version_from_git(**config, root=repo)
+    assert asyncio.run(version_from_git_async(**config, root=repo)) == expected
+
+
+def test_version_from_git_async_many_repos(tmp_path_factory):
+    roots = []
+    for i in range(5):
+        root = tmp_path_factory.mktemp("repo")
+        execute(root, "git", "init", "-b", "master")
+        execute(root, "git", "config", "--local", "user.email", "tests@example.com")
+        execute(root, "git", "config", "--local", "user.name", "Tests runner")
+        create_file(root)
+        create_tag(root, f"1.{i}.0")
+        create_file(root)
+        roots.append(root)
+
+    async def run():
+        return await asyncio.gather(*(version_from_git_async(root=root) for root in roots))
+
+    versions = asyncio.run(run())
+    assert [str(version) for version in versions] == [
+        f"1.{i}.0.post1+git.{get_sha(root)}" for i, root in enumerate(roots)
+    ]
+
+
+def test_version_from_git_async_not_a_repo(tmp_path_factory):
+    root = tmp_path_factory.mktemp("not_a_repo")
+    assert str(asyncio.run(version_from_git_async(root=root))) == "0.0.1"
@@ -0,0 +1,140 @@
+import subprocess
+
+import pytest
+
+from setuptools_git_versioning import batch
+from setuptools_git_versioning.batch import CatFileBatch, close_all, get_cat_file
+from setuptools_git_versioning.git import Repository, _exec, _exec_tag_infos, _ref_store, get_sha
+from setuptools_git_versioning.native.refs import short_name
+from setuptools_git_versioning.native.tags import sorted_tags
+from tests.lib.util import create_file, create_tag, execute, get_full_sha
+
+pytestmark = pytest.mark.all
+
+
+def test_batch_query(repo):
+    create_file(repo)
+    create_tag(repo, "1.0.0", message="Annotated")
+
+    worker = CatFileBatch(Repository(repo))
+    try:
+        head, tag, missing, content = worker.query(
+            ["info HEAD", "info 1.0.0^{commit}", "info unknown", "contents HEAD"],
+        )
+    finally:
+        worker.close()
+
+    assert head.oid == get_full_sha(repo)
+    assert head.type == "commit"
+    assert tag.oid == get_full_sha(repo)
+    assert missing is None
+    assert content.content == subprocess.check_output(["git", "cat-file", "commit", "HEAD"], cwd=repo)
+
+
+def test_batch_shared(repo):
+    assert get_cat_file(Repository(repo)) is get_cat_file(Repository(repo))
+    assert get_cat_file(Repository(repo)).info("HEAD").oid == get_full_sha(repo)
+
+    process = get_cat_file(Repository(repo)).process
+    close_all()
+    assert process.poll() is not None
+    assert get_cat_file(Repository(repo)).process is None
+
+
+def test_batch_repository(repo):
+    repository = Repository(repo)
+    worker = CatFileBatch(repository)
+    try:
+        assert worker.info("HEAD").oid == get_full_sha(repo)
+        # repository is not discovered by git again
+        assert worker.process.args[0] == repository.executable
+        assert f"--git-dir={repo / '.git'}" in worker.process.args
+    finally:
+        worker.close()
+
+
+def test_batch_recovery(repo):
+    worker = CatFileBatch(Repository(repo))
+    assert worker.info("HEAD").oid == get_full_sha(repo)
+
+    worker.process.kill()
+    worker.process.wait()
+    create_file(repo)
+
+    assert worker.info("HEAD").oid == get_full_sha(repo)
+    assert worker.available
+    worker.close()
+
+
+def test_batch_unavailable(tmp_path_factory):
+    worker = CatFileBatch(Repository(tmp_path_factory.mktemp("not_a_repo")))
+    assert worker.info("HEAD") is None
+    assert not worker.available
+    assert worker.query(["info HEAD"]) is None
+
+
+def test_batch_get_sha(repo):
+    create_file(repo)
+    create_tag(repo, "1.0.0", message="Annotated")
+
+    # revision expressions and unknown names are not handled by native reader
+    for name in ("HEAD", "1.0.0", "master", "HEAD~1", "1.0.0^{tree}", "unknown"):
+        expected = _exec("git", "rev-list", "-n", "1", name, root=repo)
+        assert get_sha(name, root=repo) == (expected[0] if expected else None)
+
+
+def test_batch_eviction(tmp_path_factory, monkeypatch):
+    monkeypatch.setattr(batch, "MAX_WORKERS", 2)
+    close_all()
+
+    workers = [get_cat_file(Repository(tmp_path_factory.mktemp("repo"))) for _ in range(3)]
+    assert get_cat_file(Repository(workers[1].root)) is workers[1]
+    assert get_cat_file(Repository(workers[0].root)) is not workers[0]
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    result = []
+    original_query = CatFileBatch.query
+
+    def query(self, commands):
+        result.append(commands)
+        return original_query(self, commands)
+
+    monkeypatch.setattr(CatFileBatch, "query", query)
+    return result
+
+
+def test_batch_objects_fallback(repo, tmp_path_factory, queries):
+    for i in range(3):
+        create_file(repo)
+        create_tag(repo, f"1.0.{i}", message="Annotated")
+
+    # objects are stored in alternate object directory, which is not read directly
+    clone = tmp_path_factory.mktemp("clone")
+    execute(clone, "git", "clone", "-q", "--shared", repo, ".")
+
+    refs = _ref_store(clone)
+    tags = [(short_name(ref.name), commit) for ref, commit in sorted_tags(refs, "taggerdate")]
+    expected = _exec(
+        "git",
+        "for-each-ref",
+        "--sort=-taggerdate",
+        "--format=%(refname:strip=2) %(*objectname)",
+        "refs/tags",
+        root=clone,
+    )
+    assert tags == [tuple(line.split()) for line in expected]
+    # tag objects are requested at once
+    assert len(queries) == 1
+
+
+def test_batch_peel_nested_tags(repo, queries):
+    create_file(repo)
+    create_tag(repo, "1.0.0", message="Annotated")
+    create_tag(repo, "1.0.1", message="Nested", commit="1.0.0")
+    create_tag(repo, "1.0.2", message="Nested", commit="1.0.1")
+
+    tags = _exec_tag_infos(sort_by="refname", merged=False, root=repo)
+    assert [tag.commit for tag in tags] == [get_full_sha(repo)] * 3
+    assert len(queries) <= 1
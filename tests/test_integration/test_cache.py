@@ -0,0 +1,227 @@
+import asyncio
+
+import pytest
+
+from setuptools_git_versioning import version as version_module
+from setuptools_git_versioning.cache import CACHE_DIR, CACHE_DIR_ENV
+from setuptools_git_versioning.version import version_from_git, version_from_git_async
+from tests.lib.util import create_file, create_tag, execute, get_sha, get_version
+
+pytestmark = pytest.mark.all
+
+
+def cache_files(repo):
+    return list(repo.joinpath(".git", CACHE_DIR).glob("*.json"))
+
+
+def shared_cache_files(cache_dir):
+    return list(cache_dir.glob("*/*.json"))
+
+
+def forbid_git_queries(monkeypatch):
+    def fail(*args, **kwargs):
+        msg = "should not be called"
+        raise AssertionError(msg)
+
+    for name in ("get_sha", "get_tag_info", "get_latest_tag", "get_branch", "count_since", "get_latest_file_commit"):
+        monkeypatch.setattr(version_module, name, fail)
+
+
+def test_cache(repo, create_config, template_config):
+    template_config(repo, create_config, config={"cache": True})
+    create_file(repo)
+
+    sha = get_sha(repo)
+    assert get_version(repo) == f"1.2.3.post1+git.{sha}"
+    assert len(cache_files(repo)) == 1
+
+    assert get_version(repo) == f"1.2.3.post1+git.{sha}"
+    assert len(cache_files(repo)) == 1
+
+
+@pytest.mark.parametrize("dirty", [True, False])
+def test_cache_reused(repo, monkeypatch, dirty):
+    create_tag(repo, "1.0.0")
+    create_file(repo)
+    if dirty:
+        create_file(repo, add=False)
+
+    expected = version_from_git(cache=True, root=repo)
+    assert cache_files(repo)
+
+    # only dirty state is checked
+    forbid_git_queries(monkeypatch)
+
+    assert version_from_git(cache=True, root=repo) == expected
+
+
+def test_cache_dirty_changed(repo, monkeypatch):
+    create_tag(repo, "1.0.0")
+    create_file(repo)
+    sha = get_sha(repo)
+    assert str(version_from_git(cache=True, root=repo)) == f"1.0.0.post1+git.{sha}"
+
+    create_file(repo, "new.txt", add=False)
+    assert str(version_from_git(cache=True, root=repo)) == f"1.0.0.post1+git.{sha}.dirty"
+
+    repo.joinpath("new.txt").unlink()
+    assert str(version_from_git(cache=True, root=repo)) == f"1.0.0.post1+git.{sha}"
+
+
+def test_cache_tracked_file_changed(repo):
+    create_tag(repo, "1.0.0")
+    create_file(repo, "tracked.txt", "old")
+    sha = get_sha(repo)
+    assert str(version_from_git(cache=True, root=repo)) == f"1.0.0.post1+git.{sha}"
+
+    # unstaged change does not update the index
+    repo.joinpath("tracked.txt").write_text("new")
+    assert str(version_from_git(cache=True, root=repo)) == f"1.0.0.post1+git.{sha}.dirty"
+
+    execute(repo, "git", "checkout", "--", "tracked.txt")
+    assert str(version_from_git(cache=True, root=repo)) == f"1.0.0.post1+git.{sha}"
+
+
+def test_cache_ignore_changed(repo):
+    create_tag(repo, "1.0.0")
+    create_file(repo, "new.txt", add=False)
+    sha = get_sha(repo)
+    assert str(version_from_git(cache=True, root=repo)) == f"1.0.0.post0+git.{sha}.dirty"
+
+    repo.joinpath(".git", "info").mkdir(exist_ok=True)
+    repo.joinpath(".git", "info", "exclude").write_text("new.txt\n")
+    assert str(version_from_git(cache=True, root=repo)) == "1.0.0"
+
+
+def test_cache_invalidated(repo):
+    # commits can be created at the same second, so dates cannot be used for sorting
+    create_tag(repo, "1.0.0")
+    create_file(repo)
+    sha = get_sha(repo)
+    assert str(version_from_git(sort_by="refname", cache=True, root=repo)) == f"1.0.0.post1+git.{sha}"
+
+    # new commit
+    create_file(repo)
+    sha = get_sha(repo)
+    assert str(version_from_git(sort_by="refname", cache=True, root=repo)) == f"1.0.0.post2+git.{sha}"
+
+    # new tag
+    create_tag(repo, "1.1.0")
+    assert str(version_from_git(sort_by="refname", cache=True, root=repo)) == "1.1.0"
+
+    # packed tag is moved
+    execute(repo, "git", "pack-refs", "--all")
+    execute(repo, "git", "tag", "-f", "1.1.0", "HEAD~1")
+    assert str(version_from_git(sort_by="refname", cache=True, root=repo)) == f"1.1.0.post1+git.{sha}"
+
+    # config changed
+    assert str(version_from_git(dev_template="{tag}.{ccount}", sort_by="refname", cache=True, root=repo)) == "1.1.0.1"
+    assert len(cache_files(repo)) == 2
+
+
+def test_cache_version_file(repo):
+    create_file(repo, "VERSION.txt", "1.0.0")
+    assert str(version_from_git(version_file="VERSION.txt", cache=True, root=repo)) == "1.0.0"
+
+    repo.joinpath("VERSION.txt").write_text("1.1.0")
+    assert str(version_from_git(version_file="VERSION.txt", cache=True, root=repo)) == "1.1.0"
+
+
+def test_cache_callable_config(repo):
+    create_tag(repo, "1.0.0")
+    version = version_from_git(tag_formatter=lambda tag: tag, cache=True, root=repo)
+    assert str(version) == "1.0.0"
+    assert not cache_files(repo)
+
+
+def test_cache_corrupted(repo):
+    create_tag(repo, "1.0.0")
+    assert str(version_from_git(cache=True, root=repo)) == "1.0.0"
+
+    for path in cache_files(repo):
+        path.write_text("{")
+    assert str(version_from_git(cache=True, root=repo)) == "1.0.0"
+
+
+def test_cache_async(repo):
+    create_tag(repo, "1.0.0")
+    create_file(repo)
+    create_file(repo, add=False)
+    expected = version_from_git(root=repo)
+
+    assert asyncio.run(version_from_git_async(cache=True, root=repo)) == expected
+    assert len(cache_files(repo)) == 1
+    assert version_from_git(cache=True, root=repo) == expected
+
+
+def test_cache_disabled(repo):
+    create_tag(repo, "1.0.0")
+    version_from_git(root=repo)
+    assert not cache_files(repo)
+
+
+@pytest.mark.parametrize("dirty", [True, False])
+def test_shared_cache(repo, tmp_path_factory, monkeypatch, dirty):
+    cache_dir = tmp_path_factory.mktemp("cache")
+    create_tag(repo, "1.0.0")
+    create_file(repo)
+
+    clone = tmp_path_factory.mktemp("clone")
+    execute(clone, "git", "clone", repo, ".")
+    if dirty:
+        create_file(clone, add=False)
+
+    expected = version_from_git(cache_dir=cache_dir, root=repo)
+    assert len(shared_cache_files(cache_dir)) == 1
+
+    forbid_git_queries(monkeypatch)
+    version = version_from_git(cache_dir=cache_dir, root=clone)
+    if dirty:
+        assert str(version) == f"{expected}.dirty"
+    else:
+        assert version == expected
+    assert len(shared_cache_files(cache_dir)) == 1
+
+
+def test_shared_cache_env(repo, tmp_path_factory, monkeypatch):
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv(CACHE_DIR_ENV, str(cache_dir))
+    create_tag(repo, "1.0.0")
+
+    assert str(version_from_git(cache_dir="unused", root=repo)) == "1.0.0"
+    assert len(shared_cache_files(cache_dir)) == 1
+    assert not repo.joinpath("unused").exists()
+
+
+def test_shared_cache_relative(repo, create_config):
+    create_config(repo, {"cache_dir": "build/version-cache"})
+    create_tag(repo, "1.0.0")
+
+    assert get_version(repo) == "1.0.0"
+    assert len(shared_cache_files(repo / "build" / "version-cache")) == 1
+
+
+def test_shared_cache_invalidated(repo, tmp_path_factory):
+    cache_dir = tmp_path_factory.mktemp("cache")
+    create_tag(repo, "1.0.0")
+    create_file(repo)
+    sha = get_sha(repo)
+    assert str(version_from_git(sort_by="refname", cache_dir=cache_dir, root=repo)) == f"1.0.0.post1+git.{sha}"
+
+    # tag is moved, but modification time of packed-refs does not matter
+    execute(repo, "git", "pack-refs", "--all")
+    execute(repo, "git", "tag", "-f", "1.0.0", "HEAD")
+    execute(repo, "git", "pack-refs", "--all")
+    assert str(version_from_git(sort_by="refname", cache_dir=cache_dir, root=repo)) == "1.0.0"
+    assert len(shared_cache_files(cache_dir)) == 2
+
+
+def test_shared_cache_filled_local(repo, tmp_path_factory, monkeypatch):
+    cache_dir = tmp_path_factory.mktemp("cache")
+    create_tag(repo, "1.0.0")
+    assert str(version_from_git(cache_dir=cache_dir, root=repo)) == "1.0.0"
+    assert not cache_files(repo)
+
+    forbid_git_queries(monkeypatch)
+    assert str(version_from_git(cache=True, cache_dir=cache_dir, root=repo)) == "1.0.0"
+    assert len(cache_files(repo)) == 1
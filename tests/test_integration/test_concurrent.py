@@ -0,0 +1,45 @@
+import pytest
+
+from setuptools_git_versioning.version import version_from_git
+from tests.lib.util import create_file, create_tag, get_sha, get_version
+
+pytestmark = pytest.mark.all
+
+
+@pytest.mark.parametrize("dirty", [True, False])
+def test_concurrent(repo, create_config, template_config, dirty):
+    template_config(repo, create_config, config={"concurrent": True})
+    create_file(repo)
+    if dirty:
+        create_file(repo, add=False)
+
+    sha = get_sha(repo)
+    if dirty:
+        assert get_version(repo) == f"1.2.3.post1+git.{sha}.dirty"
+    else:
+        assert get_version(repo) == f"1.2.3.post1+git.{sha}"
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {},
+        {"dev_template": "{tag}.post{ccount}+{branch}.{sha}"},
+        {"version_file": "VERSION.txt", "count_commits_from_version_file": True},
+        {"version_file": "VERSION.txt"},
+        {"version_file": "missing.txt"},
+    ],
+)
+def test_concurrent_same_result(repo, config):
+    create_file(repo, "VERSION.txt", "1.2.3")
+    create_tag(repo, "1.0.0")
+    create_file(repo)
+    create_file(repo, add=False)
+
+    expected = version_from_git(**config, root=repo)
+    assert version_from_git(**config, concurrent=True, root=repo) == expected
+
+
+def test_concurrent_not_a_repo(tmp_path_factory):
+    root = tmp_path_factory.mktemp("not_a_repo")
+    assert str(version_from_git(concurrent=True, root=root)) == "0.0.1"
@@ -1,10 +1,14 @@
 import subprocess
+import sys
 import textwrap
 from pathlib import Path
 
 import pytest
 import tomli_w
+from setuptools.dist import Distribution
 
+from setuptools_git_versioning.setup import get_version as get_version_from_config
+from setuptools_git_versioning.setup import infer_version, read_toml
 from tests.lib.util import (
     create_file,
     create_folder,
@@ -194,3 +198,86 @@ def test_config_pyproject_toml_is_folder(repo):
 
     with pytest.raises(subprocess.CalledProcessError):
         get_version_script(repo)
+
+
+def test_config_hook_skipped_without_config(repo, monkeypatch):
+    cfg = {"build-system": {"build-backend": "setuptools.build_meta"}, "tool": {"other": {"enabled": True}}}
+    create_file(repo, "pyproject.toml", tomli_w.dumps(cfg))
+
+    def fail(*args, **kwargs):
+        msg = "should not be called"
+        raise AssertionError(msg)
+
+    # projects without config are skipped before parsing 'pyproject.toml'
+    monkeypatch.setattr("setuptools_git_versioning.setup.read_toml", fail)
+    monkeypatch.chdir(repo)
+    # setuptools calls the hook by itself
+    dist = Distribution({"name": "mypkg"})
+    assert dist.metadata.version is None
+    assert infer_version(dist, root=repo) is None
+
+    monkeypatch.undo()
+    cfg["tool"]["setuptools-git-versioning"] = {"enabled": True}
+    create_file(repo, "pyproject.toml", tomli_w.dumps(cfg))
+    assert str(infer_version(dist, root=repo)).startswith("0.0.1")
+    assert dist.metadata.version.startswith("0.0.1")
+
+
+@pytest.mark.parametrize(
+    ("config", "executed"),
+    [
+        ('{"enabled": True, "starting_version": "2.3.4"}', False),
+        ('dict(enabled=True, starting_version="2.3.4")', True),
+    ],
+)
+def test_config_setup_py_static(repo, tmp_path, config, executed):
+    marker = tmp_path / "executed"
+    create_file(
+        repo,
+        "setup.py",
+        textwrap.dedent(
+            f"""
+            import pathlib
+            import setuptools
+
+            pathlib.Path({str(marker)!r}).touch()
+
+            setuptools.setup(
+                name="mypkg",
+                setuptools_git_versioning={config},
+            )
+            """
+        ),
+        add=False,
+        commit=False,
+    )
+
+    # literal config is read without executing 'setup.py'
+    assert get_version_module(repo) == "2.3.4"
+    assert marker.exists() == executed
+
+
+def test_config_pyproject_toml_parsed_once(repo, monkeypatch):
+    cfg = {"tool": {"setuptools-git-versioning": {"enabled": True, "starting_version": "2.3.4"}}}
+    create_file(repo, "pyproject.toml", tomli_w.dumps(cfg), add=False, commit=False)
+
+    config = read_toml(root=repo)
+    assert config == cfg["tool"]["setuptools-git-versioning"]
+    with pytest.raises(TypeError):
+        config["enabled"] = False
+
+    # file is not parsed again until it is changed
+    monkeypatch.setattr("tomllib.load" if sys.version_info >= (3, 11) else "tomli.load", None)
+    assert read_toml(root=repo) is config
+    assert str(get_version_from_config(root=repo)) == "2.3.4"
+
+    monkeypatch.undo()
+    cfg["tool"]["setuptools-git-versioning"]["starting_version"] = "2.3.45"
+    create_file(repo, "pyproject.toml", tomli_w.dumps(cfg), add=False, commit=False)
+    assert read_toml(root=repo)["starting_version"] == "2.3.45"
+
+
+def test_config_not_changed(repo):
+    config = {"enabled": True, "starting_version": "2.3.4"}
+    assert str(get_version_from_config(config, root=repo)) == "2.3.4"
+    assert config == {"enabled": True, "starting_version": "2.3.4"}
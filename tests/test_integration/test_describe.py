@@ -0,0 +1,332 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from setuptools_git_versioning import git
+from setuptools_git_versioning.factories import tag_filter_factory
+from setuptools_git_versioning.git import _tag_info_command
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+from setuptools_git_versioning.version import version_from_git
+from tests.lib.util import checkout_branch, create_file, create_tag, execute, get_full_sha
+
+pytestmark = pytest.mark.all
+
+
+def disable_native(monkeypatch):
+    def unsupported(*args, **kwargs):
+        msg = "disabled in test"
+        raise UnsupportedRepositoryError(msg)
+
+    # tags can be read, but history cannot, like in repositories without commit-graph
+    monkeypatch.setattr(git.History, "load", unsupported)
+    monkeypatch.setattr(git, "_native_is_dirty", unsupported)
+    monkeypatch.setattr(git, "_native_count_since", unsupported)
+
+
+def forbid_tag_listing(monkeypatch):
+    def fail(*args, merged, **kwargs):
+        if merged:
+            msg = "merged tags should not be listed"
+            raise AssertionError(msg)
+        return _tag_info_command(*args, merged=merged, **kwargs)
+
+    monkeypatch.setattr(git, "_tag_info_command", fail)
+    forbid_counting(monkeypatch)
+
+
+def forbid_counting(monkeypatch):
+    def fail(*args, **kwargs):
+        msg = "commits should not be counted"
+        raise AssertionError(msg)
+
+    monkeypatch.setattr(git, "count_since", fail)
+
+
+def forbid_describe(monkeypatch):
+    def fail(*args, **kwargs):
+        msg = "'git describe' should not be called"
+        raise AssertionError(msg)
+
+    monkeypatch.setattr(git, "describe", fail)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Set increasing dates of created commits and tags, like in real repositories"""
+    now = datetime.now(timezone.utc)
+
+    def tick():
+        nonlocal now
+        now += timedelta(minutes=1)
+        monkeypatch.setenv("GIT_AUTHOR_DATE", now.isoformat())
+        monkeypatch.setenv("GIT_COMMITTER_DATE", now.isoformat())
+
+    return tick
+
+
+def test_describe(repo):
+    create_tag(repo, "1.0.0", message="Annotated")
+    assert git.describe("1.0.0", root=repo) == git.Description("1.0.0", 0, get_full_sha(repo))
+
+    create_file(repo)
+    create_file(repo)
+    create_tag(repo, "1.1.0-rc.1")
+    create_file(repo)
+    assert git.describe("1.0.0", root=repo) == git.Description("1.0.0", 3, get_full_sha(repo))
+    assert git.describe("1.1.0-rc.1", root=repo) == git.Description("1.1.0-rc.1", 1, get_full_sha(repo))
+    assert git.describe("1.*", root=repo) == git.Description("1.1.0-rc.1", 1, get_full_sha(repo))
+    assert asyncio.run(git.describe_async("1.0.0", root=repo)) == git.Description("1.0.0", 3, get_full_sha(repo))
+
+    assert git.describe("unknown", root=repo) is None
+
+
+def test_describe_not_merged(repo):
+    create_file(repo)
+    checkout_branch(repo, "feature")
+    create_file(repo)
+    create_tag(repo, "1.0.0")
+    checkout_branch(repo, "master", new=False)
+
+    assert git.describe("1.0.0", root=repo) is None
+
+
+def test_latest_tag_describe(repo, monkeypatch, clock):
+    clock()
+    create_tag(repo, "1.0.0")
+    clock()
+    create_file(repo)
+    clock()
+    create_tag(repo, "1.1.0", message="Annotated")
+    expected_on_tag = git.get_latest_tag(root=repo)
+    clock()
+    create_file(repo)
+    expected = git.get_latest_tag(root=repo)
+    assert expected[0] == "1.1.0"
+
+    disable_native(monkeypatch)
+    assert git.get_latest_tag(root=repo) == expected
+    assert asyncio.run(git.get_latest_tag_async(root=repo)) == expected
+
+    # HEAD is tagged
+    execute(repo, "git", "reset", "--hard", "HEAD~1")
+    forbid_tag_listing(monkeypatch)
+    assert git.get_latest_tag(root=repo) == expected_on_tag
+    assert asyncio.run(git.get_latest_tag_async(root=repo)) == expected_on_tag
+
+
+def test_latest_tag_describe_on_tag(repo, monkeypatch):
+    create_file(repo)
+    create_tag(repo, "1.0.0", message="Annotated")
+
+    disable_native(monkeypatch)
+    forbid_tag_listing(monkeypatch)
+    assert git.get_latest_tag(root=repo) == ("1.0.0", get_full_sha(repo), 0)
+
+
+def test_latest_tag_describe_filter(repo, monkeypatch, clock):
+    clock()
+    create_file(repo)
+    clock()
+    create_tag(repo, "1.0.0")
+    # tag not matching the filter is created after the nearest one
+    clock()
+    create_tag(repo, "other", message="Annotated", commit="HEAD~1")
+
+    glob_filter = tag_filter_factory(r"^1\.")
+    expected = git.get_latest_tag(filter_callback=glob_filter, root=repo)
+    assert expected[0] == "1.0.0"
+
+    disable_native(monkeypatch)
+    forbid_tag_listing(monkeypatch)
+    assert git.get_latest_tag(filter_callback=glob_filter, root=repo) == expected
+
+
+def test_latest_tag_describe_filter_not_glob(repo, monkeypatch, clock):
+    clock()
+    create_tag(repo, "1.0.0")
+    clock()
+    create_file(repo)
+    clock()
+    create_tag(repo, "other")
+    clock()
+    create_file(repo)
+
+    for tag_filter in (lambda tag: tag if tag[0].isdigit() else None, tag_filter_factory(r"^\d")):
+        expected = git.get_latest_tag(filter_callback=tag_filter, root=repo)
+        assert expected[0] == "1.0.0"
+
+        with monkeypatch.context() as patch:
+            disable_native(patch)
+            forbid_describe(patch)
+            assert git.get_latest_tag(filter_callback=tag_filter, root=repo) == expected
+
+
+def test_latest_tag_describe_not_merged(repo, monkeypatch, clock):
+    clock()
+    create_tag(repo, "1.0.0")
+    clock()
+    create_file(repo)
+    checkout_branch(repo, "feature")
+    clock()
+    create_file(repo)
+    # newer tag is not merged into HEAD
+    clock()
+    create_tag(repo, "2.0.0")
+    checkout_branch(repo, "master", new=False)
+    clock()
+    create_file(repo)
+
+    clock()
+    create_tag(repo, "1.1.0")
+
+    expected = git.get_latest_tag(root=repo)
+    expected_version = version_from_git(root=repo)
+    assert expected[0] == "1.1.0"
+
+    # HEAD is tagged, but newer tag may be merged, so tags are listed
+    disable_native(monkeypatch)
+    assert git.get_latest_tag(root=repo) == expected
+    assert asyncio.run(git.get_latest_tag_async(root=repo)) == expected
+    assert version_from_git(root=repo) == expected_version
+
+
+@pytest.mark.parametrize("message", ["", "Annotated"])
+def test_latest_tag_describe_created_later(repo, monkeypatch, clock, message):
+    clock()
+    create_file(repo)
+    clock()
+    create_file(repo)
+    clock()
+    create_tag(repo, "1.1.0")
+    # older commit is tagged after the nearest tag
+    clock()
+    create_tag(repo, "1.0.0", message=message, commit="HEAD~1")
+    clock()
+    create_file(repo)
+
+    expected = git.get_latest_tag(root=repo)
+    assert expected[0] == ("1.0.0" if message else "1.1.0")
+
+    disable_native(monkeypatch)
+    assert git.get_latest_tag(root=repo) == expected
+
+
+def test_latest_tag_describe_merges(repo, monkeypatch, clock):
+    clock()
+    create_tag(repo, "1.0.0")
+    clock()
+    create_file(repo)
+    checkout_branch(repo, "feature")
+    clock()
+    create_file(repo)
+    clock()
+    create_file(repo)
+    checkout_branch(repo, "master", new=False)
+    clock()
+    create_file(repo)
+    clock()
+    execute(repo, "git", "merge", "--no-edit", "feature")
+    clock()
+    create_file(repo)
+    clock()
+    create_tag(repo, "1.1.0", message="Annotated")
+    checkout_branch(repo, "other", new=True)
+    execute(repo, "git", "reset", "--hard", "HEAD~3")
+    clock()
+    create_file(repo)
+    clock()
+    create_file(repo)
+    checkout_branch(repo, "master", new=False)
+    clock()
+    create_file(repo)
+    clock()
+    execute(repo, "git", "merge", "--no-edit", "other")
+    clock()
+    create_file(repo)
+
+    expected = git.get_latest_tag(root=repo)
+    expected_version = version_from_git(root=repo)
+    assert expected[0] == "1.1.0"
+
+    disable_native(monkeypatch)
+    assert git.get_latest_tag(root=repo) == expected
+    assert version_from_git(root=repo) == expected_version
+
+
+def test_latest_tag_describe_merged_tag(repo, monkeypatch, clock):
+    clock()
+    create_tag(repo, "1.0.0")
+    checkout_branch(repo, "feature")
+    clock()
+    create_file(repo)
+    clock()
+    create_tag(repo, "1.1.0")
+    checkout_branch(repo, "master", new=False)
+    clock()
+    create_file(repo)
+    clock()
+    create_file(repo)
+    clock()
+    execute(repo, "git", "merge", "--no-edit", "feature")
+
+    expected = git.get_latest_tag(root=repo)
+    expected_version = version_from_git(root=repo)
+    assert expected[0] == "1.1.0"
+
+    disable_native(monkeypatch)
+    assert git.get_latest_tag(root=repo) == expected
+    assert version_from_git(root=repo) == expected_version
+
+
+def test_latest_tag_describe_dates_not_increasing(repo, monkeypatch):
+    def set_date(date):
+        monkeypatch.setenv("GIT_AUTHOR_DATE", date)
+        monkeypatch.setenv("GIT_COMMITTER_DATE", date)
+
+    set_date("2020-01-01T00:00:00+00:00")
+    create_file(repo)
+    create_file(repo)
+    # tagged commit is older than its parent and the branch merged after it,
+    # so 'git describe' walking the history in date order counts these commits too
+    set_date("2020-01-10T00:00:00+00:00")
+    create_file(repo)
+    checkout_branch(repo, "feature")
+    set_date("2020-01-11T00:00:00+00:00")
+    create_file(repo)
+    checkout_branch(repo, "master", new=False)
+    set_date("2020-01-02T00:00:00+00:00")
+    create_file(repo)
+    create_tag(repo, "v1.10")
+    create_tag(repo, "other", message="Annotated")
+    set_date("2020-01-03T00:00:00+00:00")
+    create_file(repo)
+    execute(repo, "git", "merge", "--no-edit", "feature")
+    create_file(repo)
+
+    tag_filter = tag_filter_factory("^v")
+    expected = int(execute(repo, "git", "rev-list", "--count", "HEAD", "^v1.10").strip())
+    assert not repo.joinpath(".git", "objects", "info", "commit-graph").exists()
+    assert git.describe("v*", root=repo).distance != expected
+
+    disable_native(monkeypatch)
+    assert git.get_latest_tag(filter_callback=tag_filter, root=repo)[::2] == ("v1.10", expected)
+
+
+def test_latest_tag_describe_no_tags(repo, monkeypatch):
+    create_file(repo)
+
+    disable_native(monkeypatch)
+    assert git.get_latest_tag(root=repo) == (None, None, None)
+
+
+@pytest.mark.parametrize("sort_by", ["refname", "version:refname", "creatordate", "committerdate", "taggerdate"])
+def test_latest_tag_describe_sort(repo, monkeypatch, sort_by):
+    create_tag(repo, "1.10.0")
+    create_file(repo)
+    create_tag(repo, "1.9.0", message="Annotated")
+    create_file(repo)
+    expected = git.get_latest_tag(sort_by=sort_by, root=repo)
+
+    disable_native(monkeypatch)
+    assert git.get_latest_tag(sort_by=sort_by, root=repo) == expected
@@ -0,0 +1,153 @@
+import sys
+import textwrap
+import threading
+
+import pytest
+
+from setuptools_git_versioning.forkserver import SetupPyServer
+from setuptools_git_versioning.setup import infer_setup_py
+from tests.lib.util import create_file
+
+pytestmark = [pytest.mark.all, pytest.mark.skipif(sys.platform == "win32", reason="os.fork is not available")]
+
+
+def create_setup_py(repo, name: str, body: str) -> None:
+    create_file(
+        repo,
+        name,
+        textwrap.dedent(
+            """
+            import sys
+            import setuptools
+
+            {body}
+
+            setuptools.setup(
+                name="mypkg",
+                setuptools_git_versioning=dict(enabled=True, starting_version="2.3.4"),
+            )
+            """
+        ).format(body=textwrap.dedent(body)),
+        add=False,
+        commit=False,
+    )
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = SetupPyServer()
+    monkeypatch.setattr("setuptools_git_versioning.forkserver._server", server)
+    yield server
+    server.close()
+
+
+@pytest.mark.parametrize("started", [True, False])
+def test_forkserver_isolated(repo, server, started):
+    # module state is not shared between evaluations, and is not leaking into the caller
+    create_setup_py(
+        repo,
+        "setup.py",
+        """
+        assert not hasattr(sys, "_sgv_evaluated")
+        sys._sgv_evaluated = True
+        """,
+    )
+
+    requests = [server.submit(repo / "setup.py", repo) for _ in range(3)]
+    assert [server.result(request) for request in requests] == ["2.3.4"] * 3
+    assert not hasattr(sys, "_sgv_evaluated")
+    server.close()
+
+    # server is used by infer_setup_py only if it was started explicitly
+    if started:
+        server.start()
+
+    try:
+        assert str(infer_setup_py(root=repo)) == "2.3.4"
+        assert server.running == started
+        assert hasattr(sys, "_sgv_evaluated") != started
+    finally:
+        if hasattr(sys, "_sgv_evaluated"):
+            delattr(sys, "_sgv_evaluated")
+
+
+def test_forkserver_errors(repo, server):
+    create_setup_py(repo, "raise.py", "raise ValueError('broken setup.py')")
+    create_setup_py(repo, "exit.py", "import os; os._exit(3)")
+    create_setup_py(repo, "setup.py", "")
+
+    with pytest.raises(ValueError, match=r"broken setup\.py"):
+        server.evaluate(repo / "raise.py", repo)
+
+    with pytest.raises(RuntimeError, match="exited unexpectedly"):
+        server.evaluate(repo / "exit.py", repo)
+
+    # server is still alive
+    assert server.evaluate(repo / "setup.py", repo) == "2.3.4"
+
+
+def test_forkserver_threads(repo):
+    create_setup_py(
+        repo,
+        "slow.py",
+        f"""
+        import pathlib, time
+
+        marker = pathlib.Path({str(repo / "marker")!r})
+        for _ in range(300):
+            if marker.exists():
+                break
+            time.sleep(0.1)
+        else:
+            raise TimeoutError("marker is not created")
+        """,
+    )
+    create_setup_py(repo, "fast.py", "")
+
+    server = SetupPyServer(max_children=2)
+    slow_results = []
+    thread = threading.Thread(target=lambda: slow_results.append(server.evaluate(repo / "slow.py", repo)))
+    thread.start()
+
+    # thread waiting for its result does not block other threads
+    try:
+        assert server.evaluate(repo / "fast.py", repo) == "2.3.4"
+    finally:
+        (repo / "marker").touch()
+        thread.join()
+        server.close()
+
+    assert slow_results == ["2.3.4"]
+
+
+def test_forkserver_max_children(repo):
+    create_setup_py(
+        repo,
+        "setup.py",
+        f"""
+        import os, pathlib, time
+
+        running = pathlib.Path({str(repo / "running")!r})
+        running.mkdir(exist_ok=True)
+        current = running / str(os.getpid())
+        current.touch()
+        time.sleep(0.2)
+        assert list(running.iterdir()) == [current]
+        current.unlink()
+        """,
+    )
+
+    server = SetupPyServer(max_children=1)
+    try:
+        requests = [server.submit(repo / "setup.py", repo) for _ in range(3)]
+        assert [server.result(request) for request in requests] == ["2.3.4"] * 3
+    finally:
+        server.close()
+
+
+def test_forkserver_not_available(repo, server, monkeypatch):
+    create_setup_py(repo, "setup.py", "")
+
+    server.start()
+    monkeypatch.setattr(server, "available", False)
+    assert str(infer_setup_py(root=repo)) == "2.3.4"
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.all
+
+HEAVY_MODULES = {
+    "asyncio",
+    "concurrent.futures",
+    "inspect",
+    "packaging.version",
+    "pprint",
+    "setuptools_git_versioning.git",
+    "setuptools_git_versioning.version",
+}
+
+
+def imported_modules(*args: str) -> set[str]:
+    """Return names of modules imported by the interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        modules.add(line.split("|")[-1].strip())
+    return modules
+
+
+# wall clock time depends on machine load too much, so only the list of imported modules is checked
+def test_import_time():
+    imported = imported_modules("-c", "import setuptools_git_versioning") - imported_modules("-c", "pass")
+    assert "setuptools_git_versioning" in imported
+    assert not imported & HEAVY_MODULES
+
+
+def test_import_time_cli_help():
+    imported = imported_modules("-m", "setuptools_git_versioning", "--help") - imported_modules("-c", "pass")
+    assert not imported & {*HEAVY_MODULES, "setuptools_git_versioning.setup", "logging"}
+
+
+def test_lazy_attributes():
+    code = (
+        "import sys, setuptools_git_versioning as m; "
+        "assert 'setuptools_git_versioning.version' not in sys.modules; "
+        "assert m.version_from_git is sys.modules['setuptools_git_versioning.version'].version_from_git; "
+        "assert m.get_tag_info is sys.modules['setuptools_git_versioning.git'].get_tag_info; "
+        "assert set(m.__all__) <= set(dir(m))"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    import setuptools_git_versioning
+
+    with pytest.raises(AttributeError):
+        setuptools_git_versioning.unknown  # noqa: B018
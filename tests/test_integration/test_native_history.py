@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import pytest
+
+from setuptools_git_versioning.git import _exec, count_since
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+from setuptools_git_versioning.native import history as history_module
+from setuptools_git_versioning.native.gitdir import find_git_dir
+from setuptools_git_versioning.native.history import History
+from setuptools_git_versioning.native.refs import RefStore
+from tests.lib.util import checkout_branch, create_file, execute, get_full_sha
+
+pytestmark = pytest.mark.all
+
+
+def load_history(repo) -> History:
+    refs = RefStore(find_git_dir(repo))
+    return History.load(refs.git_dir, refs)
+
+
+def create_history(repo) -> list[str]:
+    commits = [get_full_sha(repo)]
+    for branch in ("first", "second", "third"):
+        checkout_branch(repo, "master", new=False)
+        checkout_branch(repo, branch)
+        for _ in range(3):
+            create_file(repo)
+            commits.append(get_full_sha(repo))
+
+    checkout_branch(repo, "master", new=False)
+    create_file(repo)
+    # octopus merge
+    execute(repo, "git", "merge", "--no-edit", "first", "second", "third")
+    commits.append(get_full_sha(repo))
+    create_file(repo)
+    commits.append(get_full_sha(repo))
+    return commits
+
+
+@pytest.mark.parametrize("split", [True, False])
+def test_native_history_count(repo, split):
+    commits = create_history(repo)
+    execute(repo, "git", "commit-graph", "write", "--reachable", *(["--split"] if split else []))
+    if split:
+        # create one more layer
+        create_file(repo)
+        commits.append(get_full_sha(repo))
+        execute(repo, "git", "commit-graph", "write", "--reachable", "--split=no-merge")
+
+    history = load_history(repo)
+    head = get_full_sha(repo)
+    for commit in commits:
+        expected = int(_exec("git", "rev-list", "--count", "HEAD", f"^{commit}", root=repo)[0])
+        assert history.count(head, commit) == expected
+        assert count_since(commit, root=repo) == expected
+
+
+def test_native_history_missing_commit_graph(repo):
+    create_history(repo)
+
+    with pytest.raises(UnsupportedRepositoryError):
+        load_history(repo)
+
+
+def test_native_history_commit_not_in_graph(repo):
+    commits = create_history(repo)
+    execute(repo, "git", "commit-graph", "write", "--reachable")
+    # commits created after commit-graph was written are read from objects
+    checkout_branch(repo, "fourth")
+    create_file(repo)
+    checkout_branch(repo, "master", new=False)
+    create_file(repo)
+    execute(repo, "git", "merge", "--no-edit", "fourth")
+
+    history = load_history(repo)
+    head = get_full_sha(repo)
+    for commit in commits:
+        expected = int(_exec("git", "rev-list", "--count", "HEAD", f"^{commit}", root=repo)[0])
+        assert history.count(head, commit) == expected
+    assert history.commit_time(head) == int(_exec("git", "log", "-n", "1", "--format=%ct", root=repo)[0])
+
+
+def test_native_history_too_many_commits_not_in_graph(repo, monkeypatch):
+    commits = create_history(repo)
+    execute(repo, "git", "commit-graph", "write", "--reachable")
+    create_file(repo)
+    create_file(repo)
+
+    monkeypatch.setattr(history_module, "MAX_COMMITS_OUTSIDE_GRAPH", 1)
+    with pytest.raises(UnsupportedRepositoryError):
+        load_history(repo).count(get_full_sha(repo), commits[0])
+
+    expected = int(_exec("git", "rev-list", "--count", "HEAD", f"^{commits[0]}", root=repo)[0])
+    assert count_since(commits[0], root=repo) == expected
+
+
+def test_native_history_shallow(repo, tmp_path_factory):
+    create_history(repo)
+    clone = tmp_path_factory.mktemp("clone")
+    execute(clone, "git", "clone", "--depth", "2", f"file://{repo}", ".")
+    execute(clone, "git", "commit-graph", "write", "--reachable")
+
+    with pytest.raises(UnsupportedRepositoryError):
+        load_history(clone)
+    assert count_since(get_full_sha(clone), root=clone) == 0
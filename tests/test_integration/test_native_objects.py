@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+from setuptools_git_versioning.native.gitdir import find_git_dir
+from setuptools_git_versioning.native.objects import ObjectStore
+from setuptools_git_versioning.native.pack import apply_delta
+from tests.lib.util import create_commit, create_file, create_tag, execute, get_full_sha, rand_full_sha
+
+pytestmark = pytest.mark.all
+
+
+def object_store(repo) -> ObjectStore:
+    return ObjectStore(find_git_dir(repo).common_dir.joinpath("objects"))
+
+
+def cat_file(repo, oid: str) -> tuple[str, bytes]:
+    object_type = execute(repo, "git", "cat-file", "-t", oid).strip()
+    content = subprocess.check_output(["git", "cat-file", object_type, oid], cwd=repo)
+    return object_type, content
+
+
+def create_objects(repo) -> list[str]:
+    # similar versions of the same file are stored as deltas in pack
+    lines = [f"line {i}\n" for i in range(1000)]
+    oids = []
+    for i in range(20):
+        lines[i * 50] = f"changed {i}\n"
+        Path(repo, "file.txt").write_text("".join(lines))
+        execute(repo, "git", "add", "file.txt")
+        create_commit(repo, f"Change {i}")
+        oids.append(get_full_sha(repo))
+        oids.append(execute(repo, "git", "rev-parse", "HEAD:file.txt").strip())
+
+    create_tag(repo, "1.0.0", message="Annotated")
+    create_tag(repo, "1.0.1", message="Annotated", commit="1.0.0")
+    oids.append(execute(repo, "git", "rev-parse", "1.0.0").strip())
+    oids.append(execute(repo, "git", "rev-parse", "1.0.1").strip())
+    return oids
+
+
+@pytest.mark.parametrize("repack", [None, ["-ad"], ["-adf", "--depth=50", "--window=50"]])
+def test_native_objects(repo, repack):
+    oids = create_objects(repo)
+    if repack:
+        execute(repo, "git", "repack", *repack)
+        assert list(Path(repo, ".git", "objects", "pack").glob("*.idx"))
+
+    store = object_store(repo)
+    for oid in oids:
+        assert store.read(oid) == cat_file(repo, oid)
+
+
+def test_native_objects_peel(repo):
+    create_objects(repo)
+    store = object_store(repo)
+    head = get_full_sha(repo)
+
+    tag = store.read_tag(execute(repo, "git", "rev-parse", "1.0.1").strip())
+    assert tag.type == "tag"
+    assert tag.tagger_time == int(execute(repo, "git", "log", "-n", "1", "--format=%ct").strip())
+    assert store.peel(tag.object) == head
+    assert store.peel(execute(repo, "git", "rev-parse", "1.0.1").strip()) == head
+
+    commit = store.read_commit(head)
+    assert commit.tree == execute(repo, "git", "rev-parse", "HEAD^{tree}").strip()
+    assert commit.parents == [execute(repo, "git", "rev-parse", "HEAD~1").strip()]
+
+    with pytest.raises(UnsupportedRepositoryError):
+        store.peel(commit.tree)
+    with pytest.raises(UnsupportedRepositoryError):
+        store.read(rand_full_sha()[:40])
+
+
+def test_native_objects_tag_without_tagger(repo):
+    create_file(repo)
+    content = f"object {get_full_sha(repo)}\ntype commit\ntag old\n\nVery old tag\n"
+    oid = subprocess.check_output(
+        ["git", "hash-object", "-t", "tag", "-w", "--stdin"],
+        cwd=repo,
+        input=content,
+        text=True,
+    ).strip()
+
+    tag = object_store(repo).read_tag(oid)
+    assert tag.object == get_full_sha(repo)
+    assert tag.tagger_time is None
+
+
+def test_native_apply_delta():
+    base = b"0123456789" * 10000
+    delta = bytes(
+        [
+            # base size and result size
+            *(0xA0, 0x8D, 0x06),
+            *(0x88, 0x80, 0x04),
+            # copy 0x10000 bytes from offset 0x10
+            *(0x81, 0x10),
+            # insert "abc"
+            *(0x03, *b"abc"),
+            # copy 5 bytes from offset 1
+            *(0x91, 0x01, 0x05),
+        ],
+    )
+    expected = base[0x10 : 0x10 + 0x10000] + b"abc" + base[1:6]
+    assert len(expected) == 0x10008
+    assert apply_delta(base, delta) == expected
+
+    with pytest.raises(UnsupportedRepositoryError):
+        apply_delta(base[1:], delta)
@@ -0,0 +1,142 @@
+import pytest
+
+from setuptools_git_versioning.git import _exec, get_all_tags, get_branch, get_branches, get_sha
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+from setuptools_git_versioning.native.gitdir import find_git_dir
+from setuptools_git_versioning.native.refs import PackedRefs, RefStore
+from tests.lib.util import (
+    checkout_branch,
+    create_file,
+    create_tag,
+    execute,
+    get_full_sha,
+    rand_full_sha,
+    rand_sha,
+)
+
+pytestmark = pytest.mark.all
+
+
+def ref_store(repo) -> RefStore:
+    return RefStore(find_git_dir(repo))
+
+
+@pytest.mark.parametrize("pack", [True, False])
+def test_native_refs(repo, pack):
+    create_tag(repo, "1.0.0")
+    create_tag(repo, "1.0.1", message="Annotated")
+    checkout_branch(repo, "feature/abc")
+    create_file(repo)
+    create_tag(repo, "2.0.0", message="Annotated")
+    if pack:
+        execute(repo, "git", "pack-refs", "--all")
+
+    store = ref_store(repo)
+    assert store.head_sha() == get_full_sha(repo)
+    assert store.branch() == "feature/abc"
+    assert store.branches() == _exec("git", "branch", "-l", "--format", "%(refname:short)", root=repo)
+    assert [ref.name for ref in store.tags()] == ["refs/tags/1.0.0", "refs/tags/1.0.1", "refs/tags/2.0.0"]
+
+    assert get_sha(root=repo) == get_full_sha(repo)
+    assert get_sha("master", root=repo) == _exec("git", "rev-list", "-n", "1", "master", root=repo)[0]
+    assert get_sha("1.0.0", root=repo) == _exec("git", "rev-list", "-n", "1", "1.0.0", root=repo)[0]
+    assert get_sha("2.0.0", root=repo) == _exec("git", "rev-list", "-n", "1", "2.0.0", root=repo)[0]
+    assert get_all_tags(sort_by="refname", root=repo) == ["2.0.0", "1.0.1", "1.0.0"]
+
+    # peeled commit of annotated tag is stored in packed-refs, or read from tag object
+    assert store.rev_parse("2.0.0") == get_full_sha(repo)
+
+
+def test_native_refs_detached(repo):
+    execute(repo, "git", "checkout", "--detach")
+
+    store = ref_store(repo)
+    assert store.branch() == get_branch(root=repo) == "HEAD"
+    assert store.head_sha() == get_full_sha(repo)
+
+    # git prints '(HEAD detached at ...)' as a first branch
+    with pytest.raises(UnsupportedRepositoryError):
+        store.branches()
+    assert get_branches(root=repo) == _exec("git", "branch", "-l", "--format", "%(refname:short)", root=repo)
+
+
+def test_native_refs_ambiguous(repo):
+    create_tag(repo, "master")
+
+    with pytest.raises(UnsupportedRepositoryError):
+        ref_store(repo).branch()
+    assert get_branch(root=repo) == "heads/master"
+    assert get_branches(root=repo) == ["heads/master"]
+
+
+def test_native_refs_unborn(repo_dir):
+    execute(repo_dir, "git", "init", "-b", "master")
+
+    store = ref_store(repo_dir)
+    assert store.head_sha() is None
+    assert store.branch() == "HEAD"
+    assert get_sha(root=repo_dir) is None
+
+
+def test_native_refs_worktree(repo, tmp_path_factory):
+    worktree = tmp_path_factory.mktemp("worktree").joinpath("worktree")
+    execute(repo, "git", "worktree", "add", "-b", "other", str(worktree))
+    create_file(worktree)
+    create_tag(worktree, "1.0.0")
+
+    store = ref_store(worktree)
+    assert store.git_dir.common_dir == ref_store(repo).git_dir.path
+    assert store.branch() == "other"
+    assert store.head_sha() == get_full_sha(worktree)
+    assert get_sha("1.0.0", root=worktree) == get_full_sha(worktree)
+    assert ref_store(repo).branch() == "master"
+
+
+def test_native_refs_subfolder(repo):
+    repo.joinpath("subfolder").mkdir()
+    create_file(repo, "subfolder/file.txt")
+
+    assert ref_store(repo.joinpath("subfolder")).head_sha() == get_full_sha(repo)
+
+
+def test_native_refs_not_a_repo(tmp_path_factory):
+    with pytest.raises(UnsupportedRepositoryError):
+        find_git_dir(tmp_path_factory.mktemp("not_a_repo"))
+
+
+def test_native_refs_env_override(repo, monkeypatch):
+    monkeypatch.setenv("GIT_DIR", str(repo.joinpath(".git")))
+
+    with pytest.raises(UnsupportedRepositoryError):
+        find_git_dir(repo)
+
+
+@pytest.mark.parametrize("header", ["# pack-refs with: peeled fully-peeled sorted \n", ""])
+def test_native_packed_refs(tmp_path_factory, header):
+    refs = {}
+    lines = [header]
+    for i in range(1000):
+        name = f"refs/tags/{i:04d}/{rand_sha()}"
+        oid = rand_full_sha()[:40]
+        lines.append(f"{oid} {name}\n")
+        if i % 3 == 0:
+            peeled = rand_full_sha()[:40]
+            lines.append(f"^{peeled}\n")
+        refs[name] = (oid, peeled if i % 3 == 0 else None)
+
+    path = tmp_path_factory.mktemp("packed").joinpath("packed-refs")
+    path.write_text("".join(lines))
+
+    packed = PackedRefs(path)
+    assert packed.sorted == bool(header)
+    for name, (oid, peeled) in refs.items():
+        ref = packed.get(name)
+        assert ref.oid == oid
+        assert ref.peeled == (peeled or (oid if header else None))
+
+    assert packed.get("refs/tags/0000") is None
+    assert packed.get("refs/tags/9999") is None
+    assert packed.get("refs/heads/master") is None
+    assert [ref.name for ref in packed.iter_prefix("refs/tags/0010/")] == [
+        name for name in refs if name.startswith("refs/tags/0010/")
+    ]
@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from setuptools_git_versioning.git import _exec, _exec_is_dirty, _native_is_dirty, is_dirty
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+from setuptools_git_versioning.native.config import parse_config
+from setuptools_git_versioning.native.gitdir import find_git_dir
+from setuptools_git_versioning.native.history import History
+from setuptools_git_versioning.native.ignore import IgnoreRules, parse_patterns
+from setuptools_git_versioning.native.refs import RefStore
+from setuptools_git_versioning.native.status import is_dirty as is_worktree_dirty
+from tests.lib.util import create_file, create_folder, execute
+
+pytestmark = pytest.mark.all
+
+
+def native_is_dirty(repo) -> bool:
+    refs = RefStore(find_git_dir(repo))
+    head = refs.head_sha()
+    head_tree = History.load(refs.git_dir, refs).tree(head) if head else None
+    return is_worktree_dirty(refs.git_dir, head_tree)
+
+
+def git_is_dirty(repo) -> bool:
+    return bool(_exec("git", "status", "--short", root=repo))
+
+
+@pytest.fixture
+def clean_repo(repo):
+    create_folder(repo, "folder")
+    create_file(repo, "folder/file.txt", "content")
+    create_file(repo, ".gitignore", "*.log\n/build/\n!keep.log\n")
+    execute(repo, "git", "commit-graph", "write", "--reachable")
+    return repo
+
+
+def test_native_status_clean(clean_repo):
+    Path(clean_repo, "folder", "debug.log").write_text("ignored")
+    Path(clean_repo, "build").mkdir()
+    Path(clean_repo, "build", "file.txt").write_text("ignored")
+
+    assert not git_is_dirty(clean_repo)
+    assert not native_is_dirty(clean_repo)
+    assert not is_dirty(clean_repo)
+
+
+def test_native_status_no_commit_graph(repo):
+    create_file(repo, "file.txt", "content")
+    assert not repo.joinpath(".git", "objects", "info", "commit-graph").exists()
+    assert not _native_is_dirty(repo)
+
+    Path(repo, "file.txt").write_text("changed")
+    assert _native_is_dirty(repo)
+
+
+def test_native_status_touched(clean_repo):
+    # stat data is changed, but content is the same
+    path = Path(clean_repo, "folder", "file.txt")
+    path.write_text("content")
+    os.utime(path, (0, 0))
+
+    assert not git_is_dirty(clean_repo)
+    assert not native_is_dirty(clean_repo)
+
+
+def add_intent(repo):
+    Path(repo, "new.txt").touch()
+    execute(repo, "git", "add", "--intent-to-add", "new.txt")
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        pytest.param(lambda repo: Path(repo, "folder", "file.txt").write_text("changed content"), id="modified"),
+        pytest.param(lambda repo: Path(repo, "folder", "file.txt").unlink(), id="deleted"),
+        pytest.param(add_intent, id="intent"),
+    ],
+)
+def test_native_status_dirty(clean_repo, change):
+    change(clean_repo)
+
+    assert git_is_dirty(clean_repo)
+    assert native_is_dirty(clean_repo)
+    assert is_dirty(clean_repo)
+
+
+def test_native_status_staged(clean_repo):
+    create_file(clean_repo, "new.txt", commit=False)
+
+    # cache-tree is invalidated by 'git add'
+    with pytest.raises(UnsupportedRepositoryError):
+        native_is_dirty(clean_repo)
+    assert is_dirty(clean_repo)
+
+    # but it is written by 'git write-tree'
+    execute(clean_repo, "git", "write-tree")
+    assert native_is_dirty(clean_repo)
+
+
+@pytest.mark.parametrize("name", ["new.txt", "folder/new.txt", "keep.log", "build"])
+def test_native_status_untracked(clean_repo, name):
+    Path(clean_repo, name).write_text("untracked")
+
+    assert git_is_dirty(clean_repo)
+    assert native_is_dirty(clean_repo)
+
+    execute(clean_repo, "git", "config", "status.showUntrackedFiles", "no")
+    assert not git_is_dirty(clean_repo)
+    assert not native_is_dirty(clean_repo)
+
+
+def test_native_status_excludes_file(clean_repo, tmp_path):
+    excludes_file = tmp_path / "ignore"
+    excludes_file.write_text("*.tmp\n")
+    Path(clean_repo, "file.tmp").write_text("untracked")
+    assert native_is_dirty(clean_repo)
+
+    execute(clean_repo, "git", "config", "core.excludesFile", excludes_file)
+    assert not git_is_dirty(clean_repo)
+    assert not native_is_dirty(clean_repo)
+
+
+def test_native_status_nested_repo(clean_repo):
+    nested = Path(clean_repo, "folder", "nested")
+    nested.mkdir()
+    execute(nested, "git", "init")
+
+    assert git_is_dirty(clean_repo)
+    assert native_is_dirty(clean_repo)
+
+
+def test_native_status_same_size(clean_repo):
+    Path(clean_repo, "folder", "file.txt").write_text("CONTENT")
+
+    assert git_is_dirty(clean_repo)
+    assert native_is_dirty(clean_repo)
+
+
+def add_attributes(repo):
+    create_file(repo, ".gitattributes", "*.txt text eol=crlf\n")
+
+
+@pytest.mark.parametrize(
+    "configure",
+    [
+        pytest.param(lambda repo: execute(repo, "git", "config", "core.autocrlf", "true"), id="autocrlf"),
+        pytest.param(lambda repo: execute(repo, "git", "config", "core.autocrlf", "input"), id="autocrlf_input"),
+        pytest.param(add_attributes, id="attributes"),
+        pytest.param(lambda repo: Path(repo, ".git", "info", "attributes").write_text("* filter=lfs\n"), id="filter"),
+    ],
+)
+def test_native_status_conversion(clean_repo, configure):
+    configure(clean_repo)
+    Path(clean_repo, "folder", "file.txt").write_text("CONTENT")
+
+    # content comparison depends on filters
+    with pytest.raises(UnsupportedRepositoryError):
+        native_is_dirty(clean_repo)
+    assert is_dirty(clean_repo) == git_is_dirty(clean_repo)
+
+
+def test_native_status_file_mode(clean_repo):
+    Path(clean_repo, "folder", "file.txt").chmod(0o755)
+
+    with pytest.raises(UnsupportedRepositoryError):
+        native_is_dirty(clean_repo)
+    assert is_dirty(clean_repo) == git_is_dirty(clean_repo)
+
+
+def test_native_status_worktree_config(clean_repo, tmp_path):
+    execute(clean_repo, "git", "config", "core.worktree", tmp_path)
+
+    with pytest.raises(UnsupportedRepositoryError):
+        native_is_dirty(clean_repo)
+
+
+@pytest.fixture
+def untracked_cache(clean_repo):
+    Path(clean_repo, "folder", "nested").mkdir()
+    Path(clean_repo, "folder", "nested", "debug.log").write_text("ignored")
+    Path(clean_repo, "folder", "nested", "file.tmp").write_text("ignored")
+    Path(clean_repo, ".git", "info", "exclude").write_text("*.tmp\n")
+    execute(clean_repo, "git", "config", "core.untrackedCache", "true")
+    write_untracked_cache(clean_repo)
+    return clean_repo
+
+
+def write_untracked_cache(repo):
+    execute(repo, "git", "update-index", "--no-untracked-cache")
+    # listings of directories changed in the same second the index was written are not trusted
+    for directory, _, _ in os.walk(repo):
+        os.utime(directory, (0, 0))
+    execute(repo, "git", "status")
+
+
+def test_native_status_untracked_cache(untracked_cache, monkeypatch):
+    refs = RefStore(find_git_dir(untracked_cache))
+    head_tree = History.load(refs.git_dir, refs).tree(refs.head_sha())
+
+    # directories are not listed
+    monkeypatch.setattr(os, "scandir", None)
+    assert not is_worktree_dirty(refs.git_dir, head_tree)
+
+
+def test_native_status_untracked_cache_dirty(untracked_cache, monkeypatch):
+    Path(untracked_cache, "folder", "new.txt").write_text("untracked")
+    write_untracked_cache(untracked_cache)
+
+    refs = RefStore(find_git_dir(untracked_cache))
+    head_tree = History.load(refs.git_dir, refs).tree(refs.head_sha())
+
+    # file found by git itself is checked without listing directories
+    monkeypatch.setattr(os, "scandir", None)
+    assert is_worktree_dirty(refs.git_dir, head_tree)
+
+    monkeypatch.undo()
+    execute(untracked_cache, "git", "add", "folder/new.txt")
+    execute(untracked_cache, "git", "commit", "-m", "Add new.txt")
+    assert not native_is_dirty(untracked_cache)
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        pytest.param(lambda repo: Path(repo, "new.txt").write_text("untracked"), id="root"),
+        pytest.param(lambda repo: Path(repo, "folder", "nested", "new.txt").write_text("untracked"), id="nested"),
+        pytest.param(
+            lambda repo: Path(repo, "folder", "nested", "debug.log").rename(Path(repo, "keep.log")),
+            id="moved",
+        ),
+        pytest.param(lambda repo: Path(repo, ".git", "info", "exclude").write_text(""), id="exclude"),
+        pytest.param(lambda repo: create_file(repo, ".gitignore", "/build/\n"), id="gitignore"),
+    ],
+)
+def test_native_status_untracked_cache_changed(untracked_cache, change):
+    change(untracked_cache)
+
+    assert git_is_dirty(untracked_cache)
+    assert native_is_dirty(untracked_cache)
+
+
+def test_native_status_fsmonitor(clean_repo):
+    hook = Path(clean_repo, ".git", "hooks", "fsmonitor")
+    hook.write_text("#!/bin/sh\nprintf 'token\\0'\n")
+    hook.chmod(0o755)
+    execute(clean_repo, "git", "config", "core.fsmonitor", hook)
+    execute(clean_repo, "git", "status")
+    assert not native_is_dirty(clean_repo)
+
+    # file system monitor is not queried, so changes made after the last 'git status' are found using stats
+    Path(clean_repo, "folder", "file.txt").write_text("changed content")
+    assert native_is_dirty(clean_repo)
+
+    execute(clean_repo, "git", "update-index", "--no-fsmonitor-valid", "folder/file.txt")
+    assert native_is_dirty(clean_repo)
+
+
+def test_native_status_unborn(repo_dir):
+    execute(repo_dir, "git", "init", "-b", "master")
+    Path(repo_dir, ".gitignore").write_text("*.log\n")
+    Path(repo_dir, "debug.log").write_text("ignored")
+    execute(repo_dir, "git", "add", ".gitignore")
+
+    assert native_is_dirty(repo_dir)
+    assert is_dirty(repo_dir)
+
+
+@pytest.mark.parametrize(
+    ("patterns", "path", "is_dir", "expected"),
+    [
+        (b"*.log", b"debug.log", False, True),
+        (b"*.log", b"a/b/debug.log", False, True),
+        (b"*.log\n!keep.log", b"a/keep.log", False, False),
+        (b"/build/", b"build", True, True),
+        (b"/build/", b"build", False, False),
+        (b"/build/", b"a/build", True, False),
+        (b"doc/*.txt", b"doc/file.txt", False, True),
+        (b"doc/*.txt", b"doc/a/file.txt", False, False),
+        (b"doc/**/*.txt", b"doc/a/b/file.txt", False, True),
+        (b"doc/**/*.txt", b"doc/file.txt", False, True),
+        (b"**/cache", b"a/b/cache", True, True),
+        (b"a/**", b"a/b", False, True),
+        (b"a**b", b"a/b", False, False),
+        (b"file[0-9].txt", b"file1.txt", False, True),
+        (b"file[!0-9].txt", b"file1.txt", False, False),
+        (b"file[[:alpha:]].txt", b"filea.txt", False, True),
+        (b"file?.txt", b"file/.txt", False, False),
+        (b"\\!important", b"!important", False, True),
+        (b"\\#comment", b"#comment", False, True),
+        (b"# comment", b"# comment", False, False),
+        (b"trailing  ", b"trailing", False, True),
+        (b"trailing\\ ", b"trailing ", False, True),
+    ],
+)
+def test_native_ignore_patterns(patterns, path, is_dir, expected):
+    rules = IgnoreRules([parse_patterns(patterns)])
+    assert rules.is_ignored(path, is_dir=is_dir) == expected
+
+
+def test_native_ignore_nested(tmp_path):
+    rules = IgnoreRules([parse_patterns(b"*.txt")]).extend(parse_patterns(b"!/file.txt\nsub/*.md", b"a/"))
+
+    assert rules.is_ignored(b"a/other.txt", is_dir=False)
+    assert not rules.is_ignored(b"a/file.txt", is_dir=False)
+    assert rules.is_ignored(b"a/b/file.txt", is_dir=False)
+    assert rules.is_ignored(b"a/sub/file.md", is_dir=False)
+    assert not rules.is_ignored(b"sub/file.md", is_dir=False)
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        ("[core]\n\tautocrlf = true\n", [("core.autocrlf", "true")]),
+        ("[Core]\nAutoCRLF=input ; comment\n", [("core.autocrlf", "input")]),
+        ("[core]\nbare\n", [("core.bare", None)]),
+        ("[core] bare = false", [("core.bare", "false")]),
+        ('[remote "Origin"]\nurl = "a \\"b\\" # c"\n', [("remote.Origin.url", 'a "b" # c')]),
+        ("[section.Sub]\nkey = a  b\\\n c\n", [("section.sub.key", "a  b c")]),
+        ("# comment\n[a]\nkey = 1\nkey = 2\n", [("a.key", "1"), ("a.key", "2")]),
+    ],
+)
+def test_native_config(content, expected):
+    assert parse_config(content) == expected
+
+
+@pytest.mark.parametrize("content", ["key = value\n", "[core\n", '[a]\nkey = "value\n', "[a]\nkey = \\x\n"])
+def test_native_config_invalid(content):
+    with pytest.raises(ValueError, match=r"Invalid|Unterminated"):
+        parse_config(content)
+
+
+def test_exec_is_dirty(clean_repo, tmp_path_factory):
+    assert not _exec_is_dirty(root=clean_repo)
+
+    for i in range(1000):
+        Path(clean_repo, f"untracked{i}.txt").write_text("untracked")
+    assert _exec_is_dirty(root=clean_repo)
+    # git process is terminated without leaving the lock
+    assert not Path(clean_repo, ".git", "index.lock").exists()
+
+    assert not _exec_is_dirty(root=tmp_path_factory.mktemp("not_a_repo"))
@@ -0,0 +1,183 @@
+import subprocess
+from datetime import datetime, timedelta
+
+import pytest
+
+from setuptools_git_versioning.git import (
+    _exec_tag_info,
+    _exec_tag_infos,
+    _exec_tags,
+    _iter_merged_tag_infos,
+    _iter_merged_tags,
+    get_sha,
+    get_tag,
+    get_tag_info,
+    get_tags,
+    get_tags_info,
+)
+from setuptools_git_versioning.native import UnsupportedRepositoryError
+from setuptools_git_versioning.native.objects import ObjectStore
+from tests.lib.util import checkout_branch, create_commit, create_file, create_tag, execute
+
+pytestmark = pytest.mark.all
+
+
+def create_tags(repo, *, annotated: bool, pack: bool = True):
+    now = datetime.now()
+    message = "Annotated" if annotated else None
+    for i in range(5):
+        create_file(repo, commit=False)
+        create_commit(repo, "Some commit", dt=now - timedelta(days=10 - i))
+        create_tag(repo, f"1.{i}.0", message=message)
+
+    # tags which are not reachable from HEAD
+    checkout_branch(repo, "other")
+    create_file(repo, commit=False)
+    create_commit(repo, "Some commit", dt=now)
+    create_tag(repo, "2.0.0", message=message)
+    checkout_branch(repo, "master", new=False)
+
+    # tags with the same date are sorted by name
+    create_tag(repo, "1.5.0", commit="HEAD~1")
+    create_tag(repo, "0.5.0", commit="HEAD~1")
+
+    if pack:
+        execute(repo, "git", "pack-refs", "--all")
+    execute(repo, "git", "commit-graph", "write", "--reachable")
+
+
+@pytest.mark.parametrize("sort_by", ["refname", "committerdate", "creatordate", "taggerdate"])
+def test_native_tags(repo, sort_by):
+    create_tags(repo, annotated=False)
+
+    expected = _exec_tags(sort_by, root=repo)
+    assert "2.0.0" not in expected
+    assert list(_iter_merged_tags(sort_by, root=repo)) == expected
+    assert get_tags(sort_by, root=repo) == expected
+    assert get_tag(sort_by, root=repo) == expected[0]
+
+
+@pytest.mark.parametrize("sort_by", ["refname", "committerdate", "creatordate", "taggerdate"])
+@pytest.mark.parametrize("pack", [True, False])
+def test_native_tags_annotated(repo, sort_by, pack):
+    create_tags(repo, annotated=True, pack=pack)
+
+    expected = _exec_tags(sort_by, root=repo)
+    assert list(_iter_merged_tags(sort_by, root=repo)) == expected
+
+
+@pytest.mark.parametrize("sort_by", ["refname", "creatordate"])
+@pytest.mark.parametrize("annotated", [True, False])
+def test_native_tags_info(repo, sort_by, annotated):
+    create_tags(repo, annotated=annotated)
+
+    expected = _exec_tag_infos(sort_by, root=repo)
+    assert [tag.name for tag in expected] == _exec_tags(sort_by, root=repo)
+    for tag in expected:
+        assert tag.commit == get_sha(tag.name, root=repo)
+        assert tag.date
+        if not annotated:
+            assert tag.sha == tag.commit
+
+    assert list(_iter_merged_tag_infos(sort_by, root=repo)) == expected
+    assert get_tags_info(sort_by, root=repo) == expected
+    assert get_tag_info(sort_by, root=repo) == expected[0]
+
+
+def test_native_tags_info_nested(repo):
+    create_tag(repo, "1.0.0", message="Annotated")
+    execute(repo, "git", "tag", "-a", "-m", "Nested", "1.0.0-nested", "1.0.0")
+    execute(repo, "git", "commit-graph", "write", "--reachable")
+
+    tags = {tag.name: tag for tag in _exec_tag_infos("refname", root=repo)}
+    # depending on git version, commit may be unknown without reading the tag object
+    assert tags["1.0.0"].commit == get_sha(root=repo)
+    assert tags["1.0.0-nested"].commit in {None, get_sha(root=repo)}
+
+    native = {tag.name: tag for tag in _iter_merged_tag_infos("refname", root=repo)}
+    assert native["1.0.0-nested"].commit == get_sha(root=repo)
+
+
+def test_native_tags_filter(repo):
+    create_tags(repo, annotated=False)
+
+    checked = []
+
+    def tag_filter(tag):
+        checked.append(tag)
+        return tag if tag.startswith("1.") else None
+
+    assert get_tag("refname", filter_callback=tag_filter, root=repo) == "1.5.0"
+    # tags are checked lazily
+    assert checked == ["1.5.0"]
+    assert get_tags("refname", filter_callback=tag_filter, root=repo) == _exec_tags(
+        "refname",
+        filter_callback=tag_filter,
+        root=repo,
+    )
+
+
+def test_exec_tags_filter_lazy(repo):
+    sha = get_sha(root=repo)
+    commands = "".join(f"create refs/tags/1.{i}.0 {sha}\n" for i in range(2000))
+    subprocess.run(["git", "update-ref", "--stdin"], input=commands, text=True, cwd=repo, check=True)
+
+    checked = []
+
+    def tag_filter(tag):
+        checked.append(tag)
+        return tag if tag.endswith("9.0") else None
+
+    # output is read while git is still printing it, and git is terminated after the first matching tag
+    assert _exec_tag_info("refname", filter_callback=tag_filter, root=repo).name == "1.999.0"
+    assert checked == ["1.999.0"]
+
+    assert _exec_tag_info("refname", filter_callback=lambda tag: None, root=repo) is None
+    assert len(_exec_tag_infos("refname", root=repo)) == 2000
+
+
+@pytest.mark.parametrize("annotated", [True, False])
+def test_native_tags_many(repo, monkeypatch, annotated):
+    sha = get_sha(root=repo)
+    if annotated:
+        commands = "".join(
+            f"tag 1.{i}.0\nfrom {sha}\ntagger Tester <tester@example.com> {1600000000 + i} +0000\ndata 9\nAnnotated\n"
+            for i in range(2000)
+        )
+        subprocess.run(["git", "fast-import", "--quiet"], input=commands, text=True, cwd=repo, check=True)
+    else:
+        commands = "".join(f"create refs/tags/1.{i}.0 {sha}\n" for i in range(2000))
+        subprocess.run(["git", "update-ref", "--stdin"], input=commands, text=True, cwd=repo, check=True)
+    execute(repo, "git", "pack-refs", "--all")
+    execute(repo, "git", "commit-graph", "write", "--reachable")
+
+    expected = _exec_tag_info(root=repo)
+    assert expected.name == ("1.1999.0" if annotated else "1.0.0")
+
+    read_tag = ObjectStore.read_tag
+    read = []
+
+    def counting_read_tag(self, oid):
+        read.append(oid)
+        return read_tag(self, oid)
+
+    monkeypatch.setattr(ObjectStore, "read_tag", counting_read_tag)
+
+    if annotated:
+        # reading all tag objects to sort them is slower than 'git for-each-ref --merged'
+        with pytest.raises(UnsupportedRepositoryError):
+            next(_iter_merged_tag_infos(root=repo))
+    else:
+        # dates of lightweight tags are read from commit-graph
+        assert next(_iter_merged_tag_infos(root=repo)) == expected
+
+    assert get_tag_info(root=repo) == expected
+    assert not read
+
+
+def test_native_tags_unsupported_sort(repo):
+    create_tags(repo, annotated=False)
+
+    with pytest.raises(UnsupportedRepositoryError):
+        list(_iter_merged_tags("version:refname", root=repo))
+    assert get_tags("version:refname", root=repo) == _exec_tags("version:refname", root=repo)
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from setuptools_git_versioning.git import Repository, _exec, _exec_is_dirty
+from setuptools_git_versioning.readonly import git_env
+from tests.lib.util import create_file, execute
+
+pytestmark = pytest.mark.all
+
+
+def test_git_command(repo):
+    # options which are not supported by old git versions are not used
+    assert "--no-optional-locks" not in Repository(repo).command("git", "status")
+    assert Repository(repo).command("other", "status") == ("other", "status")
+
+
+def test_git_env(monkeypatch):
+    monkeypatch.setenv("GIT_PAGER", "less")
+    monkeypatch.setenv("GIT_ASKPASS", "askpass")
+    monkeypatch.setenv("GIT_OPTIONAL_LOCKS", "1")
+    monkeypatch.setenv("GIT_DIR", "some")
+
+    env = git_env()
+    assert "GIT_PAGER" not in env
+    assert "GIT_ASKPASS" not in env
+    assert env["GIT_OPTIONAL_LOCKS"] == "0"
+    assert env["GIT_TERMINAL_PROMPT"] == "0"
+    # repository location is not changed
+    assert env["GIT_DIR"] == "some"
+    assert env["PATH"] == os.environ["PATH"]
+
+
+@pytest.mark.parametrize("dirty", [True, False])
+def test_status_does_not_refresh_index(repo, dirty):
+    create_file(repo, "file.txt", "content")
+    if dirty:
+        create_file(repo, "untracked.txt", add=False)
+
+    # file is not changed, but cached stat info in the index is outdated
+    index = repo / ".git" / "index"
+    file = repo / "file.txt"
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    before = index.read_bytes()
+
+    assert _exec_is_dirty(root=repo) == dirty
+    assert bool(_exec("git", "status", "--short", root=repo)) == dirty
+    assert index.read_bytes() == before
+
+    # without read-only mode git updates the index
+    execute(repo, "git", "status")
+    assert index.read_bytes() != before
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from setuptools_git_versioning import git
+from setuptools_git_versioning.git import Repository
+from setuptools_git_versioning.version import version_from_git
+from tests.lib.util import create_file, create_folder, create_tag, get_full_sha
+
+pytestmark = pytest.mark.all
+
+
+def count_discoveries(monkeypatch):
+    calls = []
+    find_git_dir = git.find_git_dir
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return find_git_dir(*args, **kwargs)
+
+    monkeypatch.setattr(git, "find_git_dir", counted)
+    return calls
+
+
+def test_repository_discovered_once(repo, monkeypatch):
+    create_tag(repo, "1.0.0")
+    create_file(repo)
+    calls = count_discoveries(monkeypatch)
+
+    repository = Repository(repo)
+    assert git.get_sha(root=repository) == get_full_sha(repo)
+    assert git.get_tag(root=repository) == "1.0.0"
+    assert git.count_since("1.0.0", root=repository) == 1
+    assert git.get_branch(root=repository) == "master"
+    assert not git.is_dirty(root=repository)
+    assert asyncio.run(git.get_tag_async(root=repository)) == "1.0.0"
+    assert len(calls) == 1
+
+    calls.clear()
+    assert str(version_from_git(root=repo)).startswith("1.0.0.post1")
+    assert len(calls) == 1
+
+
+def test_repository_explicit_location(repo):
+    create_folder(repo, "subfolder")
+    create_file(repo / "subfolder", "file.txt")
+    sha = get_full_sha(repo)
+    create_file(repo)
+
+    repository = Repository(repo / "subfolder")
+    cmd = repository.command("git", "status")
+    assert cmd[0] == repository.executable
+    assert f"--git-dir={repo / '.git'}" in cmd
+    assert f"--work-tree={repo}" in cmd
+    assert cmd[-1] == "status"
+
+    # paths are still relative to the project root
+    assert git.get_latest_file_commit("file.txt", root=repository) == sha
+
+
+def test_repository_discovered_by_git(repo, monkeypatch):
+    monkeypatch.setenv("GIT_DIR", str(repo / ".git"))
+
+    repository = Repository(repo)
+    cmd = repository.command("git", "status")
+    assert not any(item.startswith(("--git-dir", "--work-tree")) for item in cmd)
+    assert git.get_sha(root=repository) == get_full_sha(repo)
+
+
+def test_repository_without_git(repo, monkeypatch):
+    create_tag(repo, "1.0.0")
+    calls = []
+    which = git.shutil.which
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return which(*args, **kwargs)
+
+    monkeypatch.setattr(git.shutil, "which", counted)
+
+    repository = Repository(repo)
+    repository.env["PATH"] = ""
+    with pytest.raises(FileNotFoundError):
+        repository.command("git", "status")
+
+    monkeypatch.setenv("GIT_DIR", str(repo / ".git"))
+    assert git.get_sha(root=repository) is None
+    assert git.get_tags(root=repository) == []
+    assert not git.is_dirty(root=repository)
+    assert len(calls) == 1
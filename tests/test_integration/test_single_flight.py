@@ -0,0 +1,126 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from setuptools_git_versioning import cache as cache_module
+from setuptools_git_versioning.cache import CACHE_DIR, VersionCache
+from setuptools_git_versioning.version import version_from_git, version_from_git_async
+from tests.lib.util import create_file, create_tag, get_sha, get_version
+
+fcntl = pytest.importorskip("fcntl")
+
+pytestmark = pytest.mark.all
+
+
+def cache_file(repo):
+    files = list(repo.joinpath(".git", CACHE_DIR).glob("*.json"))
+    assert len(files) == 1
+    return files[0]
+
+
+def replace_version(path, version):
+    content = json.loads(path.read_text())
+    content["version"] = version
+    path.write_text(json.dumps(content))
+
+
+def test_single_flight(repo, create_config, template_config):
+    template_config(repo, create_config, config={"single_flight": True})
+    create_file(repo)
+
+    sha = get_sha(repo)
+    assert get_version(repo) == f"1.2.3.post1+git.{sha}"
+    assert cache_file(repo)
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_single_flight_wait(repo, is_async):
+    create_tag(repo, "1.0.0")
+    assert str(version_from_git(single_flight=True, root=repo)) == "1.0.0"
+    path = cache_file(repo)
+
+    result = []
+
+    def calculate():
+        if is_async:
+            result.append(asyncio.run(version_from_git_async(single_flight=True, root=repo)))
+        else:
+            result.append(version_from_git(single_flight=True, root=repo))
+
+    with path.with_suffix(".lock").open("a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+
+        thread = threading.Thread(target=calculate)
+        thread.start()
+        time.sleep(0.5)
+        assert thread.is_alive()
+
+        # another process published the result
+        replace_version(path, "1.0.0.post100")
+
+    thread.join()
+    assert str(result[0]) == "1.0.0.post100"
+
+
+def test_single_flight_read_unlocked(repo, monkeypatch):
+    create_tag(repo, "1.0.0")
+    assert str(version_from_git(single_flight=True, root=repo)) == "1.0.0"
+    path = cache_file(repo)
+
+    original_load = VersionCache.load
+    locked = []
+
+    def load(self):
+        with path.with_suffix(".lock").open("a") as lock:
+            try:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                locked.append(True)
+            else:
+                locked.append(False)
+        return original_load(self)
+
+    monkeypatch.setattr(VersionCache, "load", load)
+
+    with path.with_suffix(".lock").open("a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        thread = threading.Thread(target=version_from_git, kwargs={"single_flight": True, "root": repo})
+        thread.start()
+        time.sleep(0.5)
+
+    thread.join()
+    # waiting process reads the result without holding the lock, so other waiting processes are not blocked
+    assert locked == [False]
+
+
+def test_single_flight_shared_cache_not_locked(repo, tmp_path_factory):
+    cache_dir = tmp_path_factory.mktemp("cache")
+    create_tag(repo, "1.0.0")
+
+    assert str(version_from_git(single_flight=True, cache_dir=cache_dir, root=repo)) == "1.0.0"
+    assert list(cache_dir.glob("*/*.json"))
+    assert not list(cache_dir.glob("*/*.lock"))
+    assert list(repo.joinpath(".git", CACHE_DIR).glob("*.lock"))
+
+
+def test_single_flight_timeout(repo, monkeypatch):
+    monkeypatch.setattr(cache_module, "LOCK_TIMEOUT", 0.1)
+    create_tag(repo, "1.0.0")
+    assert str(version_from_git(single_flight=True, root=repo)) == "1.0.0"
+    path = cache_file(repo)
+    path.unlink()
+
+    with path.with_suffix(".lock").open("a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        assert str(version_from_git(single_flight=True, root=repo)) == "1.0.0"
+
+    assert path.exists()
+
+
+def test_single_flight_callable_config(repo):
+    create_tag(repo, "1.0.0")
+    assert str(version_from_git(tag_formatter=lambda tag: tag, single_flight=True, root=repo)) == "1.0.0"
+    assert not list(repo.joinpath(".git").glob(f"{CACHE_DIR}/*"))
@@ -1,9 +1,14 @@
+import asyncio
 import re
 import subprocess
 from datetime import datetime
 
 import pytest
 
+from setuptools_git_versioning import git
+from setuptools_git_versioning import version as version_module
+from setuptools_git_versioning.subst import template_fields
+from setuptools_git_versioning.version import version_from_git, version_from_git_async
 from tests.lib.util import (
     checkout_branch,
     create_file,
@@ -185,3 +190,61 @@ def test_substitution_wrong_format(repo, template):
 
     with pytest.raises(subprocess.CalledProcessError):
         get_version_setup_py(repo)
+
+
+@pytest.mark.parametrize(
+    ("template", "fields"),
+    [
+        ("{tag}", {"tag"}),
+        ("{tag}.post{ccount}+git.{sha}", {"tag", "ccount", "sha"}),
+        ("{tag}.dev{timestamp:%Y%m%d}+{branch}", {"tag", "branch"}),
+        ("{tag}+{full_sha[0]}", {"tag", "full_sha"}),
+        ("{tag:>{ccount}}", {"tag", "ccount"}),
+        ("{{branch}}", set()),
+        ("{tag}+{env:BRANCH}", None),
+        ("{tag", None),
+    ],
+)
+def test_substitution_template_fields(template, fields):
+    assert template_fields(template) == fields
+
+
+def forbid_queries(monkeypatch, *names):
+    def fail(*args, **kwargs):
+        msg = "should not be called"
+        raise AssertionError(msg)
+
+    for name in names:
+        monkeypatch.setattr(version_module, name, fail)
+
+
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_substitution_dirty_not_checked(repo, monkeypatch, concurrent):
+    create_tag(repo, "1.2.3")
+    create_file(repo)
+    create_file(repo, commit=False)
+
+    # dirty state cannot change the version, and the branch name is not used
+    forbid_queries(monkeypatch, "is_dirty", "get_branch")
+    template = "{tag}.post{ccount}"
+    options = {"template": template, "dev_template": template, "dirty_template": template}
+
+    assert str(version_from_git(root=repo, concurrent=concurrent, **options)) == "1.2.3.post1"
+    assert str(asyncio.run(version_from_git_async(root=repo, **options))) == "1.2.3.post1"
+
+
+def test_substitution_ccount_not_counted(repo, monkeypatch):
+    create_tag(repo, "1.2.3")
+    create_file(repo)
+
+    def fail(*args, **kwargs):
+        msg = "should not be called"
+        raise AssertionError(msg)
+
+    monkeypatch.setattr(git, "count_since", fail)
+    monkeypatch.setattr(git, "count_since_async", fail)
+    options = {"dev_template": "{tag}.post1+git.{sha}", "dirty_template": "{tag}.post1+git.{sha}.dirty"}
+
+    sha = git.get_sha(root=repo)
+    assert str(version_from_git(root=repo, **options)) == f"1.2.3.post1+git.{sha[:8]}"
+    assert str(asyncio.run(version_from_git_async(root=repo, **options))) == f"1.2.3.post1+git.{sha[:8]}"
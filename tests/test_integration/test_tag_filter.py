@@ -1,3 +1,4 @@
+import re
 import subprocess
 import textwrap
 from datetime import datetime, timedelta
@@ -5,10 +6,13 @@ from pathlib import Path
 
 import pytest
 
+from setuptools_git_versioning.factories import regexp_glob, regexp_literal_prefix, tag_filter_factory
+from setuptools_git_versioning.git import _exec_tags, _iter_merged_tags, get_tags
 from tests.lib.util import (
     create_commit,
     create_file,
     create_tag,
+    execute,
     get_sha,
     get_version,
     get_version_module,
@@ -134,3 +138,86 @@ def test_tag_filter_invalid_regex(repo, create_config):
 
     with pytest.raises(subprocess.CalledProcessError):
         get_version(repo)
+
+
+@pytest.mark.parametrize(
+    ("regexp", "prefix"),
+    [
+        ("product_x/(?P<tag>.*)", "product_x/"),
+        (r"^v\d+", "v"),
+        (r"^v\.\d+", "v."),
+        (r"\Av\d+", ""),
+        ("release-1+", "release-1"),
+        ("release-1*", "release-"),
+        ("release-1?", "release-"),
+        ("release-1{2}", "release-"),
+        ("v1.0", "v1"),
+        ("v1$", "v1"),
+        ("v1|v2", ""),
+        ("v(1|2)", "v"),
+        ("v[|]x|y", ""),
+        ("v[](]|y", ""),
+        ("(?i)v1", ""),
+        ("(?x) v 1", ""),
+        (r"v\*", "v"),
+        ("", ""),
+    ],
+)
+def test_tag_filter_literal_prefix(regexp, prefix):
+    assert regexp_literal_prefix(re.compile(regexp)) == prefix
+
+
+@pytest.mark.parametrize(
+    ("regexp", "glob"),
+    [
+        ("", "*"),
+        (".*", "*"),
+        ("v", "v*"),
+        ("^v", "v*"),
+        ("^release-.*", "release-*"),
+        (r"^v1\.", "v1.*"),
+        (r"product_x/.*", "product_x/*"),
+        (r"^v\d+", None),
+        ("v1.0", None),
+        ("v1$", None),
+        ("v1|v2", None),
+        ("release-1+", None),
+        (r"v\.*", None),
+        (r"v\*", None),
+        ("(?i)v1", None),
+        ("product_x/(?P<tag>.*)", None),
+    ],
+)
+def test_tag_filter_glob(regexp, glob):
+    assert regexp_glob(re.compile(regexp)) == glob
+
+
+@pytest.mark.parametrize("pack", [True, False])
+def test_tag_filter_prefix_pushed_down(repo, pack):
+    for tag in ["product_x/1.0.0", "product_x/nested/1.1.0", "product_xy/2.0.0", "product_y/1.0.0", "1.0.0"]:
+        create_file(repo)
+        create_tag(repo, tag)
+    if pack:
+        execute(repo, "git", "pack-refs", "--all")
+    execute(repo, "git", "commit-graph", "write", "--reachable")
+
+    checked = []
+    tag_filter = tag_filter_factory("product_x(?P<tag>.*)")
+
+    def checked_filter(tag):
+        checked.append(tag)
+        return tag_filter(tag)
+
+    checked_filter.tag_prefix = tag_filter.tag_prefix
+    expected = ["product_xy/2.0.0", "product_x/nested/1.1.0", "product_x/1.0.0"]
+
+    assert _exec_tags("refname", filter_callback=checked_filter, root=repo) == expected
+    assert sorted(checked) == sorted(expected)
+
+    checked.clear()
+    assert list(_iter_merged_tags("refname", filter_callback=checked_filter, root=repo)) == expected
+    assert sorted(checked) == sorted(expected)
+
+    # the regexp still has the last word
+    tag_filter = tag_filter_factory("product_x/(?P<tag>1.*)")
+    assert get_tags("refname", filter_callback=tag_filter, root=repo) == ["product_x/1.0.0"]
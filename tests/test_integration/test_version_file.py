@@ -285,8 +285,11 @@ def test_version_file_git_missing(repo, create_config, count_commits):
         commit=False,
     )
 
+    # untracked files are found by reading the repository directly, so dirty state is the same as with git
+    expected = get_version(repo) if count_commits else "1.0.0"
+
     # repo cloned into machine/container with no git executable
-    assert get_version(repo, env={"PATH": ""}) == "1.0.0"
+    assert get_version(repo, env={"PATH": ""}) == expected
 
 
 @pytest.mark.parametrize("count_commits", [True, False])
@@ -308,7 +311,10 @@ def test_version_file_git_not_executable(repo, create_config, count_commits, tmp
         commit=False,
     )
 
+    # untracked files are found by reading the repository directly, so dirty state is the same as with git
+    expected = get_version(repo) if count_commits else "1.0.0"
+
     # repo cloned into machine/container without permissions to execute subprocesses
     tmp_path = tmp_path_factory.mktemp("bin")
     tmp_path.joinpath("git").touch()
-    assert get_version(repo, env={"PATH": os.fspath(tmp_path)}) == "1.0.0"
+    assert get_version(repo, env={"PATH": os.fspath(tmp_path)}) == expected